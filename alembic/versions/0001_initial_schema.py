@@ -0,0 +1,66 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2024-01-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "motoristas",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("nome", sa.String(length=255), nullable=False),
+        sa.Column("cpf", sa.String(length=11), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("telefone", sa.String(length=20), nullable=True),
+        sa.Column("ativo", sa.Boolean(), nullable=False),
+        sa.Column("criado_em", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("atualizado_em", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_motoristas_id", "motoristas", ["id"])
+    op.create_index("ix_motoristas_cpf", "motoristas", ["cpf"], unique=True)
+    op.create_index("ix_motoristas_email", "motoristas", ["email"], unique=True)
+    op.create_index("ix_motoristas_ativo", "motoristas", ["ativo"])
+
+    op.create_table(
+        "abastecimentos",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("motorista_id", sa.Integer(), nullable=False),
+        sa.Column("tipo_combustivel", sa.String(length=50), nullable=False),
+        sa.Column("valor", sa.Float(), nullable=False),
+        sa.Column("litros", sa.Float(), nullable=False),
+        sa.Column("status", sa.String(length=50), nullable=False),
+        sa.Column("motivo_recusa", sa.String(length=500), nullable=True),
+        sa.Column("eh_anomalia", sa.Boolean(), nullable=False),
+        sa.Column("data_abastecimento", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("criado_em", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("atualizado_em", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["motorista_id"], ["motoristas.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_abastecimentos_id", "abastecimentos", ["id"])
+    op.create_index("ix_abastecimentos_motorista_id", "abastecimentos", ["motorista_id"])
+    op.create_index("ix_abastecimentos_status", "abastecimentos", ["status"])
+    op.create_index("ix_abastecimentos_eh_anomalia", "abastecimentos", ["eh_anomalia"])
+    op.create_index(
+        "ix_abastecimentos_data_abastecimento", "abastecimentos", ["data_abastecimento"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("abastecimentos")
+    op.drop_table("motoristas")
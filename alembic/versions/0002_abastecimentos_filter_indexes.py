@@ -0,0 +1,45 @@
+"""composite indexes for filtered abastecimento listing
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-02-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Each composite index serves "WHERE <col> = ? ORDER BY data_abastecimento"
+    # and also equality lookups on its leading column, which makes the
+    # single-column motorista_id and status indexes redundant.
+    op.create_index(
+        "ix_abastecimentos_motorista_id_data",
+        "abastecimentos",
+        ["motorista_id", "data_abastecimento"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_abastecimentos_status_data",
+        "abastecimentos",
+        ["status", "data_abastecimento"],
+        if_not_exists=True,
+    )
+    op.drop_index("ix_abastecimentos_motorista_id", "abastecimentos", if_exists=True)
+    op.drop_index("ix_abastecimentos_status", "abastecimentos", if_exists=True)
+
+
+def downgrade() -> None:
+    op.create_index("ix_abastecimentos_status", "abastecimentos", ["status"])
+    op.create_index("ix_abastecimentos_motorista_id", "abastecimentos", ["motorista_id"])
+    op.drop_index("ix_abastecimentos_status_data", "abastecimentos")
+    op.drop_index("ix_abastecimentos_motorista_id_data", "abastecimentos")
@@ -0,0 +1,74 @@
+"""daily consumption aggregates
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-02-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.domain.models.enums import StatusAbastecimento
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "consumo_diario",
+        sa.Column("motorista_id", sa.Integer(), nullable=False),
+        sa.Column("dia", sa.Date(), nullable=False),
+        sa.Column("quantidade", sa.Integer(), nullable=False),
+        sa.Column("total_litros", sa.Float(), nullable=False),
+        sa.Column("total_valor", sa.Float(), nullable=False),
+        sa.Column("quantidade_anomalias", sa.Integer(), nullable=False),
+        sa.Column("quantidade_aprovados", sa.Integer(), nullable=False),
+        sa.Column("quantidade_recusados", sa.Integer(), nullable=False),
+        sa.Column("atualizado_em", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["motorista_id"], ["motoristas.id"]),
+        sa.PrimaryKeyConstraint("motorista_id", "dia"),
+    )
+    op.create_index("ix_consumo_diario_dia", "consumo_diario", ["dia"])
+
+    # Populate from existing history; afterwards the application keeps the
+    # table up to date (scripts/rebuild_consumo.py recomputes it on demand)
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO consumo_diario (
+                motorista_id, dia, quantidade, total_litros, total_valor,
+                quantidade_anomalias, quantidade_aprovados, quantidade_recusados,
+                atualizado_em
+            )
+            SELECT
+                motorista_id,
+                date(timezone(:tz, data_abastecimento)) AS dia,
+                count(*),
+                sum(litros),
+                sum(valor),
+                count(*) FILTER (WHERE eh_anomalia),
+                count(*) FILTER (WHERE status = :aprovado),
+                count(*) FILTER (WHERE status = :recusado),
+                now()
+            FROM abastecimentos
+            GROUP BY 1, 2
+            """
+        ).bindparams(
+            tz=settings.timezone,
+            aprovado=StatusAbastecimento.APROVADO.value,
+            recusado=StatusAbastecimento.RECUSADO.value,
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_consumo_diario_dia", "consumo_diario")
+    op.drop_table("consumo_diario")
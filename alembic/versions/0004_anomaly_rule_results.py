@@ -0,0 +1,30 @@
+"""anomaly rule engine score and fired rules
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-03-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable without defaults: adding them does not rewrite the table.
+    # Existing rows keep NULL until rescored by scripts/backfill_anomalies.py.
+    op.add_column("abastecimentos", sa.Column("pontuacao_anomalia", sa.Float(), nullable=True))
+    op.add_column("abastecimentos", sa.Column("regras_anomalia", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("abastecimentos", "regras_anomalia")
+    op.drop_column("abastecimentos", "pontuacao_anomalia")
@@ -0,0 +1,46 @@
+"""scoring timestamp for asynchronous anomaly scoring
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-03-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows were scored inline. now() is not volatile, so PostgreSQL
+    # stores the default in the catalog instead of rewriting the table; it is
+    # dropped right away so that new rows start unscored unless set.
+    op.add_column(
+        "abastecimentos",
+        sa.Column(
+            "pontuado_em",
+            sa.DateTime(timezone=True),
+            nullable=True,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.alter_column("abastecimentos", "pontuado_em", server_default=None)
+    op.create_index(
+        "ix_abastecimentos_nao_pontuados",
+        "abastecimentos",
+        ["id"],
+        postgresql_where=sa.text("pontuado_em IS NULL"),
+        sqlite_where=sa.text("pontuado_em IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_abastecimentos_nao_pontuados", "abastecimentos")
+    op.drop_column("abastecimentos", "pontuado_em")
@@ -0,0 +1,49 @@
+"""abastecimento change events (transactional outbox)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2024-03-22 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "eventos_abastecimento",
+        sa.Column(
+            "seq",
+            sa.BigInteger().with_variant(sa.Integer(), "sqlite"),
+            autoincrement=True,
+            nullable=False,
+        ),
+        sa.Column("abastecimento_id", sa.Integer(), nullable=False),
+        sa.Column("motorista_id", sa.Integer(), nullable=False),
+        sa.Column("tipo", sa.String(length=20), nullable=False),
+        sa.Column("dados", sa.JSON(), nullable=False),
+        sa.Column("criado_em", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("seq"),
+    )
+    op.create_index(
+        op.f("ix_eventos_abastecimento_abastecimento_id"),
+        "eventos_abastecimento",
+        ["abastecimento_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_eventos_abastecimento_abastecimento_id"), table_name="eventos_abastecimento"
+    )
+    op.drop_table("eventos_abastecimento")
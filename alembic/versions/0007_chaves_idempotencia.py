@@ -0,0 +1,40 @@
+"""idempotency keys
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2024-03-29 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chaves_idempotencia",
+        sa.Column("chave", sa.String(length=255), nullable=False),
+        sa.Column("fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("content_type", sa.String(length=100), nullable=True),
+        sa.Column("corpo", sa.LargeBinary(), nullable=True),
+        sa.Column("criado_em", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expira_em", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("chave"),
+    )
+    op.create_index(
+        op.f("ix_chaves_idempotencia_expira_em"), "chaves_idempotencia", ["expira_em"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_chaves_idempotencia_expira_em"), table_name="chaves_idempotencia")
+    op.drop_table("chaves_idempotencia")
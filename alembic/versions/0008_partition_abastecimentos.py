@@ -0,0 +1,111 @@
+"""monthly range partitions of abastecimentos
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2024-04-05 00:00:00.000000
+
+The table is rebuilt: rows are copied into the partitioned table, so the
+upgrade takes an exclusive lock on abastecimentos for the duration of the
+copy. Run it in a maintenance window on large databases.
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months created after the current one (the application keeps creating them)
+MONTHS_AHEAD = 3
+
+INDEXES = (
+    "CREATE INDEX ix_abastecimentos_id ON abastecimentos (id)",
+    "CREATE INDEX ix_abastecimentos_data_abastecimento ON abastecimentos (data_abastecimento)",
+    "CREATE INDEX ix_abastecimentos_eh_anomalia ON abastecimentos (eh_anomalia)",
+    "CREATE INDEX ix_abastecimentos_motorista_id_data "
+    "ON abastecimentos (motorista_id, data_abastecimento)",
+    "CREATE INDEX ix_abastecimentos_status_data ON abastecimentos (status, data_abastecimento)",
+    "CREATE INDEX ix_abastecimentos_nao_pontuados ON abastecimentos (id) "
+    "WHERE pontuado_em IS NULL",
+)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _rebuild(partitioned: bool) -> None:
+    """Copy abastecimentos into a new (partitioned or plain) table with the same columns"""
+    op.execute("ALTER TABLE abastecimentos RENAME TO abastecimentos_antiga")
+    op.execute(
+        "ALTER TABLE abastecimentos_antiga "
+        "RENAME CONSTRAINT abastecimentos_pkey TO abastecimentos_antiga_pkey"
+    )
+    for row in op.get_bind().execute(
+        sa.text(
+            "SELECT indexname FROM pg_indexes "
+            "WHERE tablename = 'abastecimentos_antiga' AND indexname LIKE 'ix_%'"
+        )
+    ):
+        op.execute(f"DROP INDEX {row.indexname}")
+
+    op.execute(
+        "CREATE TABLE abastecimentos "
+        "(LIKE abastecimentos_antiga INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        + (" PARTITION BY RANGE (data_abastecimento)" if partitioned else "")
+    )
+    if partitioned:
+        # No DEFAULT partition: it would stop the planner from reading the
+        # partitions in order for "newest first" listings
+        first, last = op.get_bind().execute(
+            sa.text(
+                "SELECT min(data_abastecimento AT TIME ZONE 'UTC'), "
+                "max(data_abastecimento AT TIME ZONE 'UTC') FROM abastecimentos_antiga"
+            )
+        ).one()
+        current = datetime.utcnow().date().replace(day=1)
+        month = min(first.date().replace(day=1), current) if first else current
+        end = _add_months(current, MONTHS_AHEAD)
+        if last and last.date() > end:
+            end = last.date().replace(day=1)
+        while month <= end:
+            following = _add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE abastecimentos_p{month:%Y%m} PARTITION OF abastecimentos "
+                f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{following} 00:00:00+00')"
+            )
+            month = following
+
+    op.execute("INSERT INTO abastecimentos SELECT * FROM abastecimentos_antiga")
+    op.execute("ALTER SEQUENCE abastecimentos_id_seq OWNED BY abastecimentos.id")
+    op.execute("DROP TABLE abastecimentos_antiga")
+
+    # A primary key of a partitioned table must include the partition key;
+    # ids stay unique because they all come from the same sequence
+    primary_key = "id, data_abastecimento" if partitioned else "id"
+    op.execute(
+        f"ALTER TABLE abastecimentos ADD CONSTRAINT abastecimentos_pkey PRIMARY KEY ({primary_key})"
+    )
+    op.execute(
+        "ALTER TABLE abastecimentos ADD CONSTRAINT abastecimentos_motorista_id_fkey "
+        "FOREIGN KEY (motorista_id) REFERENCES motoristas (id)"
+    )
+    for statement in INDEXES:
+        op.execute(statement)
+    op.execute("ANALYZE abastecimentos")
+
+
+def upgrade() -> None:
+    _rebuild(partitioned=True)
+
+
+def downgrade() -> None:
+    _rebuild(partitioned=False)
@@ -0,0 +1,54 @@
+"""fixed-point valor and litros
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2024-04-12 00:00:00.000000
+
+Changing the column types rewrites abastecimentos and consumo_diario under
+an exclusive lock. Values are rounded to centavos and millilitres; the
+float sums in consumo_diario are rounded the same way, which also drops
+the error they had accumulated.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, precision, scale)
+COLUMNS = (
+    ("abastecimentos", "valor", 12, 2),
+    ("abastecimentos", "litros", 10, 3),
+    ("consumo_diario", "total_valor", 14, 2),
+    ("consumo_diario", "total_litros", 14, 3),
+)
+
+
+def upgrade() -> None:
+    for table, column, precision, scale in COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.Numeric(precision, scale),
+            existing_type=sa.Float(),
+            existing_nullable=False,
+            postgresql_using=f"round({column}::numeric, {scale})",
+        )
+
+
+def downgrade() -> None:
+    for table, column, precision, scale in COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.Float(),
+            existing_type=sa.Numeric(precision, scale),
+            existing_nullable=False,
+        )
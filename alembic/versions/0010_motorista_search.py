@@ -0,0 +1,70 @@
+"""motorista search indexes
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2024-04-19 00:00:00.000000
+
+Adds nome_busca, a generated tsvector with every prefix of every word of
+the name (accents removed), and the indexes behind GET
+/api/v1/motoristas/busca. Adding the column rewrites motoristas under an
+exclusive lock (about 45 s per million rows).
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Storing the prefixes ("silva" -> "s", "si", ..., "silva") turns prefix
+# search into exact lexeme matches, whose frequencies the planner knows from
+# the column statistics; for "sil:*" queries it would assume a fixed 2%.
+PREFIXOS_NOME = """
+CREATE FUNCTION motoristas_prefixos_nome(nome text) RETURNS tsvector
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+    SELECT array_to_tsvector(array_agg(DISTINCT left(palavra, n)))
+    FROM unnest(tsvector_to_array(to_tsvector(
+             'simple'::regconfig,
+             translate(lower(nome), 'áàâãäéèêëíìîïóòôõöúùûüçñ', 'aaaaaeeeeiiiiooooouuuucn')
+         ))) AS palavra,
+         generate_series(1, length(palavra)) AS n
+$$
+"""
+
+INDEXES = (
+    "CREATE INDEX ix_motoristas_nome_busca ON motoristas USING gin (nome_busca)",
+    # text_pattern_ops serves LIKE 'prefix%' whatever the database collation
+    "CREATE INDEX ix_motoristas_cpf_prefixo ON motoristas (cpf text_pattern_ops)",
+    "CREATE INDEX ix_motoristas_email_prefixo ON motoristas (lower(email) text_pattern_ops)",
+    "CREATE INDEX ix_motoristas_telefone_prefixo ON motoristas (telefone text_pattern_ops)",
+)
+
+
+def upgrade() -> None:
+    op.execute(PREFIXOS_NOME)
+    op.execute(
+        "ALTER TABLE motoristas ADD COLUMN nome_busca tsvector "
+        "GENERATED ALWAYS AS (motoristas_prefixos_nome(nome)) STORED"
+    )
+    # A larger sample keeps frequencies of the less common prefixes too
+    op.execute("ALTER TABLE motoristas ALTER COLUMN nome_busca SET STATISTICS 1000")
+    for statement in INDEXES:
+        op.execute(statement)
+    op.execute("ANALYZE motoristas")
+
+
+def downgrade() -> None:
+    for index in (
+        "ix_motoristas_telefone_prefixo",
+        "ix_motoristas_email_prefixo",
+        "ix_motoristas_cpf_prefixo",
+        "ix_motoristas_nome_busca",
+    ):
+        op.execute(f"DROP INDEX {index}")
+    op.execute("ALTER TABLE motoristas DROP COLUMN nome_busca")
+    op.execute("DROP FUNCTION motoristas_prefixos_nome(text)")
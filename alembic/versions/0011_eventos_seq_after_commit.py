@@ -0,0 +1,59 @@
+"""number abastecimento events after commit
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2024-04-26 00:00:00.000000
+
+Events get an id in insertion order as primary key, and seq becomes a
+nullable unique column filled in after the commit by the change feed
+(EventoRepository.assign_seqs), so writers no longer serialize on an
+advisory lock. Existing events keep their seq, copied to id.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "eventos_abastecimento"
+
+
+def upgrade() -> None:
+    op.execute(f"ALTER TABLE {TABLE} DROP CONSTRAINT {TABLE}_pkey")
+    op.execute(
+        f"ALTER TABLE {TABLE} ALTER COLUMN seq DROP DEFAULT, ALTER COLUMN seq DROP NOT NULL"
+    )
+    op.execute(f"DROP SEQUENCE {TABLE}_seq_seq")
+    op.execute(f"ALTER TABLE {TABLE} ADD COLUMN id bigserial")
+    op.execute(f"UPDATE {TABLE} SET id = seq")
+    op.execute(f"SELECT setval('{TABLE}_id_seq', coalesce(max(id), 0) + 1, false) FROM {TABLE}")
+    op.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id)")
+    op.execute(f"CREATE UNIQUE INDEX ix_{TABLE}_seq ON {TABLE} (seq)")
+    op.execute(f"CREATE INDEX ix_{TABLE}_sem_seq ON {TABLE} (id) WHERE seq IS NULL")
+
+
+def downgrade() -> None:
+    # Number the events still waiting for a seq, in insertion order
+    op.execute(
+        f"UPDATE {TABLE} SET seq = numerados.seq "
+        f"FROM (SELECT id, (SELECT coalesce(max(seq), 0) FROM {TABLE}) "
+        f"+ row_number() OVER (ORDER BY id) AS seq FROM {TABLE} WHERE seq IS NULL) numerados "
+        f"WHERE {TABLE}.id = numerados.id"
+    )
+    op.execute(f"DROP INDEX ix_{TABLE}_sem_seq")
+    op.execute(f"DROP INDEX ix_{TABLE}_seq")
+    op.execute(f"ALTER TABLE {TABLE} DROP CONSTRAINT {TABLE}_pkey")
+    op.execute(f"ALTER TABLE {TABLE} DROP COLUMN id")
+    op.execute(f"CREATE SEQUENCE {TABLE}_seq_seq OWNED BY {TABLE}.seq")
+    op.execute(f"SELECT setval('{TABLE}_seq_seq', coalesce(max(seq), 0) + 1, false) FROM {TABLE}")
+    op.execute(
+        f"ALTER TABLE {TABLE} ALTER COLUMN seq SET DEFAULT nextval('{TABLE}_seq_seq'), "
+        "ALTER COLUMN seq SET NOT NULL"
+    )
+    op.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (seq)")
@@ -0,0 +1,35 @@
+"""store motorista telefones as digits
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2024-05-03 00:00:00.000000
+
+Telefones are validated and stored as digits only from now on, like CPFs,
+so the prefix index of migration 0010 serves searches however the number
+was formatted. Existing telefones are stripped of their formatting here;
+values with nothing but formatting become NULL.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0012"
+down_revision: Union[str, None] = "0011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "UPDATE motoristas SET telefone = nullif(regexp_replace(telefone, '[^0-9]', '', 'g'), '') "
+        "WHERE telefone ~ '[^0-9]'"
+    )
+    op.execute("ANALYZE motoristas")
+
+
+def downgrade() -> None:
+    # The original formatting is not kept; digits-only telefones stay valid
+    pass
@@ -0,0 +1,175 @@
+"""Idempotency-Key support for write endpoints"""
+
+import hashlib
+import json
+from datetime import datetime
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.logging import logger
+from app.services.idempotency import Desfecho, IdempotencyStore
+
+HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyMiddleware:
+    """
+    Replay the recorded response to retries of a request with the same Idempotency-Key.
+
+    Applies to POST requests under the given path prefixes that carry the
+    header. The first request with a key is processed normally and its
+    response recorded (server errors are not recorded, so they can be
+    retried); later requests with the key get that response back, marked
+    with Idempotent-Replayed: true, without reaching the endpoint. A retry
+    arriving while the first request is still running gets 409 (for at most
+    the store's lease), and reusing a key for a different request gets 422.
+    """
+
+    def __init__(self, app: ASGIApp, store: IdempotencyStore, prefixes: tuple[str, ...]):
+        """Wrap an ASGI app"""
+        self.app = app
+        self.store = store
+        self.prefixes = prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        chave = self._key(scope)
+        if chave is None:
+            await self.app(scope, receive, send)
+            return
+        if not 0 < len(chave) <= MAX_KEY_LENGTH:
+            await self._send_error(
+                send, 400, f"Idempotency-Key deve ter de 1 a {MAX_KEY_LENGTH} caracteres"
+            )
+            return
+
+        body = await self._read_body(receive)
+        fingerprint = self._fingerprint(scope, body)
+        desfecho, stored, reservada_em = await self.store.begin(chave, fingerprint)
+
+        if desfecho == Desfecho.REPETIDA:
+            headers = [(b"content-length", str(len(stored.body)).encode())]
+            if stored.content_type:
+                headers.append((b"content-type", stored.content_type.encode()))
+            headers.append((b"idempotent-replayed", b"true"))
+            await send(
+                {"type": "http.response.start", "status": stored.status_code, "headers": headers}
+            )
+            await send({"type": "http.response.body", "body": stored.body})
+            return
+        if desfecho == Desfecho.EM_ANDAMENTO:
+            await self._send_error(
+                send, 409, "Uma requisição com esta Idempotency-Key ainda está em andamento"
+            )
+            return
+        if desfecho == Desfecho.CONFLITO:
+            await self._send_error(
+                send, 422, "Idempotency-Key já foi usada com outra requisição"
+            )
+            return
+
+        await self._process(scope, body, receive, send, chave, fingerprint, reservada_em)
+
+    async def _process(
+        self,
+        scope: Scope,
+        body: bytes,
+        receive: Receive,
+        send: Send,
+        chave: str,
+        fingerprint: str,
+        reservada_em: datetime,
+    ) -> None:
+        """Run the request, recording its response under the key"""
+        status_code = 500
+        content_type = None
+        chunks: list[bytes] = []
+        body_sent = False
+
+        async def replay_body() -> Message:
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name.lower() == b"content-type":
+                        content_type = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_body, send_wrapper)
+        except BaseException:
+            await self.store.release(chave, reservada_em)
+            raise
+
+        # The response is already sent: the client does not wait for this
+        try:
+            if status_code >= 500:
+                await self.store.release(chave, reservada_em)
+            else:
+                await self.store.complete(
+                    chave, fingerprint, reservada_em, status_code, content_type, b"".join(chunks)
+                )
+        except Exception as exc:
+            # The key stays reserved until its lease runs out
+            logger.error(f"Could not record the response for an Idempotency-Key: {exc!r}")
+
+    def _key(self, scope: Scope) -> str | None:
+        """Idempotency-Key of a request it applies to, else None"""
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].startswith(self.prefixes)
+        ):
+            return None
+        for name, value in scope["headers"]:
+            if name == HEADER:
+                return value.decode("latin-1").strip()
+        return None
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        """Read the whole request body"""
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    def _fingerprint(scope: Scope, body: bytes) -> str:
+        """SHA-256 of what makes two requests the same"""
+        digest = hashlib.sha256()
+        for part in (scope["method"].encode(), scope["path"].encode(), scope["query_string"]):
+            digest.update(part)
+            digest.update(b"\0")
+        digest.update(body)
+        return digest.hexdigest()
+
+    @staticmethod
+    async def _send_error(send: Send, status_code: int, detail: str) -> None:
+        """Send a JSON error in the format of HTTPException"""
+        body = json.dumps({"detail": detail}, ensure_ascii=False).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
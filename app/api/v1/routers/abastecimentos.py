@@ -1,21 +1,64 @@
 """Abastecimento endpoints"""
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import json
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import get_session
-from app.domain.models.enums import StatusAbastecimento
+from app.domain.exceptions import TransicaoInvalidaError
+from app.domain.models.abastecimento import Abastecimento
+from app.domain.models.enums import StatusAbastecimento, TipoCombustivel
 from app.domain.schemas.abastecimento import (
+    AbastecimentoAprovacaoLote,
+    AbastecimentoBatchItemResult,
+    AbastecimentoBatchResponse,
     AbastecimentoCreate,
+    AbastecimentoCursorResponse,
     AbastecimentoListResponse,
+    AbastecimentoRecusaLote,
     AbastecimentoResponse,
+    AbastecimentoRevisaoItemResult,
+    AbastecimentoRevisaoLoteResponse,
+)
+from app.repositories.abastecimento_repository import (
+    AbastecimentoFilters,
+    AbastecimentoRepository,
 )
-from app.repositories.abastecimento_repository import AbastecimentoRepository
-from app.repositories.motorista_repository import MotoristaRepository
 from app.services.abastecimento_service import AbastecimentoService
+from app.services.export_service import FormatoExportacao, export_abastecimentos
+from app.services.motorista_cache import motorista_cache
 
 router = APIRouter(prefix="/api/v1/abastecimentos", tags=["abastecimentos"])
 
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+# Marker for NDJSON lines that are not valid JSON
+_INVALID_JSON = object()
+
+
+def get_filters(
+    status_filter: StatusAbastecimento | None = Query(None),
+    motorista_id: int | None = Query(None),
+    tipo_combustivel: TipoCombustivel | None = Query(None),
+    eh_anomalia: bool | None = Query(None),
+    data_inicio: datetime | None = Query(None, description="Início do período (inclusivo)"),
+    data_fim: datetime | None = Query(None, description="Fim do período (exclusivo)"),
+) -> AbastecimentoFilters:
+    """Dependency that collects the listing filters from query parameters"""
+    return AbastecimentoFilters(
+        motorista_id=motorista_id,
+        status=status_filter,
+        tipo_combustivel=tipo_combustivel,
+        eh_anomalia=eh_anomalia,
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+    )
+
 
 @router.post(
     "",
@@ -41,9 +84,8 @@ async def create_abastecimento(
         HTTPException: If motorista not found or data is invalid
     """
     # Verify motorista exists
-    motorista_repo = MotoristaRepository(session)
-    motorista = await motorista_repo.get_by_id(abastecimento.motorista_id)
-    if not motorista:
+    ativo = await motorista_cache.get_active_flag(session, abastecimento.motorista_id)
+    if ativo is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Motorista não encontrado",
@@ -61,6 +103,338 @@ async def create_abastecimento(
     return AbastecimentoResponse.model_validate(created)
 
 
+def _parse_batch_body(body: bytes, content_type: str) -> list[object]:
+    """
+    Split a batch request body into raw records.
+
+    Accepts a JSON array or NDJSON (one JSON object per line, blank lines
+    ignored). NDJSON lines that cannot be parsed become _INVALID_JSON so that
+    they are reported individually instead of failing the whole batch.
+
+    Raises:
+        HTTPException: If a JSON body is not a valid array
+    """
+    media_type = content_type.split(";", 1)[0].strip().lower()
+
+    if media_type in NDJSON_MEDIA_TYPES:
+        records: list[object] = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                records.append(_INVALID_JSON)
+        return records
+
+    try:
+        records = json.loads(body)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Corpo da requisição não é um JSON válido",
+        ) from exc
+    if not isinstance(records, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="O corpo deve ser uma lista JSON ou NDJSON",
+        )
+    return records
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    """Summarize a Pydantic validation error in one line"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'registro'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+@router.post(
+    "/batch",
+    response_model=AbastecimentoBatchResponse,
+    summary="Criar abastecimentos em lote",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/AbastecimentoCreate"},
+                    }
+                },
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def create_abastecimentos_batch(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+) -> AbastecimentoBatchResponse:
+    """
+    Create many abastecimentos in one request.
+
+    The body is a JSON array of AbastecimentoCreate records, or NDJSON when
+    sent with Content-Type application/x-ndjson. Every motorista is checked
+    with a single query, anomaly detection runs over the whole batch and all
+    valid records are written in one bulk insert. Invalid records do not
+    prevent the others from being created; each one gets its own result.
+
+    Args:
+        request: Incoming request with the batch body
+        session: Database session
+
+    Returns:
+        Per-record results, in input order
+
+    Raises:
+        HTTPException: If the body cannot be parsed or the batch is too large
+    """
+    raw_records = _parse_batch_body(
+        await request.body(), request.headers.get("content-type", "application/json")
+    )
+    if len(raw_records) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"O lote excede o limite de {settings.batch_max_items} registros",
+        )
+
+    results: list[AbastecimentoBatchItemResult | None] = [None] * len(raw_records)
+
+    # Validate every record
+    valid: list[tuple[int, AbastecimentoCreate]] = []
+    for index, raw in enumerate(raw_records):
+        if raw is _INVALID_JSON:
+            results[index] = AbastecimentoBatchItemResult(
+                indice=index, sucesso=False, erro="JSON inválido"
+            )
+            continue
+        try:
+            valid.append((index, AbastecimentoCreate.model_validate(raw)))
+        except ValidationError as exc:
+            results[index] = AbastecimentoBatchItemResult(
+                indice=index, sucesso=False, erro=_format_validation_error(exc)
+            )
+
+    # Verify motoristas exist (cache misses are loaded with a single query)
+    existing_ids = await motorista_cache.get_active_flags(
+        session, {record.motorista_id for _, record in valid}
+    )
+    to_create: list[tuple[int, AbastecimentoCreate]] = []
+    for index, record in valid:
+        if record.motorista_id in existing_ids:
+            to_create.append((index, record))
+        else:
+            results[index] = AbastecimentoBatchItemResult(
+                indice=index, sucesso=False, erro="Motorista não encontrado"
+            )
+
+    # Create abastecimentos with business logic
+    service = AbastecimentoService(session)
+    created = await service.create_abastecimentos([record for _, record in to_create])
+    for (index, _), abastecimento in zip(to_create, created):
+        results[index] = AbastecimentoBatchItemResult(
+            indice=index,
+            sucesso=True,
+            abastecimento=AbastecimentoResponse.model_validate(abastecimento),
+        )
+
+    return AbastecimentoBatchResponse(
+        total=len(results),
+        criados=len(created),
+        falhas=len(results) - len(created),
+        resultados=results,
+    )
+
+
+def _check_review_size(ids: list[int]) -> None:
+    """Reject bulk reviews above the batch limit"""
+    if len(ids) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"O lote excede o limite de {settings.batch_max_items} registros",
+        )
+
+
+def _review_response(
+    ids: list[int],
+    updated: list[Abastecimento],
+    failures: dict[int, str | None],
+    destino: StatusAbastecimento,
+) -> AbastecimentoRevisaoLoteResponse:
+    """Per-id results of a bulk approval or rejection, in input order"""
+    by_id = {abastecimento.id: abastecimento for abastecimento in updated}
+    results = []
+    for obj_id in dict.fromkeys(ids):
+        if obj_id in by_id:
+            results.append(
+                AbastecimentoRevisaoItemResult(
+                    id=obj_id,
+                    sucesso=True,
+                    abastecimento=AbastecimentoResponse.model_validate(by_id[obj_id]),
+                )
+            )
+        elif failures.get(obj_id) is None:
+            results.append(
+                AbastecimentoRevisaoItemResult(
+                    id=obj_id, sucesso=False, erro="Abastecimento não encontrado"
+                )
+            )
+        else:
+            results.append(
+                AbastecimentoRevisaoItemResult(
+                    id=obj_id,
+                    sucesso=False,
+                    erro=str(TransicaoInvalidaError(failures[obj_id], destino)),
+                )
+            )
+
+    return AbastecimentoRevisaoLoteResponse(
+        total=len(results),
+        atualizados=len(updated),
+        falhas=len(results) - len(updated),
+        resultados=results,
+    )
+
+
+@router.post(
+    "/approve",
+    response_model=AbastecimentoRevisaoLoteResponse,
+    summary="Aprovar abastecimentos em lote",
+)
+async def approve_abastecimentos_batch(
+    payload: AbastecimentoAprovacaoLote,
+    session: AsyncSession = Depends(get_session),
+) -> AbastecimentoRevisaoLoteResponse:
+    """
+    Approve many abastecimentos with a single UPDATE.
+
+    Ids that do not exist or whose status cannot be approved are reported
+    individually and do not prevent the others from being approved.
+
+    Args:
+        payload: IDs to approve
+        session: Database session
+
+    Returns:
+        Per-id results, in input order (duplicates removed)
+
+    Raises:
+        HTTPException: If the batch is too large
+    """
+    _check_review_size(payload.ids)
+    service = AbastecimentoService(session)
+    updated, failures = await service.approve_abastecimentos(payload.ids)
+    return _review_response(payload.ids, updated, failures, StatusAbastecimento.APROVADO)
+
+
+@router.post(
+    "/reject",
+    response_model=AbastecimentoRevisaoLoteResponse,
+    summary="Rejeitar abastecimentos em lote",
+)
+async def reject_abastecimentos_batch(
+    payload: AbastecimentoRecusaLote,
+    session: AsyncSession = Depends(get_session),
+) -> AbastecimentoRevisaoLoteResponse:
+    """
+    Reject many abastecimentos with a single UPDATE, all with the same reason.
+
+    Args:
+        payload: IDs to reject and the reason
+        session: Database session
+
+    Returns:
+        Per-id results, in input order (duplicates removed)
+
+    Raises:
+        HTTPException: If the batch is too large
+    """
+    _check_review_size(payload.ids)
+    service = AbastecimentoService(session)
+    updated, failures = await service.reject_abastecimentos(payload.ids, payload.motivo)
+    return _review_response(payload.ids, updated, failures, StatusAbastecimento.RECUSADO)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Exportar abastecimentos (NDJSON ou CSV)",
+)
+async def export_abastecimentos_endpoint(
+    formato: FormatoExportacao = Query(FormatoExportacao.NDJSON),
+    filters: AbastecimentoFilters = Depends(get_filters),
+) -> StreamingResponse:
+    """
+    Stream every abastecimento matching the filters.
+
+    The export is produced while it is sent, in constant memory, so it has no
+    page size limit.
+
+    Args:
+        formato: Output format (ndjson or csv)
+        filters: Same filters as the listing endpoint
+
+    Returns:
+        Streaming NDJSON or CSV response
+    """
+    return StreamingResponse(
+        export_abastecimentos(filters, formato),
+        media_type=formato.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="abastecimentos.{formato.value}"'
+        },
+    )
+
+
+@router.get(
+    "/cursor",
+    response_model=AbastecimentoCursorResponse,
+    summary="Listar abastecimentos com paginação por cursor",
+)
+async def list_abastecimentos_cursor(
+    cursor: str | None = Query(None),
+    page_size: int = Query(20, ge=1, le=100),
+    filters: AbastecimentoFilters = Depends(get_filters),
+    session: AsyncSession = Depends(get_session),
+) -> AbastecimentoCursorResponse:
+    """
+    List abastecimentos with keyset pagination, newest first.
+
+    Unlike the page-based listing, deep pages cost the same as the first one
+    and no total count is computed.
+
+    Args:
+        cursor: Cursor returned by the previous page (omit for the first page)
+        page_size: Items per page
+        filters: Listing filters (must be the same on every page)
+        session: Database session
+
+    Returns:
+        Page of abastecimentos and the cursor for the next page
+
+    Raises:
+        HTTPException: If the cursor is invalid
+    """
+    repository = AbastecimentoRepository(session)
+
+    try:
+        items, next_cursor = await repository.get_with_cursor(cursor, page_size, filters)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+
+    return AbastecimentoCursorResponse(
+        items=[AbastecimentoResponse.model_validate(item) for item in items],
+        tamanho_pagina=page_size,
+        proximo_cursor=next_cursor,
+    )
+
+
 @router.get(
     "/{abastecimento_id}",
     response_model=AbastecimentoResponse,
@@ -103,36 +477,29 @@ async def get_abastecimento(
 async def list_abastecimentos(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    status_filter: StatusAbastecimento | None = Query(None),
-    motorista_id: int | None = Query(None),
+    total_estimado: bool = Query(
+        False, description="Usar estimativa do planner para o total (mais rápido)"
+    ),
+    filters: AbastecimentoFilters = Depends(get_filters),
     session: AsyncSession = Depends(get_session),
 ) -> AbastecimentoListResponse:
     """
-    List abastecimentos with pagination and filters.
+    List abastecimentos with pagination and filters, newest first.
 
     Args:
         page: Page number (1-indexed)
         page_size: Items per page
-        status_filter: Filter by status
-        motorista_id: Filter by motorista ID
+        total_estimado: Return an approximate total instead of an exact count
+        filters: Driver, status, fuel type, anomaly flag and date range filters
         session: Database session
 
     Returns:
         Paginated list of abastecimentos
     """
     repository = AbastecimentoRepository(session)
-
-    if motorista_id:
-        # Get abastecimentos for specific motorista
-        items = await repository.get_by_motorista_id(motorista_id)
-        total = len(items)
-    elif status_filter:
-        # Get abastecimentos by status
-        items = await repository.get_by_status(status_filter)
-        total = len(items)
-    else:
-        # Get all abastecimentos with pagination
-        items, total = await repository.get_with_pagination(page, page_size)
+    items, total = await repository.get_with_pagination(
+        page, page_size, filters, estimate_total=total_estimado
+    )
 
     total_pages = (total + page_size - 1) // page_size
 
@@ -142,6 +509,7 @@ async def list_abastecimentos(
         pagina=page,
         tamanho_pagina=page_size,
         total_paginas=total_pages,
+        total_estimado=total_estimado,
     )
 
 
@@ -155,7 +523,7 @@ async def approve_abastecimento(
     session: AsyncSession = Depends(get_session),
 ) -> AbastecimentoResponse:
     """
-    Approve an abastecimento.
+    Approve a pending or anomalous abastecimento.
 
     Args:
         abastecimento_id: Abastecimento ID
@@ -165,10 +533,16 @@ async def approve_abastecimento(
         Updated abastecimento
 
     Raises:
-        HTTPException: If abastecimento not found
+        HTTPException: If abastecimento not found or already reviewed
     """
     service = AbastecimentoService(session)
-    updated = await service.approve_abastecimento(abastecimento_id)
+    try:
+        updated = await service.approve_abastecimento(abastecimento_id)
+    except TransicaoInvalidaError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(exc),
+        ) from exc
 
     if not updated:
         raise HTTPException(
@@ -190,7 +564,7 @@ async def reject_abastecimento(
     session: AsyncSession = Depends(get_session),
 ) -> AbastecimentoResponse:
     """
-    Reject an abastecimento.
+    Reject a pending or anomalous abastecimento.
 
     Args:
         abastecimento_id: Abastecimento ID
@@ -201,10 +575,16 @@ async def reject_abastecimento(
         Updated abastecimento
 
     Raises:
-        HTTPException: If abastecimento not found
+        HTTPException: If abastecimento not found or already reviewed
     """
     service = AbastecimentoService(session)
-    updated = await service.reject_abastecimento(abastecimento_id, motivo)
+    try:
+        updated = await service.reject_abastecimento(abastecimento_id, motivo)
+    except TransicaoInvalidaError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(exc),
+        ) from exc
 
     if not updated:
         raise HTTPException(
@@ -0,0 +1,132 @@
+"""Consumption aggregate endpoints"""
+
+from datetime import date, datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_session
+from app.core.timezone import local_date
+from app.domain.schemas.consumo import (
+    ConsumoDiaResponse,
+    ConsumoFrotaResponse,
+    ConsumoMotoristaResponse,
+    ConsumoTotais,
+)
+from app.repositories.consumo_repository import ConsumoRepository
+from app.repositories.motorista_repository import MotoristaRepository
+
+router = APIRouter(prefix="/api/v1/consumo", tags=["consumo"])
+
+# Fleet-wide queries are bounded so their cost does not grow with history
+DEFAULT_FLEET_DAYS = 30
+MAX_FLEET_DAYS = 366
+
+
+def _check_range(inicio: date | None, fim: date | None) -> None:
+    """Reject inverted date ranges"""
+    if inicio is not None and fim is not None and inicio > fim:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="inicio deve ser anterior ou igual a fim",
+        )
+
+
+@router.get(
+    "/motoristas/{motorista_id}",
+    response_model=ConsumoMotoristaResponse,
+    summary="Consumo diário de um motorista",
+)
+async def get_consumo_motorista(
+    motorista_id: int,
+    inicio: date | None = Query(None, description="Primeiro dia (inclusivo)"),
+    fim: date | None = Query(None, description="Último dia (inclusivo)"),
+    session: AsyncSession = Depends(get_session),
+) -> ConsumoMotoristaResponse:
+    """
+    Get the consumption totals and daily breakdown of a motorista.
+
+    Reads the pre-aggregated consumo_diario table, so the cost depends on the
+    number of days in the range rather than on the number of refills.
+
+    Args:
+        motorista_id: Motorista ID
+        inicio: First local day of the range (inclusive)
+        fim: Last local day of the range (inclusive)
+        session: Database session
+
+    Returns:
+        Totals over the range and one entry per day with refills
+
+    Raises:
+        HTTPException: If the range is invalid or the motorista is not found
+    """
+    _check_range(inicio, fim)
+
+    motorista = await MotoristaRepository(session).get_by_id(motorista_id)
+    if not motorista:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Motorista não encontrado",
+        )
+
+    repository = ConsumoRepository(session)
+    totals = await repository.get_totals_by_motorista(motorista_id, inicio, fim)
+    days = await repository.get_days_by_motorista(motorista_id, inicio, fim)
+
+    return ConsumoMotoristaResponse(
+        motorista_id=motorista_id,
+        inicio=inicio,
+        fim=fim,
+        resumo=ConsumoTotais.model_validate(totals),
+        dias=[ConsumoDiaResponse.model_validate(day) for day in days],
+    )
+
+
+@router.get(
+    "/dias",
+    response_model=ConsumoFrotaResponse,
+    summary="Consumo diário da frota",
+)
+async def get_consumo_frota(
+    inicio: date | None = Query(
+        None, description=f"Primeiro dia (inclusivo, padrão: {DEFAULT_FLEET_DAYS} dias atrás)"
+    ),
+    fim: date | None = Query(None, description="Último dia (inclusivo, padrão: hoje)"),
+    session: AsyncSession = Depends(get_session),
+) -> ConsumoFrotaResponse:
+    """
+    Get fleet-wide consumption totals per day.
+
+    Args:
+        inicio: First local day of the range (inclusive)
+        fim: Last local day of the range (inclusive)
+        session: Database session
+
+    Returns:
+        Totals over the range and one entry per day with refills
+
+    Raises:
+        HTTPException: If the range is invalid or longer than MAX_FLEET_DAYS
+    """
+    if fim is None:
+        fim = local_date(datetime.utcnow())
+    if inicio is None:
+        inicio = fim - timedelta(days=DEFAULT_FLEET_DAYS - 1)
+    _check_range(inicio, fim)
+    if (fim - inicio).days >= MAX_FLEET_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"O período deve ter no máximo {MAX_FLEET_DAYS} dias",
+        )
+
+    repository = ConsumoRepository(session)
+    totals = await repository.get_fleet_totals(inicio, fim)
+    days = await repository.get_fleet_days(inicio, fim)
+
+    return ConsumoFrotaResponse(
+        inicio=inicio,
+        fim=fim,
+        resumo=ConsumoTotais.model_validate(totals),
+        dias=[ConsumoDiaResponse.model_validate(day) for day in days],
+    )
@@ -0,0 +1,79 @@
+"""Change feed of abastecimento events"""
+
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_session
+from app.domain.schemas.evento import EventoFeedResponse, EventoResponse
+from app.services.event_feed import event_feed
+
+router = APIRouter(prefix="/api/v1/abastecimentos/eventos", tags=["eventos"])
+
+MAX_WAIT_SECONDS = 60
+
+
+@router.get(
+    "",
+    response_model=EventoFeedResponse,
+    summary="Eventos de abastecimentos após um seq (long polling)",
+)
+async def list_eventos(
+    apos: int = Query(0, ge=0, description="Último seq já processado"),
+    limite: int = Query(100, ge=1, le=1000),
+    espera: float = Query(
+        0, ge=0, le=MAX_WAIT_SECONDS, description="Segundos a aguardar por novos eventos"
+    ),
+    session: AsyncSession = Depends(get_session),
+) -> EventoFeedResponse:
+    """
+    Get the events with seq greater than apos, oldest first.
+
+    Every create, scoring, approval and rejection of an abastecimento writes
+    one event in the same transaction, so following the feed from the last
+    seq seen replaces rescanning the abastecimentos table. With espera > 0
+    the request waits until an event arrives (long polling).
+
+    Args:
+        apos: Last seq already processed (0 for the start of the feed)
+        limite: Maximum number of events
+        espera: Seconds to wait when there are no events yet
+        session: Database session
+
+    Returns:
+        Events and the seq to continue from
+    """
+    eventos = await event_feed.read(session, apos, limite, espera)
+    return EventoFeedResponse(
+        eventos=[EventoResponse.model_validate(evento) for evento in eventos],
+        ultimo_seq=eventos[-1].seq if eventos else apos,
+    )
+
+
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+    summary="Eventos de abastecimentos (Server-Sent Events)",
+)
+async def stream_eventos(
+    apos: int = Query(0, ge=0, description="Último seq já processado"),
+    last_event_id: int | None = Header(None, ge=0),
+) -> StreamingResponse:
+    """
+    Stream the events with seq greater than apos as Server-Sent Events.
+
+    Each event's SSE id is its seq; on reconnection the Last-Event-ID header
+    sent by the client takes precedence over apos.
+
+    Args:
+        apos: Last seq already processed (0 for the start of the feed)
+        last_event_id: Last-Event-ID header
+
+    Returns:
+        Never-ending text/event-stream response
+    """
+    return StreamingResponse(
+        event_feed.stream(last_event_id if last_event_id is not None else apos),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
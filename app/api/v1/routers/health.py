@@ -1,6 +1,10 @@
 """Health check endpoint"""
 
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import CONTENT_TYPE, registry
+from app.services.motorista_cache import motorista_cache
 
 router = APIRouter(tags=["health"])
 
@@ -14,3 +18,25 @@ async def health_check() -> dict[str, str]:
         Status of the API
     """
     return {"status": "healthy"}
+
+
+@router.get("/health/cache", summary="Cache Metrics")
+async def cache_metrics() -> dict[str, dict[str, int | float]]:
+    """
+    Hit/miss metrics of the in-process caches.
+
+    Returns:
+        Metrics per cache
+    """
+    return {"motoristas": motorista_cache.metrics()}
+
+
+@router.get("/metrics", summary="Prometheus Metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """
+    Request, database and cache metrics in the Prometheus text format.
+
+    Returns:
+        Metrics of this process
+    """
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
@@ -1,16 +1,24 @@
 """Motorista endpoints"""
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import get_session
+from app.domain.exceptions import MotoristaDuplicadoError
+from app.domain.schemas.abastecimento import AbastecimentoResponse
+from app.domain.schemas.consumo import ConsumoTotais
 from app.domain.schemas.motorista import (
     MotoristaCreate,
+    MotoristaPerfilResponse,
     MotoristaResponse,
     MotoristaUpdate,
 )
-from app.domain.validators.cpf import validate_cpf
+from app.repositories.consumo_repository import ConsumoRepository
 from app.repositories.motorista_repository import MotoristaRepository
+from app.services.motorista_cache import motorista_cache
+from app.services.motorista_import import FormatoImportacao, parse_rows, stream_import
 
 router = APIRouter(prefix="/api/v1/motoristas", tags=["motoristas"])
 
@@ -36,36 +44,110 @@ async def create_motorista(
         Created motorista
 
     Raises:
-        HTTPException: If CPF is invalid or already exists
+        HTTPException: If the CPF or the email already exists (409, with
+            distinct messages)
     """
-    # Validate CPF
-    if not validate_cpf(motorista.cpf):
+    # The CPF was validated and normalized to its 11 digits by MotoristaCreate.
+    # No existence check first: the insert itself reports duplicates, so
+    # concurrent requests cannot both create the same motorista.
+    repository = MotoristaRepository(session)
+    try:
+        created = await repository.create_unique(motorista.model_dump())
+    except MotoristaDuplicadoError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    return MotoristaResponse.model_validate(created)
+
+
+@router.post(
+    "/import",
+    response_class=StreamingResponse,
+    summary="Importar motoristas em massa (CSV ou NDJSON)",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "text/csv": {"schema": {"type": "string"}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def import_motoristas(request: Request) -> StreamingResponse:
+    """
+    Import many motoristas from a CSV or NDJSON file.
+
+    The body is a CSV file with a header (nome, cpf, email, telefone) sent
+    as text/csv, or NDJSON sent as application/x-ndjson. The response is
+    NDJSON streamed while the import runs: one "progresso" line per chunk of
+    rows written, then a "resultado" line with the counts and the error of
+    each row that was not imported (invalid, repeated in the file or
+    already registered).
+
+    Args:
+        request: Incoming request with the file as body
+
+    Returns:
+        Streaming NDJSON progress and result
+
+    Raises:
+        HTTPException: If the format is not supported, the file cannot be
+            read or it has too many rows
+    """
+    formato = FormatoImportacao.from_media_type(request.headers.get("content-type", ""))
+    if formato is None:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="CPF inválido",
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Envie o arquivo como text/csv ou application/x-ndjson",
         )
-
-    # Check if motorista already exists
-    repository = MotoristaRepository(session)
-    existing = await repository.get_by_cpf(motorista.cpf)
-    if existing:
+    try:
+        rows = parse_rows(await request.body(), formato)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    if len(rows) > settings.motorista_import_max_items:
         raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Motorista com este CPF já existe",
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"O arquivo excede o limite de {settings.motorista_import_max_items} registros",
         )
 
-    # Create motorista
-    from app.domain.models.motorista import Motorista
-
-    new_motorista = Motorista(
-        nome=motorista.nome,
-        cpf=motorista.cpf,
-        email=motorista.email,
-        telefone=motorista.telefone,
+    return StreamingResponse(
+        stream_import(rows, settings.motorista_import_chunk_size),
+        media_type="application/x-ndjson",
     )
 
-    created = await repository.create(new_motorista)
-    return MotoristaResponse.model_validate(created)
+
+@router.get(
+    "/busca",
+    response_model=list[MotoristaResponse],
+    summary="Buscar motoristas por nome, email, CPF ou telefone",
+)
+async def search_motoristas(
+    q: str = Query(
+        ...,
+        min_length=2,
+        max_length=100,
+        description="Início do nome (ou de palavras dele), do email, do CPF ou do telefone",
+    ),
+    limite: int = Query(10, ge=1, le=50),
+    session: AsyncSession = Depends(get_session),
+) -> list[MotoristaResponse]:
+    """
+    Search motoristas, for autocomplete.
+
+    A term with "@" is an email prefix, a term with only digits (CPF or
+    phone formatting allowed) a CPF or telefone prefix, and anything else
+    words that start words of the name, accents ignored.
+
+    Args:
+        q: Search term
+        limite: Maximum number of results
+        session: Database session
+
+    Returns:
+        Matching motoristas, ordered by name
+    """
+    repository = MotoristaRepository(session)
+    motoristas = await repository.search(q, limite)
+    return [MotoristaResponse.model_validate(motorista) for motorista in motoristas]
 
 
 @router.get(
@@ -102,6 +184,54 @@ async def get_motorista(
     return MotoristaResponse.model_validate(motorista)
 
 
+@router.get(
+    "/{motorista_id}/perfil",
+    response_model=MotoristaPerfilResponse,
+    summary="Obter motorista com seus últimos abastecimentos e totais",
+)
+async def get_motorista_perfil(
+    motorista_id: int,
+    ultimos: int = Query(10, ge=1, le=100, description="Número de abastecimentos recentes"),
+    session: AsyncSession = Depends(get_session),
+) -> MotoristaPerfilResponse:
+    """
+    Get a motorista with its latest refills and all-time totals.
+
+    Replaces fetching the motorista and then paging through its refills:
+    the response always costs two queries, one for the motorista joined to
+    its latest refills and one for the totals from the daily aggregates.
+
+    Args:
+        motorista_id: Motorista ID
+        ultimos: Number of latest refills to include
+        session: Database session
+
+    Returns:
+        Motorista, latest refills (newest first) and totals
+
+    Raises:
+        HTTPException: If motorista not found
+    """
+    motorista = await MotoristaRepository(session).get_with_recent_refills(motorista_id, ultimos)
+
+    if not motorista:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Motorista não encontrado",
+        )
+
+    totals = await ConsumoRepository(session).get_totals_by_motorista(motorista_id)
+
+    return MotoristaPerfilResponse(
+        motorista=MotoristaResponse.model_validate(motorista),
+        ultimos_abastecimentos=[
+            AbastecimentoResponse.model_validate(abastecimento)
+            for abastecimento in motorista.abastecimentos
+        ],
+        resumo=ConsumoTotais.model_validate(totals),
+    )
+
+
 @router.get(
     "",
     summary="Listar motoristas",
@@ -175,4 +305,5 @@ async def update_motorista(
         setattr(motorista, field, value)
 
     updated = await repository.update(motorista)
+    await motorista_cache.invalidate(motorista_id)
     return MotoristaResponse.model_validate(updated)
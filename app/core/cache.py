@@ -0,0 +1,103 @@
+"""In-process caching utilities"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+
+class CacheBackend(Protocol):
+    """
+    Shared cache backend (e.g. Redis or Memcached) used behind a local cache.
+
+    Values are strings so any key-value store can implement it.
+    """
+
+    async def get(self, key: str) -> str | None:
+        """Return the cached value or None"""
+        ...
+
+    async def get_many(self, keys: list[str]) -> list[str | None]:
+        """Return the cached value or None for each key, in one round trip (e.g. MGET)"""
+        ...
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        """Store a value for ttl seconds"""
+        ...
+
+    async def set_many(self, items: dict[str, str], ttl: float) -> None:
+        """Store several values for ttl seconds, in one round trip (e.g. a pipeline)"""
+        ...
+
+    async def delete(self, key: str) -> None:
+        """Remove a value"""
+        ...
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters of a cache"""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after a fixed time to live.
+
+    Not thread-safe; intended for use from a single event loop.
+    """
+
+    def __init__(
+        self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic
+    ):
+        """Initialize an empty cache"""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry (refreshing its LRU position) or default"""
+        entry = self._data.get(key, _MISSING)
+        if entry is not _MISSING:
+            expires_at, value = entry
+            if expires_at > self._clock():
+                self._data.move_to_end(key)
+                self.stats.hits += 1
+                return value
+            del self._data[key]
+        self.stats.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store an entry, evicting the least recently used one if full"""
+        self._data[key] = (self._clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Remove an entry if present"""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        self._data.clear()
@@ -1,5 +1,12 @@
 """Database configuration and session management"""
 
+import time
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import event, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DisconnectionError
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
@@ -8,6 +15,8 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.orm import DeclarativeBase
 
 from app.core.config import settings
+from app.core.instrumentation import InstrumentedQueuePool, instrument_engine
+from app.core.logging import logger
 
 
 class Base(DeclarativeBase):
@@ -15,15 +24,96 @@ class Base(DeclarativeBase):
     pass
 
 
+def pool_size_per_worker(max_connections: int, workers: int, max_overflow: int) -> int:
+    """
+    Pool size that keeps every worker within a connection budget.
+
+    Each worker process can hold pool_size + max_overflow connections, so
+    workers * (pool_size + max_overflow) must not exceed max_connections
+    (the share of PostgreSQL's max_connections given to this application).
+
+    Args:
+        max_connections: Connections available to all workers together
+        workers: Number of worker processes
+        max_overflow: Overflow connections allowed per worker
+
+    Returns:
+        Pool size per worker (at least 1)
+    """
+    return max(1, max_connections // max(1, workers) - max_overflow)
+
+
+def _connect_args() -> dict[str, Any]:
+    """asyncpg connection arguments for the prepared statement settings"""
+    if make_url(settings.database_url).get_driver_name() != "asyncpg":
+        return {}
+    if settings.db_prepared_statement_cache:
+        return {"prepared_statement_cache_size": settings.db_prepared_statement_cache_size}
+    # Unique names, so statements prepared on a server connection that
+    # PgBouncer hands to another client never clash
+    return {
+        "prepared_statement_cache_size": 0,
+        "statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
+
+def ping_idle_connections(engine: Engine, idle_seconds: float) -> None:
+    """
+    Check connections unused for idle_seconds when they are checked out.
+
+    pool_pre_ping costs a round trip on every checkout; connections in
+    steady use are known to be alive, and only those left idle long enough
+    to have been dropped (server restart, firewall or PgBouncer timeouts)
+    are pinged. A failed ping makes the pool replace the connection.
+
+    Args:
+        engine: Synchronous engine (AsyncEngine.sync_engine for async engines)
+        idle_seconds: Idle time after which a connection is pinged
+    """
+
+    @event.listens_for(engine, "checkin")
+    def _mark_idle(dbapi_connection, connection_record):
+        connection_record.info["idle_since"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        idle_since = connection_record.info.pop("idle_since", None)
+        if idle_since is None or time.monotonic() - idle_since < idle_seconds:
+            return
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception as exc:
+            raise DisconnectionError("Idle connection failed the liveness check") from exc
+
+
+pool_size = settings.db_pool_size or pool_size_per_worker(
+    settings.db_max_connections, settings.web_concurrency, settings.db_max_overflow
+)
+
 # Create async engine
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
     future=True,
-    pool_pre_ping=True,
-    pool_size=20,
-    max_overflow=0,
+    pool_pre_ping=settings.db_pool_pre_ping == "always",
+    poolclass=InstrumentedQueuePool,
+    pool_size=pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout_seconds,
+    pool_recycle=settings.db_pool_recycle_seconds or -1,
+    connect_args=_connect_args(),
 )
+instrument_engine(engine.sync_engine, settings.slow_query_threshold_ms)
+if settings.db_pool_pre_ping == "idle":
+    ping_idle_connections(engine.sync_engine, settings.db_pool_pre_ping_idle_seconds)
+
+if (pool_size + settings.db_max_overflow) * settings.web_concurrency > settings.db_max_connections:
+    logger.warning(
+        f"{settings.web_concurrency} workers with pool_size={pool_size} and "
+        f"max_overflow={settings.db_max_overflow} can open more than "
+        f"DB_MAX_CONNECTIONS={settings.db_max_connections} connections"
+    )
 
 # Create async session factory
 async_session_maker = async_sessionmaker(
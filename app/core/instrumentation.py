@@ -0,0 +1,125 @@
+"""Database instrumentation: query timing, slow query log and pool checkout timing"""
+
+import re
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+from app.core.logging import logger
+from app.core.metrics import (
+    CallbackMetric,
+    current_request_stats,
+    db_pool_checkout_duration,
+    db_pool_checkout_timeouts,
+    db_query_duration,
+    db_slow_queries,
+    registry,
+)
+
+# Quoted strings and bare numbers (not bind placeholders like $1 or :name)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$:.])\d+(?:\.\d+)?\b")
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long each checkout waits, per request too"""
+
+    def connect(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            db_pool_checkout_timeouts.inc()
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            db_pool_checkout_duration.observe(elapsed)
+            stats = current_request_stats.get()
+            if stats is not None:
+                stats.pool_wait_seconds += elapsed
+
+
+def redact_sql(statement: str) -> str:
+    """Replace literal values in a SQL statement with '?', on a single line"""
+    statement = _STRING_LITERAL.sub("'?'", " ".join(statement.split()))
+    return _NUMBER_LITERAL.sub("?", statement)
+
+
+def _describe_parameters(parameters: Any) -> str:
+    """Parameter types only, so values (CPFs, emails...) never reach the logs"""
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, list) and parameters and isinstance(parameters[0], (tuple, dict)):
+        return f"{len(parameters)} x {_describe_parameters(parameters[0])}"
+    if isinstance(parameters, (tuple, list)):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+def instrument_engine(engine: Engine, slow_query_threshold_ms: float | None = None) -> None:
+    """
+    Attach query timing to an engine and publish its pool usage.
+
+    Every query is timed and added to the current request's RequestStats
+    (when running inside a request). Queries slower than
+    slow_query_threshold_ms are logged with literals and parameter values
+    redacted; None disables the slow query log.
+
+    Args:
+        engine: Synchronous engine (AsyncEngine.sync_engine for async engines)
+        slow_query_threshold_ms: Slow query threshold in milliseconds, or None
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        db_query_duration.observe(elapsed)
+
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+        if slow_query_threshold_ms is not None and elapsed * 1000 >= slow_query_threshold_ms:
+            db_slow_queries.inc()
+            logger.warning(
+                f"Slow query ({elapsed * 1000:.1f} ms): {redact_sql(statement)} "
+                f"params={_describe_parameters(parameters)}"
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def _discard_timer(context):
+        # Failed queries never reach after_cursor_execute
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            started.pop()
+
+    pool = engine.pool
+    registry.register(
+        CallbackMetric(
+            "db_pool_connections",
+            "Connections of the database pool by state",
+            lambda: _pool_state(pool),
+            ("state",),
+        )
+    )
+
+
+def _pool_state(pool: Pool) -> dict[tuple[str, ...], float]:
+    """Current pool usage, for the db_pool_connections gauge"""
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return {}
+    return {
+        ("size",): pool.size(),
+        ("checked_out",): pool.checkedout(),
+        ("checked_in",): pool.checkedin(),
+        ("overflow",): pool.overflow(),
+    }
@@ -0,0 +1,65 @@
+"""HTTP middlewares"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import (
+    RequestStats,
+    current_request_stats,
+    http_request_db_duration,
+    http_request_duration,
+    http_request_pool_wait,
+    http_request_queries,
+)
+
+
+class MetricsMiddleware:
+    """
+    Record latency, status and database work of every HTTP request.
+
+    Implemented as a plain ASGI middleware so that streaming responses are
+    timed until their last chunk, and labelled with the matched route
+    template (e.g. /api/v1/abastecimentos/{abastecimento_id}) to keep label
+    cardinality bounded.
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: frozenset[str] = frozenset({"/metrics"})):
+        """Wrap an ASGI app"""
+        self.app = app
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_stats.reset(token)
+
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            http_request_duration.observe(
+                elapsed, method=method, route=route_path, status=str(status_code)
+            )
+            http_request_queries.observe(stats.queries, method=method, route=route_path)
+            http_request_db_duration.observe(stats.db_seconds, method=method, route=route_path)
+            http_request_pool_wait.observe(
+                stats.pool_wait_seconds, method=method, route=route_path
+            )
@@ -0,0 +1,28 @@
+"""Timezone helpers"""
+
+from datetime import date, datetime
+
+import pytz
+
+from app.core.config import settings
+
+local_timezone = pytz.timezone(settings.timezone)
+
+
+def to_local(value: datetime) -> datetime:
+    """Convert a datetime to the fleet's local timezone (naive values are UTC)"""
+    if value.tzinfo is None:
+        value = pytz.utc.localize(value)
+    return value.astimezone(local_timezone)
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Convert a datetime to naive UTC, comparable with datetime.utcnow()"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(pytz.utc).replace(tzinfo=None)
+
+
+def local_date(value: datetime) -> date:
+    """Calendar day of a datetime in the fleet's local timezone"""
+    return to_local(value).date()
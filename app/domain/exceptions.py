@@ -0,0 +1,18 @@
+"""Domain exceptions"""
+
+
+class TransicaoInvalidaError(Exception):
+    """Raised when a refill cannot move from its current status to the requested one"""
+
+    def __init__(self, origem: str, destino: str):
+        self.origem = str(getattr(origem, "value", origem))
+        self.destino = str(getattr(destino, "value", destino))
+        super().__init__(f"Transição inválida: {self.origem} -> {self.destino}")
+
+
+class MotoristaDuplicadoError(Exception):
+    """Raised when a motorista's CPF or email is already registered"""
+
+    def __init__(self, campo: str):
+        self.campo = campo
+        super().__init__(f"Motorista com este {'CPF' if campo == 'cpf' else campo} já existe")
@@ -1,6 +1,15 @@
 """Domain models"""
 
 from app.domain.models.abastecimento import Abastecimento
+from app.domain.models.consumo import ConsumoDiario
+from app.domain.models.evento import EventoAbastecimento
+from app.domain.models.idempotencia import ChaveIdempotencia
 from app.domain.models.motorista import Motorista
 
-__all__ = ["Abastecimento", "Motorista"]
+__all__ = [
+    "Abastecimento",
+    "ChaveIdempotencia",
+    "ConsumoDiario",
+    "EventoAbastecimento",
+    "Motorista",
+]
@@ -1,34 +1,55 @@
 """Abastecimento model"""
 
 from datetime import datetime
+from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, Float, ForeignKey, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import JSON, DateTime, Float, ForeignKey, Index, Numeric, String, text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
 from app.domain.models.enums import StatusAbastecimento, TipoCombustivel
 
+if TYPE_CHECKING:
+    from app.domain.models.motorista import Motorista
+
 
 class Abastecimento(Base):
     """Abastecimento (Fuel Refill) model"""
 
     __tablename__ = "abastecimentos"
+    __table_args__ = (
+        Index("ix_abastecimentos_motorista_id_data", "motorista_id", "data_abastecimento"),
+        Index("ix_abastecimentos_status_data", "status", "data_abastecimento"),
+        # Small index over the refills still waiting for async scoring
+        Index(
+            "ix_abastecimentos_nao_pontuados",
+            "id",
+            postgresql_where=text("pontuado_em IS NULL"),
+            sqlite_where=text("pontuado_em IS NULL"),
+        ),
+    )
 
+    # On PostgreSQL the table is partitioned by month of data_abastecimento
+    # (migration 0008) and its primary key is (id, data_abastecimento)
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    motorista_id: Mapped[int] = mapped_column(
-        ForeignKey("motoristas.id"), nullable=False, index=True
-    )
+    motorista_id: Mapped[int] = mapped_column(ForeignKey("motoristas.id"), nullable=False)
     tipo_combustivel: Mapped[str] = mapped_column(String(50), nullable=False)
-    valor: Mapped[float] = mapped_column(Float, nullable=False)
-    litros: Mapped[float] = mapped_column(Float, nullable=False)
+    # Fixed point (centavos and millilitres), so sums in the database are
+    # exact; values are loaded as float
+    valor: Mapped[float] = mapped_column(Numeric(12, 2, asdecimal=False), nullable=False)
+    litros: Mapped[float] = mapped_column(Numeric(10, 3, asdecimal=False), nullable=False)
     status: Mapped[str] = mapped_column(
         String(50),
         nullable=False,
         default=StatusAbastecimento.PENDENTE,
-        index=True,
     )
     motivo_recusa: Mapped[str | None] = mapped_column(String(500), nullable=True)
     eh_anomalia: Mapped[bool] = mapped_column(default=False, index=True)
+    # Weighted score and fired rules from the anomaly rule engine
+    pontuacao_anomalia: Mapped[float | None] = mapped_column(Float, nullable=True)
+    regras_anomalia: Mapped[list[dict] | None] = mapped_column(JSON, nullable=True)
+    # When anomaly rules were evaluated (None: still queued for async scoring)
+    pontuado_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     data_abastecimento: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=datetime.utcnow, index=True
     )
@@ -42,5 +63,8 @@ class Abastecimento(Base):
         onupdate=datetime.utcnow,
     )
 
+    # Not loaded implicitly either (see Motorista.abastecimentos)
+    motorista: Mapped["Motorista"] = relationship(back_populates="abastecimentos", lazy="raise")
+
     def __repr__(self) -> str:
         return f"<Abastecimento(id={self.id}, motorista_id={self.motorista_id}, status={self.status})>"
@@ -0,0 +1,41 @@
+"""Consumption aggregate models"""
+
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, ForeignKey, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class ConsumoDiario(Base):
+    """
+    Daily consumption summary of a motorista.
+
+    One row per (motorista_id, dia), dia being the local calendar day of
+    data_abastecimento. Maintained incrementally by AbastecimentoService.
+    """
+
+    __tablename__ = "consumo_diario"
+
+    motorista_id: Mapped[int] = mapped_column(ForeignKey("motoristas.id"), primary_key=True)
+    dia: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    quantidade: Mapped[int] = mapped_column(nullable=False, default=0)
+    total_litros: Mapped[float] = mapped_column(
+        Numeric(14, 3, asdecimal=False), nullable=False, default=0.0
+    )
+    total_valor: Mapped[float] = mapped_column(
+        Numeric(14, 2, asdecimal=False), nullable=False, default=0.0
+    )
+    quantidade_anomalias: Mapped[int] = mapped_column(nullable=False, default=0)
+    quantidade_aprovados: Mapped[int] = mapped_column(nullable=False, default=0)
+    quantidade_recusados: Mapped[int] = mapped_column(nullable=False, default=0)
+    atualizado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
+
+    def __repr__(self) -> str:
+        return f"<ConsumoDiario(motorista_id={self.motorista_id}, dia={self.dia})>"
@@ -17,3 +17,30 @@ class TipoCombustivel(str, Enum):
     DIESEL = "diesel"
     ETANOL = "etanol"
     GNV = "gnv"
+
+
+class TipoEvento(str, Enum):
+    """Types of abastecimento change events"""
+    CRIADO = "criado"
+    PONTUADO = "pontuado"
+    APROVADO = "aprovado"
+    RECUSADO = "recusado"
+
+
+# Review state machine: pending and anomalous refills can be approved or
+# rejected; a reviewed refill is final
+TRANSICOES_STATUS: dict[StatusAbastecimento, frozenset[StatusAbastecimento]] = {
+    StatusAbastecimento.PENDENTE: frozenset(
+        {StatusAbastecimento.APROVADO, StatusAbastecimento.RECUSADO}
+    ),
+    StatusAbastecimento.ANOMALIA: frozenset(
+        {StatusAbastecimento.APROVADO, StatusAbastecimento.RECUSADO}
+    ),
+    StatusAbastecimento.APROVADO: frozenset(),
+    StatusAbastecimento.RECUSADO: frozenset(),
+}
+
+
+def origens_permitidas(destino: StatusAbastecimento) -> list[StatusAbastecimento]:
+    """Statuses from which a refill may move to destino"""
+    return [origem for origem, destinos in TRANSICOES_STATUS.items() if destino in destinos]
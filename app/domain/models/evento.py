@@ -0,0 +1,46 @@
+"""Abastecimento change event model"""
+
+from datetime import datetime
+
+from sqlalchemy import JSON, BigInteger, DateTime, Index, Integer, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class EventoAbastecimento(Base):
+    """
+    Change event of an abastecimento (transactional outbox).
+
+    Written in the same transaction as the change it describes. seq orders
+    the events and is the position consumers of the change feed resume from;
+    it is assigned after the commit, by EventoRepository.assign_seqs.
+    """
+
+    __tablename__ = "eventos_abastecimento"
+    __table_args__ = (
+        Index("ix_eventos_abastecimento_seq", "seq", unique=True),
+        # Small index over the events still waiting for their seq
+        Index(
+            "ix_eventos_abastecimento_sem_seq",
+            "id",
+            postgresql_where=text("seq IS NULL"),
+            sqlite_where=text("seq IS NULL"),
+        ),
+    )
+
+    # SQLite only autoincrements INTEGER primary keys
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    seq: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    abastecimento_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    motorista_id: Mapped[int] = mapped_column(nullable=False)
+    tipo: Mapped[str] = mapped_column(String(20), nullable=False)
+    dados: Mapped[dict] = mapped_column(JSON, nullable=False)
+    criado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=datetime.utcnow
+    )
+
+    def __repr__(self) -> str:
+        return f"<EventoAbastecimento(seq={self.seq}, tipo={self.tipo})>"
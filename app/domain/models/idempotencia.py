@@ -0,0 +1,33 @@
+"""Idempotency key model"""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class ChaveIdempotencia(Base):
+    """
+    Response recorded for an Idempotency-Key, replayed to retries of the request.
+
+    status_code is NULL while the first request is still being processed.
+    The body is stored zlib-compressed.
+    """
+
+    __tablename__ = "chaves_idempotencia"
+
+    chave: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # SHA-256 of method, path, query string and body of the first request
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    content_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    corpo: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    criado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=datetime.utcnow
+    )
+    expira_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<ChaveIdempotencia(chave={self.chave}, status_code={self.status_code})>"
@@ -1,18 +1,25 @@
 """Motorista model"""
 
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 from sqlalchemy import DateTime, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
 
+if TYPE_CHECKING:
+    from app.domain.models.abastecimento import Abastecimento
+
 
 class Motorista(Base):
     """Motorista (Driver) model"""
 
     __tablename__ = "motoristas"
 
+    # On PostgreSQL migration 0010 also adds nome_busca, a generated tsvector
+    # of the name's word prefixes, and the indexes used by the search
+
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     nome: Mapped[str] = mapped_column(String(255), nullable=False)
     cpf: Mapped[str] = mapped_column(String(11), nullable=False, unique=True, index=True)
@@ -29,5 +36,13 @@ class Motorista(Base):
         onupdate=datetime.utcnow,
     )
 
+    # A motorista can have years of refills, so the collection is never
+    # loaded implicitly: lazy="raise" turns an accidental per-row load (an
+    # N+1 query) into an error. Load it with an explicit, limited query such
+    # as MotoristaRepository.get_with_recent_refills.
+    abastecimentos: Mapped[list["Abastecimento"]] = relationship(
+        back_populates="motorista", lazy="raise", passive_deletes=True
+    )
+
     def __repr__(self) -> str:
         return f"<Motorista(id={self.id}, nome={self.nome}, cpf={self.cpf})>"
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
 
 from app.domain.models.enums import StatusAbastecimento, TipoCombustivel
 
@@ -16,10 +16,29 @@ class AbastecimentoBase(BaseModel):
     litros: float = Field(..., gt=0, description="Litros abastecidos")
 
 
+# Decimal places stored for each quantity (centavos and millilitres)
+CASAS_DECIMAIS = {"valor": 2, "litros": 3}
+
+
 class AbastecimentoCreate(AbastecimentoBase):
     """Schema for creating a new Abastecimento"""
 
-    pass
+    @field_validator("valor", "litros")
+    @classmethod
+    def round_to_stored_scale(cls, value: float, info: ValidationInfo) -> float:
+        """Round to the stored scale, so the response matches what was saved"""
+        rounded = round(value, CASAS_DECIMAIS[info.field_name])
+        if rounded <= 0:
+            raise ValueError(f"{info.field_name} deve ser maior que zero após o arredondamento")
+        return rounded
+
+
+class RegraAnomaliaDisparada(BaseModel):
+    """Anomaly rule that fired for an Abastecimento"""
+
+    regra: str = Field(..., description="Identificador da regra")
+    tipo: str = Field(..., description="Tipo da regra")
+    pontuacao: float = Field(..., description="Pontuação da regra (0.0 a 1.0), antes do peso")
 
 
 class AbastecimentoResponse(AbastecimentoBase):
@@ -29,6 +48,15 @@ class AbastecimentoResponse(AbastecimentoBase):
     status: StatusAbastecimento
     motivo_recusa: str | None
     eh_anomalia: bool
+    pontuacao_anomalia: float | None = Field(
+        None, description="Pontuação ponderada das regras de anomalia"
+    )
+    regras_anomalia: list[RegraAnomaliaDisparada] | None = Field(
+        None, description="Regras de anomalia que dispararam"
+    )
+    pontuado_em: datetime | None = Field(
+        None, description="Quando as regras de anomalia foram avaliadas (nulo: na fila)"
+    )
     data_abastecimento: datetime
     criado_em: datetime
     atualizado_em: datetime
@@ -45,3 +73,64 @@ class AbastecimentoListResponse(BaseModel):
     pagina: int
     tamanho_pagina: int
     total_paginas: int
+    total_estimado: bool = Field(
+        False, description="Indica que total e total_paginas são estimativas"
+    )
+
+
+class AbastecimentoCursorResponse(BaseModel):
+    """Schema for keyset-paginated Abastecimento list"""
+
+    items: list[AbastecimentoResponse]
+    tamanho_pagina: int
+    proximo_cursor: str | None = Field(
+        None, description="Cursor opaco da próxima página (nulo na última página)"
+    )
+
+
+class AbastecimentoBatchItemResult(BaseModel):
+    """Result for one record of a batch ingestion"""
+
+    indice: int = Field(..., description="Posição do registro no lote (0-indexed)")
+    sucesso: bool
+    abastecimento: AbastecimentoResponse | None = None
+    erro: str | None = None
+
+
+class AbastecimentoBatchResponse(BaseModel):
+    """Schema for batch ingestion results"""
+
+    total: int
+    criados: int
+    falhas: int
+    resultados: list[AbastecimentoBatchItemResult]
+
+
+class AbastecimentoAprovacaoLote(BaseModel):
+    """Schema for approving many abastecimentos at once"""
+
+    ids: list[int] = Field(..., min_length=1, description="IDs dos abastecimentos")
+
+
+class AbastecimentoRecusaLote(AbastecimentoAprovacaoLote):
+    """Schema for rejecting many abastecimentos at once"""
+
+    motivo: str = Field(..., min_length=1, max_length=500, description="Motivo da recusa")
+
+
+class AbastecimentoRevisaoItemResult(BaseModel):
+    """Result for one id of a bulk approval or rejection"""
+
+    id: int
+    sucesso: bool
+    abastecimento: AbastecimentoResponse | None = None
+    erro: str | None = None
+
+
+class AbastecimentoRevisaoLoteResponse(BaseModel):
+    """Schema for bulk approval or rejection results"""
+
+    total: int
+    atualizados: int
+    falhas: int
+    resultados: list[AbastecimentoRevisaoItemResult]
@@ -0,0 +1,54 @@
+"""Consumption aggregate schemas for API responses"""
+
+from datetime import date
+
+from pydantic import BaseModel, Field, computed_field
+
+
+class ConsumoTotais(BaseModel):
+    """Consumption totals over a period"""
+
+    quantidade: int = Field(..., description="Número de abastecimentos")
+    total_litros: float = Field(..., description="Total de litros abastecidos")
+    total_valor: float = Field(..., description="Valor total gasto")
+    quantidade_anomalias: int = Field(..., description="Abastecimentos marcados como anomalia")
+    quantidade_aprovados: int = Field(..., description="Abastecimentos aprovados")
+    quantidade_recusados: int = Field(..., description="Abastecimentos recusados")
+
+    @computed_field(description="Preço médio por litro")  # type: ignore[misc]
+    @property
+    def preco_medio_litro(self) -> float:
+        return self.total_valor / self.total_litros if self.total_litros else 0.0
+
+    @computed_field(description="Fração de abastecimentos anômalos")  # type: ignore[misc]
+    @property
+    def taxa_anomalia(self) -> float:
+        return self.quantidade_anomalias / self.quantidade if self.quantidade else 0.0
+
+    class Config:
+        from_attributes = True
+
+
+class ConsumoDiaResponse(ConsumoTotais):
+    """Consumption totals of one day"""
+
+    dia: date
+
+
+class ConsumoMotoristaResponse(BaseModel):
+    """Schema for the consumption of a motorista"""
+
+    motorista_id: int
+    inicio: date | None
+    fim: date | None
+    resumo: ConsumoTotais
+    dias: list[ConsumoDiaResponse]
+
+
+class ConsumoFrotaResponse(BaseModel):
+    """Schema for fleet-wide consumption per day"""
+
+    inicio: date
+    fim: date
+    resumo: ConsumoTotais
+    dias: list[ConsumoDiaResponse]
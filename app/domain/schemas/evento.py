@@ -0,0 +1,31 @@
+"""Abastecimento change event schemas for API responses"""
+
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from app.domain.models.enums import TipoEvento
+
+
+class EventoResponse(BaseModel):
+    """Schema for an abastecimento change event"""
+
+    seq: int = Field(..., description="Posição do evento no feed (crescente)")
+    tipo: TipoEvento = Field(..., description="O que aconteceu com o abastecimento")
+    abastecimento_id: int
+    motorista_id: int
+    dados: dict[str, Any] = Field(..., description="Estado do abastecimento após o evento")
+    criado_em: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class EventoFeedResponse(BaseModel):
+    """Schema for a page of the change feed"""
+
+    eventos: list[EventoResponse]
+    ultimo_seq: int = Field(
+        ..., description="Seq a enviar como 'apos' na próxima consulta"
+    )
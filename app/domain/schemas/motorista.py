@@ -4,6 +4,11 @@ from datetime import datetime
 
 from pydantic import BaseModel, EmailStr, Field
 
+from app.domain.schemas.abastecimento import AbastecimentoResponse
+from app.domain.schemas.consumo import ConsumoTotais
+from app.domain.validators.cpf import CPF
+from app.domain.validators.telefone import Telefone
+
 
 class MotoristaBase(BaseModel):
     """Base schema for Motorista"""
@@ -17,7 +22,16 @@ class MotoristaBase(BaseModel):
 class MotoristaCreate(MotoristaBase):
     """Schema for creating a new Motorista"""
 
-    pass
+    cpf: CPF = Field(
+        ...,
+        max_length=14,
+        description="CPF do motorista, com ou sem pontuação (gravado só com os dígitos)",
+    )
+    telefone: Telefone | None = Field(
+        None,
+        max_length=30,
+        description="Telefone do motorista, com ou sem pontuação (gravado só com os dígitos)",
+    )
 
 
 class MotoristaUpdate(BaseModel):
@@ -25,7 +39,7 @@ class MotoristaUpdate(BaseModel):
 
     nome: str | None = Field(None, min_length=1, max_length=255)
     email: EmailStr | None = Field(None)
-    telefone: str | None = Field(None, max_length=20)
+    telefone: Telefone | None = Field(None, max_length=30)
     ativo: bool | None = Field(None)
 
 
@@ -39,3 +53,38 @@ class MotoristaResponse(MotoristaBase):
 
     class Config:
         from_attributes = True
+
+
+class MotoristaPerfilResponse(BaseModel):
+    """Schema for a motorista with its latest refills and totals"""
+
+    motorista: MotoristaResponse
+    ultimos_abastecimentos: list[AbastecimentoResponse] = Field(
+        ..., description="Abastecimentos mais recentes, do mais novo ao mais antigo"
+    )
+    resumo: ConsumoTotais = Field(..., description="Totais de todos os abastecimentos")
+
+
+class MotoristaImportRegistro(BaseModel):
+    """One row of a motorista import file (CPF and email are checked in batch)"""
+
+    nome: str = Field(..., min_length=1, max_length=255)
+    cpf: str = Field(..., max_length=14)
+    email: str = Field(..., max_length=255)
+    telefone: Telefone | None = Field(None, max_length=30)
+
+
+class MotoristaImportErro(BaseModel):
+    """A row of an import file that was not imported"""
+
+    linha: int = Field(..., description="Linha do arquivo (no CSV, o cabeçalho é a linha 1)")
+    erro: str
+
+
+class MotoristaImportResponse(BaseModel):
+    """Schema for bulk motorista import results"""
+
+    total: int
+    criados: int
+    falhas: int
+    erros: list[MotoristaImportErro]
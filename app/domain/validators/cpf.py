@@ -1,5 +1,67 @@
 """CPF validation utilities"""
 
+from collections.abc import Sequence
+from typing import Annotated
+
+import numpy as np
+from pydantic import AfterValidator
+
+# Characters allowed around the digits: 123.456.789-09, "123 456 789 09"
+_FORMATTING = str.maketrans("", "", ".- \t\n\r")
+
+# Weights of the first nine digits in the first check digit (10..2)
+_WEIGHTS = np.arange(10, 1, -1, dtype=np.int64)
+
+
+def strip_cpf(cpf: str) -> str:
+    """Remove CPF formatting (dots, dash and whitespace)"""
+    if len(cpf) == 11 and cpf.isdigit():
+        return cpf
+    return cpf.translate(_FORMATTING)
+
+
+def _check_digit(total: int) -> int:
+    """Check digit for a weighted digit sum"""
+    remainder = total % 11
+    return 0 if remainder < 2 else 11 - remainder
+
+
+def normalize_cpf(cpf: str) -> str | None:
+    """
+    Strip formatting and validate a CPF in one pass.
+
+    Both check digits come from one loop over the first nine digits: the
+    second weighted sum equals the first plus the plain digit sum plus twice
+    the first check digit.
+
+    Args:
+        cpf: CPF string with or without formatting
+
+    Returns:
+        The 11 digits, or None if the CPF is invalid
+    """
+    cpf = strip_cpf(cpf)
+    if len(cpf) != 11 or not cpf.isascii() or not cpf.isdigit():
+        return None
+
+    digits = cpf.encode()
+    if digits.count(digits[0]) == 11:
+        return None
+
+    weighted = plain = 0
+    weight = 10
+    for digit in digits[:9]:
+        digit -= 48
+        weighted += digit * weight
+        plain += digit
+        weight -= 1
+    first = _check_digit(weighted)
+    if digits[9] - 48 != first:
+        return None
+    if digits[10] - 48 != _check_digit(weighted + plain + 2 * first):
+        return None
+    return cpf
+
 
 def validate_cpf(cpf: str) -> bool:
     """
@@ -19,34 +81,62 @@ def validate_cpf(cpf: str) -> bool:
         >>> validate_cpf("111.111.111-11")
         False
     """
-    # Remove formatting
-    cpf = cpf.replace(".", "").replace("-", "").strip()
+    return normalize_cpf(cpf) is not None
+
 
-    # Check length
-    if len(cpf) != 11 or not cpf.isdigit():
-        return False
+def validate_cpfs(cpfs: Sequence[str]) -> np.ndarray:
+    """
+    Validate many CPFs at once.
 
-    # Check if all digits are the same (invalid CPF)
-    if cpf == cpf[0] * 11:
-        return False
+    Same rules as validate_cpf, with the check digits of every CPF computed
+    together on a (n, 11) digit matrix. Meant for bulk imports.
 
-    # Validate first check digit
-    sum_digits = sum(int(cpf[i]) * (10 - i) for i in range(9))
-    first_digit = 11 - (sum_digits % 11)
-    first_digit = 0 if first_digit > 9 else first_digit
+    Args:
+        cpfs: CPF strings with or without formatting
 
-    if int(cpf[9]) != first_digit:
-        return False
+    Returns:
+        Boolean array, True where the CPF is valid
+    """
+    count = len(cpfs)
+    if count == 0:
+        return np.zeros(0, dtype=bool)
+
+    stripped = [strip_cpf(cpf) for cpf in cpfs]
+    lengths = np.fromiter(map(len, stripped), dtype=np.int64, count=count)
+    # Fixed-width unicode: each character becomes one uint32 code point.
+    # Shorter strings are padded with NUL and longer ones truncated, both
+    # caught by the length and digit checks.
+    digits = (
+        np.array(stripped, dtype="U11").view(np.uint32).reshape(count, 11).astype(np.int64) - 48
+    )
+
+    valid = (lengths == 11) & ((digits >= 0) & (digits <= 9)).all(axis=1)
+    valid &= (digits != digits[:, :1]).any(axis=1)
+
+    weighted = digits[:, :9] @ _WEIGHTS
+    first = 11 - weighted % 11
+    first[first > 9] = 0
+    second = 11 - (weighted + digits[:, :9].sum(axis=1) + 2 * first) % 11
+    second[second > 9] = 0
+    valid &= (digits[:, 9] == first) & (digits[:, 10] == second)
+    return valid
+
+
+def parse_cpf(cpf: str) -> str:
+    """
+    Pydantic validator: normalize a CPF to its 11 digits.
 
-    # Validate second check digit
-    sum_digits = sum(int(cpf[i]) * (11 - i) for i in range(10))
-    second_digit = 11 - (sum_digits % 11)
-    second_digit = 0 if second_digit > 9 else second_digit
+    Raises:
+        ValueError: If the CPF is invalid
+    """
+    normalized = normalize_cpf(cpf)
+    if normalized is None:
+        raise ValueError("CPF inválido")
+    return normalized
 
-    if int(cpf[10]) != second_digit:
-        return False
 
-    return True
+# CPF field accepting formatted input, stored as 11 digits
+CPF = Annotated[str, AfterValidator(parse_cpf)]
 
 
 def format_cpf(cpf: str) -> str:
@@ -59,7 +149,7 @@ def format_cpf(cpf: str) -> str:
     Returns:
         Formatted CPF
     """
-    cpf = cpf.replace(".", "").replace("-", "").strip()
+    cpf = strip_cpf(cpf)
     if len(cpf) != 11:
         raise ValueError("CPF must have 11 digits")
     return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
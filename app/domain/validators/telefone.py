@@ -0,0 +1,39 @@
+"""Telefone validation utilities"""
+
+import re
+from typing import Annotated
+
+from pydantic import AfterValidator
+
+# Characters allowed around the digits: "+55 (11) 98765-4321", "11.98765.4321"
+_FORMATTING = re.compile(r"[\s.\-()/+]")
+
+# Longest telefone stored (motoristas.telefone is VARCHAR(20))
+MAX_DIGITS = 20
+
+
+def strip_telefone(telefone: str) -> str:
+    """Remove telefone formatting (spaces, dots, dashes, parentheses, slash and plus)"""
+    return _FORMATTING.sub("", telefone)
+
+
+def parse_telefone(telefone: str) -> str:
+    """
+    Pydantic validator: normalize a telefone to its digits.
+
+    Stored telefones are digits only, so prefix searches match however the
+    number was typed on either side.
+
+    Raises:
+        ValueError: If anything but digits is left, or the number is too long
+    """
+    digits = strip_telefone(telefone)
+    if not digits or not digits.isascii() or not digits.isdigit():
+        raise ValueError("Telefone inválido")
+    if len(digits) > MAX_DIGITS:
+        raise ValueError(f"Telefone deve ter no máximo {MAX_DIGITS} dígitos")
+    return digits
+
+
+# Telefone field accepting formatted input, stored as digits
+Telefone = Annotated[str, AfterValidator(parse_telefone)]
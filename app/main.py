@@ -5,10 +5,19 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.v1.routers import abastecimentos, health, motoristas
+from app.api.idempotency import IdempotencyMiddleware
+from app.api.v1.routers import abastecimentos, consumo, eventos, health, motoristas
 from app.core.config import settings
-from app.core.database import dispose_db, init_db
+from app.core.database import async_session_maker, dispose_db, init_db
 from app.core.logging import logger
+from app.core.middleware import MetricsMiddleware
+from app.services.abastecimento_service import AbastecimentoService
+from app.services.anomaly_queue import anomaly_queue
+from app.services.anomaly_rules import anomaly_rules
+from app.services.idempotency import idempotency_store
+from app.services.partitions import partition_manager
+from app.services.price_baseline import price_baseline
+from app.services.refill_velocity import refill_velocity
 
 
 @asynccontextmanager
@@ -17,9 +26,25 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up application")
     await init_db()
+    async with async_session_maker() as session:
+        await price_baseline.load(session)
+        await refill_velocity.load(session, anomaly_rules.ruleset.janela_historico)
+    await anomaly_rules.start()
+    if settings.anomaly_async_scoring:
+        await anomaly_queue.start(
+            async_session_maker,
+            lambda session, ids: AbastecimentoService(session).score_pending(ids),
+        )
+    if settings.idempotency_enabled:
+        await idempotency_store.start()
+    await partition_manager.start(async_session_maker)
     yield
     # Shutdown
     logger.info("Shutting down application")
+    await anomaly_queue.stop()
+    await anomaly_rules.stop()
+    await idempotency_store.stop()
+    await partition_manager.stop()
     await dispose_db()
 
 
@@ -41,10 +66,20 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    if settings.idempotency_enabled:
+        app.add_middleware(
+            IdempotencyMiddleware, store=idempotency_store, prefixes=("/api/v1/abastecimentos",)
+        )
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+
     # Include routers
     app.include_router(health.router)
     app.include_router(motoristas.router)
+    # Before abastecimentos, whose /{abastecimento_id} would shadow /eventos
+    app.include_router(eventos.router)
     app.include_router(abastecimentos.router)
+    app.include_router(consumo.router)
 
     logger.info(f"Application configured - Environment: {settings.environment}")
 
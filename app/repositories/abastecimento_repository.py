@@ -1,11 +1,28 @@
 """Abastecimento repository for data access"""
 
-from sqlalchemy import and_, func, select
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import ColumnElement, Row, Select, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.models.abastecimento import Abastecimento
-from app.domain.models.enums import StatusAbastecimento
+from app.domain.models.enums import StatusAbastecimento, TipoCombustivel
 from app.repositories.base import BaseRepository
+from app.repositories.pagination import decode_cursor, encode_cursor
+
+
+@dataclass(frozen=True)
+class AbastecimentoFilters:
+    """Optional filters for listing abastecimentos (None means "any")"""
+
+    motorista_id: int | None = None
+    status: StatusAbastecimento | None = None
+    tipo_combustivel: TipoCombustivel | None = None
+    eh_anomalia: bool | None = None
+    data_inicio: datetime | None = None
+    data_fim: datetime | None = None
 
 
 class AbastecimentoRepository(BaseRepository[Abastecimento]):
@@ -15,6 +32,44 @@ class AbastecimentoRepository(BaseRepository[Abastecimento]):
         """Initialize repository"""
         super().__init__(session, Abastecimento)
 
+    def _build_conditions(
+        self, filters: AbastecimentoFilters | None
+    ) -> list[ColumnElement[bool]]:
+        """
+        Translate filters into WHERE conditions.
+
+        Conditions are plain comparisons on the indexed columns so that the
+        (motorista_id, data_abastecimento) and (status, data_abastecimento)
+        indexes can serve both the filter and the date ordering. The date
+        bounds compare the raw partition key, which lets PostgreSQL skip
+        the monthly partitions outside the range.
+        """
+        if filters is None:
+            return []
+
+        conditions: list[ColumnElement[bool]] = []
+        if filters.motorista_id is not None:
+            conditions.append(self.model.motorista_id == filters.motorista_id)
+        if filters.status is not None:
+            conditions.append(self.model.status == filters.status)
+        if filters.tipo_combustivel is not None:
+            conditions.append(self.model.tipo_combustivel == filters.tipo_combustivel)
+        if filters.eh_anomalia is not None:
+            conditions.append(self.model.eh_anomalia == filters.eh_anomalia)
+        if filters.data_inicio is not None:
+            conditions.append(self.model.data_abastecimento >= filters.data_inicio)
+        if filters.data_fim is not None:
+            conditions.append(self.model.data_abastecimento < filters.data_fim)
+        return conditions
+
+    def _filtered_query(self, filters: AbastecimentoFilters | None) -> Select:
+        """Build a SELECT with filters applied, newest first"""
+        return (
+            select(self.model)
+            .where(*self._build_conditions(filters))
+            .order_by(self.model.data_abastecimento.desc(), self.model.id.desc())
+        )
+
     async def get_by_motorista_id(
         self, motorista_id: int, skip: int = 0, limit: int = 100
     ) -> list[Abastecimento]:
@@ -54,34 +109,212 @@ class AbastecimentoRepository(BaseRepository[Abastecimento]):
 
     async def count_by_status(self, status: StatusAbastecimento) -> int:
         """Count abastecimentos by status"""
-        query = select(func.count()).select_from(self.model).where(self.model.status == status)
-        result = await self.session.execute(query)
-        return result.scalar() or 0
+        return await self.count(self.model.status == status)
 
     async def count_anomalies(self) -> int:
         """Count anomalous abastecimentos"""
-        query = (
-            select(func.count())
-            .select_from(self.model)
-            .where(self.model.eh_anomalia == True)  # noqa: E712
-        )
-        result = await self.session.execute(query)
-        return result.scalar() or 0
+        return await self.count(self.model.eh_anomalia == True)  # noqa: E712
 
     async def get_with_pagination(
-        self, page: int = 1, page_size: int = 20
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        filters: AbastecimentoFilters | None = None,
+        estimate_total: bool = False,
     ) -> tuple[list[Abastecimento], int]:
-        """Get abastecimentos with pagination"""
+        """
+        Get abastecimentos matching filters with pagination.
+
+        With estimate_total the total comes from planner statistics
+        (see BaseRepository.count_estimate) instead of an exact count(*).
+        """
         skip = (page - 1) * page_size
+        conditions = self._build_conditions(filters)
 
         # Get total count
-        count_query = select(func.count()).select_from(self.model)
-        count_result = await self.session.execute(count_query)
-        total = count_result.scalar() or 0
+        if estimate_total:
+            total = await self.count_estimate(*conditions)
+        else:
+            total = await self.count(*conditions)
 
         # Get paginated results
-        query = select(self.model).offset(skip).limit(page_size)
+        query = self._filtered_query(filters).offset(skip).limit(page_size)
         result = await self.session.execute(query)
         items = result.scalars().all()
 
         return items, total
+
+    async def get_with_cursor(
+        self,
+        cursor: str | None = None,
+        page_size: int = 20,
+        filters: AbastecimentoFilters | None = None,
+    ) -> tuple[list[Abastecimento], str | None]:
+        """
+        Get abastecimentos with keyset pagination.
+
+        Items are ordered by (data_abastecimento, id) descending, so each page
+        is a range scan that starts right after the previous one instead of
+        skipping rows with OFFSET. No total count is computed.
+
+        Args:
+            cursor: Opaque cursor from the previous page (None for the first page)
+            page_size: Items per page
+            filters: Optional filters applied to every page
+
+        Returns:
+            Tuple of (items, next_cursor). next_cursor is None on the last page.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = self._filtered_query(filters)
+        if cursor:
+            data_abastecimento, last_id = decode_cursor(cursor)
+            # Written as "data <= d AND (data < d OR id < i)" rather than a row
+            # comparison so the plain data_abastecimento index bounds the scan
+            # and later months' partitions are pruned
+            query = query.where(
+                self.model.data_abastecimento <= data_abastecimento,
+                or_(
+                    self.model.data_abastecimento < data_abastecimento,
+                    self.model.id < last_id,
+                ),
+            )
+
+        # Fetch one extra row to know whether there is a next page
+        result = await self.session.execute(query.limit(page_size + 1))
+        items = list(result.scalars().all())
+
+        next_cursor = None
+        if len(items) > page_size:
+            items = items[:page_size]
+            last = items[-1]
+            next_cursor = encode_cursor(last.data_abastecimento, last.id)
+
+        return items, next_cursor
+
+    async def transition_status(
+        self,
+        ids: list[int],
+        destino: StatusAbastecimento,
+        origens: list[StatusAbastecimento],
+        **values: object,
+    ) -> list[Abastecimento]:
+        """
+        Move abastecimentos to a new status with one conditional UPDATE (no commit).
+
+        Runs UPDATE ... WHERE id IN (:ids) AND status IN (:origens) RETURNING *,
+        so each row is checked and changed atomically: of two concurrent
+        reviewers, only the first one matches the row.
+
+        Args:
+            ids: IDs to update
+            destino: New status
+            origens: Statuses from which the change is allowed
+            values: Other columns to set (e.g. motivo_recusa)
+
+        Returns:
+            The updated abastecimentos; ids that are missing or in another
+            status are left out
+        """
+        if not ids:
+            return []
+        query = (
+            update(self.model)
+            .where(self.model.id.in_(ids), self.model.status.in_(origens))
+            .values(status=destino, **values)
+            .returning(self.model)
+            .execution_options(synchronize_session="auto")
+        )
+        result = await self.session.scalars(query)
+        return list(result.all())
+
+    async def get_statuses(self, ids: list[int]) -> dict[int, str]:
+        """Get the current status of each existing id"""
+        if not ids:
+            return {}
+        query = select(self.model.id, self.model.status).where(self.model.id.in_(ids))
+        result = await self.session.execute(query)
+        return {row.id: row.status for row in result}
+
+    async def lock_unscored(self, ids: list[int]) -> list[Abastecimento]:
+        """
+        Lock the given refills that are still unscored.
+
+        Refills reviewed before being scored are included: they still need
+        their score and anomaly count. Uses SELECT ... FOR UPDATE SKIP
+        LOCKED, so concurrent scorers never pick the same row and a review
+        running at the same time either waits for the scorer or makes the
+        row skipped.
+        """
+        if not ids:
+            return []
+        query = (
+            select(self.model)
+            .where(self.model.id.in_(ids), self.model.pontuado_em.is_(None))
+            .order_by(self.model.id)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.scalars(query)
+        return list(result.all())
+
+    async def get_unscored_ids(self, limit: int) -> list[int]:
+        """Get the oldest refills still waiting for anomaly scoring, reviewed or not"""
+        query = (
+            select(self.model.id)
+            .where(self.model.pontuado_em.is_(None))
+            .order_by(self.model.id)
+            .limit(limit)
+        )
+        result = await self.session.scalars(query)
+        return list(result.all())
+
+    async def get_scoring_chunk(
+        self, after_id: int, limit: int, statuses: list[StatusAbastecimento]
+    ) -> list[Row]:
+        """
+        Get the columns needed for anomaly scoring, in id order.
+
+        Returns plain rows of (id, tipo_combustivel, valor, litros, eh_anomalia,
+        motorista_id, data_abastecimento, regras_anomalia) with id greater than
+        after_id, so large tables can be walked in chunks without loading ORM
+        objects or using OFFSET.
+        """
+        query = (
+            select(
+                self.model.id,
+                self.model.tipo_combustivel,
+                self.model.valor,
+                self.model.litros,
+                self.model.eh_anomalia,
+                self.model.motorista_id,
+                self.model.data_abastecimento,
+                self.model.regras_anomalia,
+            )
+            .where(self.model.id > after_id, self.model.status.in_(statuses))
+            .order_by(self.model.id)
+            .limit(limit)
+        )
+        result = await self.session.execute(query)
+        return list(result.all())
+
+    async def stream_rows(
+        self, filters: AbastecimentoFilters | None = None, chunk_size: int = 1000
+    ) -> AsyncIterator[Row]:
+        """
+        Stream every abastecimento matching filters as plain column rows.
+
+        Uses a server-side cursor fetching chunk_size rows at a time, so memory
+        stays constant however many rows match. Rows are not turned into ORM
+        objects.
+        """
+        query = (
+            select(*self.model.__table__.columns)
+            .where(*self._build_conditions(filters))
+            .order_by(self.model.data_abastecimento.desc(), self.model.id.desc())
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await self.session.stream(query)
+        async for row in result:
+            yield row
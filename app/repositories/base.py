@@ -1,8 +1,10 @@
 """Base repository with common CRUD operations"""
 
+import json
 from typing import Generic, TypeVar
 
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, func, insert, literal, select, text, update
+from sqlalchemy.exc import CompileError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 T = TypeVar("T")
@@ -16,13 +18,39 @@ class BaseRepository(Generic[T]):
         self.session = session
         self.model = model
 
-    async def create(self, obj: T) -> T:
-        """Create a new object"""
+    async def create(self, obj: T, commit: bool = True) -> T:
+        """Create a new object (only flushed when commit is False)"""
         self.session.add(obj)
+        if not commit:
+            await self.session.flush()
+            return obj
         await self.session.commit()
         await self.session.refresh(obj)
         return obj
 
+    async def create_many(self, values: list[dict], commit: bool = True) -> list[T]:
+        """
+        Create many objects in bulk.
+
+        Rows are written with multi-row INSERT ... RETURNING statements in a
+        single transaction, skipping the per-object flush and refresh.
+
+        Args:
+            values: Column values for each new object
+            commit: Commit the transaction (False lets the caller add more work to it)
+
+        Returns:
+            Created objects, in the same order as values
+        """
+        if not values:
+            return []
+        query = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+        result = await self.session.scalars(query, values)
+        created = list(result.all())
+        if commit:
+            await self.session.commit()
+        return created
+
     async def get_by_id(self, obj_id: int) -> T | None:
         """Get object by ID"""
         return await self.session.get(self.model, obj_id)
@@ -33,13 +61,29 @@ class BaseRepository(Generic[T]):
         result = await self.session.execute(query)
         return result.scalars().all()
 
-    async def update(self, obj: T) -> T:
-        """Update an object"""
+    async def update(self, obj: T, commit: bool = True) -> T:
+        """Update an object (only flushed when commit is False)"""
         await self.session.merge(obj)
+        if not commit:
+            await self.session.flush()
+            return obj
         await self.session.commit()
         await self.session.refresh(obj)
         return obj
 
+    async def update_many(self, values: list[dict], commit: bool = True) -> None:
+        """
+        Update many objects by primary key in bulk.
+
+        Each dict must contain the primary key plus the columns to change;
+        rows are sent as one executemany UPDATE in a single transaction.
+        """
+        if not values:
+            return
+        await self.session.execute(update(self.model), values)
+        if commit:
+            await self.session.commit()
+
     async def delete(self, obj_id: int) -> bool:
         """Delete an object"""
         obj = await self.get_by_id(obj_id)
@@ -49,8 +93,76 @@ class BaseRepository(Generic[T]):
             return True
         return False
 
-    async def count(self) -> int:
-        """Count all objects"""
-        query = select(self.model)
+    async def count(self, *conditions: ColumnElement[bool]) -> int:
+        """Count objects matching optional WHERE conditions with SELECT count(*)"""
+        query = select(func.count()).select_from(self.model).where(*conditions)
         result = await self.session.execute(query)
-        return len(result.scalars().all())
+        return result.scalar() or 0
+
+    async def count_estimate(
+        self, *conditions: ColumnElement[bool], exact_below: int = 1000
+    ) -> int:
+        """
+        Estimate the number of objects matching optional WHERE conditions.
+
+        On PostgreSQL the estimate comes from planner statistics and never
+        scans the table: pg_class.reltuples when there are no conditions,
+        otherwise the row estimate of EXPLAIN. Other databases, tables that
+        were never analyzed and estimates below exact_below (where a real
+        count is cheap and estimates are least reliable) fall back to count().
+
+        Args:
+            conditions: Optional WHERE conditions
+            exact_below: Estimates under this value are replaced by an exact count
+
+        Returns:
+            Estimated (or exact) number of matching objects
+        """
+        if self.session.get_bind().dialect.name != "postgresql":
+            return await self.count(*conditions)
+
+        estimate = await (
+            self._explain_rows(*conditions) if conditions else self._reltuples()
+        )
+        if estimate is None or estimate < exact_below:
+            return await self.count(*conditions)
+        return estimate
+
+    async def _reltuples(self) -> int | None:
+        """
+        Read the planner's row count for the whole table (PostgreSQL).
+
+        For a partitioned table the counts of its partitions are added up,
+        since autovacuum keeps those current but never analyzes the parent.
+        """
+        query = text(
+            """
+            SELECT sum(reltuples) FILTER (WHERE reltuples >= 0)::bigint
+            FROM pg_class
+            WHERE oid IN (SELECT relid FROM pg_partition_tree(to_regclass(:table)) WHERE isleaf)
+               OR (oid = to_regclass(:table) AND relkind = 'r')
+            """
+        )
+        result = await self.session.execute(query, {"table": self.model.__tablename__})
+        # reltuples is -1 while a table has never been vacuumed or analyzed
+        return result.scalar()
+
+    async def _explain_rows(self, *conditions: ColumnElement[bool]) -> int | None:
+        """Read the planner's row estimate for a filtered scan (PostgreSQL)"""
+        query = select(literal(1)).select_from(self.model).where(*conditions)
+        try:
+            sql = query.compile(
+                dialect=self.session.get_bind().dialect,
+                compile_kwargs={"literal_binds": True},
+            )
+        except CompileError:
+            return None
+
+        # exec_driver_sql keeps literals such as '10:30:00' from being parsed
+        # as bind parameters, which text() would do
+        connection = await self.session.connection()
+        result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
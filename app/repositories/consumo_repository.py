@@ -0,0 +1,219 @@
+"""Consumption aggregates repository"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import ColumnElement, Row, case, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.timezone import local_date, to_local
+from app.domain.models.abastecimento import Abastecimento
+from app.domain.models.consumo import ConsumoDiario
+from app.domain.models.enums import StatusAbastecimento
+from app.repositories.base import BaseRepository
+
+AGGREGATE_COLUMNS = (
+    "quantidade",
+    "total_litros",
+    "total_valor",
+    "quantidade_anomalias",
+    "quantidade_aprovados",
+    "quantidade_recusados",
+)
+
+
+class ConsumoDeltas:
+    """Accumulates aggregate changes per (motorista_id, dia) before writing them"""
+
+    def __init__(self):
+        """Initialize with no changes"""
+        self._deltas: dict[tuple[int, date], dict[str, float]] = defaultdict(
+            lambda: dict.fromkeys(AGGREGATE_COLUMNS, 0)
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self._deltas)
+
+    def add(self, motorista_id: int, data_abastecimento: datetime, **changes: float) -> None:
+        """Add changes (column=delta) to the day of a refill"""
+        delta = self._deltas[(motorista_id, local_date(data_abastecimento))]
+        for column, value in changes.items():
+            delta[column] += value
+
+    def add_refill(self, abastecimento: Abastecimento) -> None:
+        """Count a newly created refill"""
+        self.add(
+            abastecimento.motorista_id,
+            abastecimento.data_abastecimento,
+            quantidade=1,
+            total_litros=abastecimento.litros,
+            total_valor=abastecimento.valor,
+            quantidade_anomalias=1 if abastecimento.eh_anomalia else 0,
+        )
+
+    def add_status_change(
+        self,
+        abastecimento: Abastecimento,
+        old_status: StatusAbastecimento | None,
+        new_status: StatusAbastecimento,
+    ) -> None:
+        """Move a refill between the approved/rejected counters (None: neither)"""
+        counters = {
+            StatusAbastecimento.APROVADO: "quantidade_aprovados",
+            StatusAbastecimento.RECUSADO: "quantidade_recusados",
+        }
+        changes: dict[str, float] = {}
+        if old_status in counters:
+            changes[counters[old_status]] = -1
+        if new_status in counters:
+            changes[counters[new_status]] = changes.get(counters[new_status], 0) + 1
+        if any(changes.values()):
+            self.add(abastecimento.motorista_id, abastecimento.data_abastecimento, **changes)
+
+    def rows(self) -> list[dict]:
+        """Changes as insert rows, in key order (consistent lock order)"""
+        return [
+            {"motorista_id": motorista_id, "dia": dia, **delta}
+            for (motorista_id, dia), delta in sorted(self._deltas.items())
+        ]
+
+
+class ConsumoRepository(BaseRepository[ConsumoDiario]):
+    """Repository for daily consumption aggregates"""
+
+    def __init__(self, session: AsyncSession):
+        """Initialize repository"""
+        super().__init__(session, ConsumoDiario)
+
+    async def apply(self, deltas: ConsumoDeltas) -> None:
+        """
+        Add accumulated changes to the aggregates, without committing.
+
+        Uses a single multi-row INSERT ... ON CONFLICT DO UPDATE that adds the
+        deltas to existing rows, so concurrent writers never overwrite each
+        other's increments. Meant to run in the same transaction as the
+        change to abastecimentos that it reflects.
+        """
+        if not deltas:
+            return
+
+        dialect = self.session.get_bind().dialect.name
+        insert_factory = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        table = self.model.__table__
+        query = insert_factory(table).values(deltas.rows())
+        query = query.on_conflict_do_update(
+            index_elements=[table.c.motorista_id, table.c.dia],
+            set_={
+                **{
+                    column: table.c[column] + query.excluded[column]
+                    for column in AGGREGATE_COLUMNS
+                },
+                "atualizado_em": func.now(),
+            },
+        )
+        await self.session.execute(query)
+
+    @staticmethod
+    def _day_range(inicio: date | None, fim: date | None) -> list[ColumnElement[bool]]:
+        """Conditions for an inclusive range of days"""
+        conditions = []
+        if inicio is not None:
+            conditions.append(ConsumoDiario.dia >= inicio)
+        if fim is not None:
+            conditions.append(ConsumoDiario.dia <= fim)
+        return conditions
+
+    @staticmethod
+    def _sums() -> list:
+        """SUM() of every aggregate column, labelled with the column name"""
+        return [
+            func.coalesce(func.sum(ConsumoDiario.__table__.c[column]), 0).label(column)
+            for column in AGGREGATE_COLUMNS
+        ]
+
+    async def get_days_by_motorista(
+        self, motorista_id: int, inicio: date | None = None, fim: date | None = None
+    ) -> list[ConsumoDiario]:
+        """Get the daily aggregates of a motorista, most recent first"""
+        query = (
+            select(self.model)
+            .where(self.model.motorista_id == motorista_id, *self._day_range(inicio, fim))
+            .order_by(self.model.dia.desc())
+        )
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def get_totals_by_motorista(
+        self, motorista_id: int, inicio: date | None = None, fim: date | None = None
+    ) -> Row:
+        """Get the totals of a motorista over a range of days"""
+        query = select(*self._sums()).where(
+            self.model.motorista_id == motorista_id, *self._day_range(inicio, fim)
+        )
+        result = await self.session.execute(query)
+        return result.one()
+
+    async def get_fleet_totals(self, inicio: date | None = None, fim: date | None = None) -> Row:
+        """Get fleet-wide totals over a range of days"""
+        query = select(*self._sums()).where(*self._day_range(inicio, fim))
+        result = await self.session.execute(query)
+        return result.one()
+
+    async def get_fleet_days(
+        self, inicio: date | None = None, fim: date | None = None
+    ) -> list[Row]:
+        """Get fleet-wide totals per day, most recent first"""
+        query = (
+            select(self.model.dia, *self._sums())
+            .where(*self._day_range(inicio, fim))
+            .group_by(self.model.dia)
+            .order_by(self.model.dia.desc())
+        )
+        result = await self.session.execute(query)
+        return list(result.all())
+
+    async def rebuild(self) -> int:
+        """
+        Recompute every aggregate from abastecimentos.
+
+        Used to populate the table the first time and to repair it after bulk
+        changes made outside AbastecimentoService.
+
+        Returns:
+            Number of aggregate rows written
+        """
+        if self.session.get_bind().dialect.name == "postgresql":
+            dia = func.date(func.timezone(settings.timezone, Abastecimento.data_abastecimento))
+        else:
+            # SQLite (tests) has no timezone support; use the current UTC offset
+            offset = to_local(datetime.utcnow()).utcoffset() or timedelta()
+            dia = func.date(
+                Abastecimento.data_abastecimento, f"{offset.total_seconds():+.0f} seconds"
+            )
+
+        source = select(
+            Abastecimento.motorista_id,
+            dia.label("dia"),
+            func.count().label("quantidade"),
+            func.sum(Abastecimento.litros).label("total_litros"),
+            func.sum(Abastecimento.valor).label("total_valor"),
+            func.sum(case((Abastecimento.eh_anomalia, 1), else_=0)).label("quantidade_anomalias"),
+            func.sum(
+                case((Abastecimento.status == StatusAbastecimento.APROVADO, 1), else_=0)
+            ).label("quantidade_aprovados"),
+            func.sum(
+                case((Abastecimento.status == StatusAbastecimento.RECUSADO, 1), else_=0)
+            ).label("quantidade_recusados"),
+            func.now().label("atualizado_em"),
+        ).group_by(Abastecimento.motorista_id, dia)
+
+        await self.session.execute(delete(self.model))
+        result = await self.session.execute(
+            insert(self.model).from_select(
+                ["motorista_id", "dia", *AGGREGATE_COLUMNS, "atualizado_em"], source
+            )
+        )
+        await self.session.commit()
+        return result.rowcount
@@ -0,0 +1,84 @@
+"""Abastecimento change event repository"""
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models.evento import EventoAbastecimento
+from app.repositories.base import BaseRepository
+
+# Key of the PostgreSQL advisory lock held while numbering events
+EVENT_SEQUENCE_LOCK = 0x45564E54
+
+
+class EventoRepository(BaseRepository[EventoAbastecimento]):
+    """Repository for the abastecimento change events (outbox)"""
+
+    def __init__(self, session: AsyncSession):
+        """Initialize repository"""
+        super().__init__(session, EventoAbastecimento)
+
+    async def add_many(self, rows: list[dict]) -> None:
+        """
+        Insert events in the current transaction, without committing.
+
+        The events get no seq yet (see assign_seqs), so transactions that
+        write events never wait for each other.
+        """
+        if not rows:
+            return
+        await self.session.execute(insert(self.model), rows)
+
+    async def assign_seqs(self, limit: int = 10_000) -> int:
+        """
+        Number committed events that have no seq yet, in insertion order, and commit.
+
+        Numbering transactions run one at a time (a transaction-level
+        advisory lock on PostgreSQL) and only see committed events, so seqs
+        become visible in increasing order: a consumer that has read up to
+        seq N never sees an event below N appear later. A session that finds
+        the lock taken returns at once, leaving the work to its holder.
+
+        Args:
+            limit: Maximum number of events numbered
+
+        Returns:
+            Number of events numbered
+        """
+        if self.session.get_bind().dialect.name == "postgresql":
+            locked = await self.session.scalar(
+                select(func.pg_try_advisory_xact_lock(EVENT_SEQUENCE_LOCK))
+            )
+            if not locked:
+                await self.session.commit()
+                return 0
+
+        last_seq = select(func.coalesce(func.max(self.model.seq), 0)).scalar_subquery()
+        pending = (
+            select(
+                self.model.id,
+                (last_seq + func.row_number().over(order_by=self.model.id)).label("seq"),
+            )
+            .where(self.model.seq.is_(None))
+            .order_by(self.model.id)
+            .limit(limit)
+            .subquery()
+        )
+        result = await self.session.execute(
+            update(self.model)
+            .where(self.model.id == pending.c.id)
+            .values(seq=pending.c.seq)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount
+
+    async def get_after(self, seq: int, limit: int) -> list[EventoAbastecimento]:
+        """Get the numbered events with seq greater than the given one, in seq order"""
+        query = select(self.model).where(self.model.seq > seq).order_by(self.model.seq).limit(limit)
+        result = await self.session.scalars(query)
+        return list(result.all())
+
+    async def get_last_seq(self) -> int:
+        """Get the seq of the latest numbered event (0 without events)"""
+        result = await self.session.execute(select(func.max(self.model.seq)))
+        return result.scalar() or 0
@@ -0,0 +1,105 @@
+"""Idempotency key repository"""
+
+from datetime import datetime
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models.idempotencia import ChaveIdempotencia
+from app.repositories.base import BaseRepository
+
+
+class IdempotenciaRepository(BaseRepository[ChaveIdempotencia]):
+    """Repository for idempotency keys (no method commits)"""
+
+    def __init__(self, session: AsyncSession):
+        """Initialize repository"""
+        super().__init__(session, ChaveIdempotencia)
+
+    async def reserve(
+        self, chave: str, fingerprint: str, now: datetime, expira_em: datetime
+    ) -> bool:
+        """
+        Claim a key for a request about to be processed.
+
+        One INSERT ... ON CONFLICT DO UPDATE that only updates an expired key,
+        so of concurrent requests with the same key exactly one gets it. A
+        reservation expires at expira_em (the in-flight lease) like a
+        recorded response does, so a key whose request never finished can be
+        claimed again. now (stored as criado_em) identifies the reservation
+        in complete and release.
+
+        Returns:
+            True if the key was free (new or expired) and is now reserved
+        """
+        dialect = self.session.get_bind().dialect.name
+        insert_factory = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        table = self.model.__table__
+        query = insert_factory(table).values(
+            chave=chave, fingerprint=fingerprint, criado_em=now, expira_em=expira_em
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[table.c.chave],
+            set_={
+                "fingerprint": query.excluded.fingerprint,
+                "status_code": None,
+                "content_type": None,
+                "corpo": None,
+                "criado_em": query.excluded.criado_em,
+                "expira_em": query.excluded.expira_em,
+            },
+            where=table.c.expira_em <= now,
+        ).returning(table.c.chave)
+        result = await self.session.execute(query)
+        return result.first() is not None
+
+    async def get(self, chave: str) -> ChaveIdempotencia | None:
+        """Get a key with its recorded response"""
+        result = await self.session.scalars(select(self.model).where(self.model.chave == chave))
+        return result.first()
+
+    async def complete(
+        self,
+        chave: str,
+        reservada_em: datetime,
+        status_code: int,
+        content_type: str | None,
+        corpo: bytes,
+        expira_em: datetime,
+    ) -> bool:
+        """
+        Record the response of a reservation.
+
+        Returns:
+            False if the reservation was lost (its lease ran out and the key
+            was claimed again)
+        """
+        result = await self.session.execute(
+            update(self.model)
+            .where(self._reservation(chave, reservada_em))
+            .values(
+                status_code=status_code,
+                content_type=content_type,
+                corpo=corpo,
+                expira_em=expira_em,
+            )
+        )
+        return result.rowcount > 0
+
+    async def release(self, chave: str, reservada_em: datetime) -> None:
+        """Free a reservation whose request failed, so it can be retried"""
+        await self.session.execute(delete(self.model).where(self._reservation(chave, reservada_em)))
+
+    def _reservation(self, chave: str, reservada_em: datetime):
+        """Condition matching a reservation still in flight"""
+        return (
+            (self.model.chave == chave)
+            & (self.model.criado_em == reservada_em)
+            & self.model.status_code.is_(None)
+        )
+
+    async def delete_expired(self, now: datetime) -> int:
+        """Delete expired keys (served by the expira_em index)"""
+        result = await self.session.execute(delete(self.model).where(self.model.expira_em <= now))
+        return result.rowcount
@@ -1,11 +1,65 @@
 """Motorista repository for data access"""
 
-from sqlalchemy import func, select
+import re
+import unicodedata
+
+from sqlalchemy import (
+    BindParameter,
+    ColumnElement,
+    and_,
+    column,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    true,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, contains_eager
 
+from app.domain.exceptions import MotoristaDuplicadoError
+from app.domain.models.abastecimento import Abastecimento
 from app.domain.models.motorista import Motorista
 from app.repositories.base import BaseRepository
 
+# Matches taken, by id, before sorting by name. Large enough that for a rare
+# term the planner reads the GIN index rather than walking the id index
+# until it finds a few matches.
+SEARCH_CANDIDATES = 200
+
+# Prefixes of every word of the name, a generated column added by migration
+# 0010. PostgreSQL only, so it is not mapped.
+_nome_busca = column("nome_busca", postgresql.TSVECTOR)
+
+# Formatting ignored in CPF and telefone searches (both are stored as digits)
+_NUMBER_FORMATTING = re.compile(r"[\s.\-()/+]")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _search_words(termo: str) -> list[str]:
+    """Lowercase words of a search term, without accents"""
+    decomposed = unicodedata.normalize("NFKD", termo.lower())
+    return _WORD.findall("".join(char for char in decomposed if not unicodedata.combining(char)))
+
+
+def _inline(value: str | int) -> BindParameter:
+    """
+    Value rendered into the SQL instead of sent as a parameter.
+
+    The plan of a search depends on the term: how many rows match decides
+    between the indexes. A generic plan of a prepared statement, which
+    asyncpg would reuse, cannot see it.
+    """
+    return literal(value, literal_execute=True)
+
+
+def _prefix_pattern(prefix: str) -> BindParameter:
+    """LIKE pattern for a prefix, with "/" as escape character"""
+    escaped = prefix.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    return _inline(f"{escaped}%")
+
 
 class MotoristaRepository(BaseRepository[Motorista]):
     """Repository for Motorista data access"""
@@ -14,6 +68,43 @@ class MotoristaRepository(BaseRepository[Motorista]):
         """Initialize repository"""
         super().__init__(session, Motorista)
 
+    def _insert_factory(self):
+        """insert() of the session's dialect, which supports ON CONFLICT"""
+        dialect = self.session.get_bind().dialect.name
+        return postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+    async def create_unique(self, values: dict) -> Motorista:
+        """
+        Create a motorista and commit, in one INSERT ... ON CONFLICT DO NOTHING.
+
+        Concurrent requests with the same CPF or email cannot both pass a
+        check done before the insert, so the unique constraints decide: the
+        insert either returns the new row or nothing. Only on a conflict is
+        one more query run, to tell which column caused it.
+
+        Args:
+            values: Column values of the new motorista
+
+        Returns:
+            Created motorista
+
+        Raises:
+            MotoristaDuplicadoError: If the CPF or the email is already registered
+        """
+        query = (
+            self._insert_factory()(self.model)
+            .values(**values)
+            .on_conflict_do_nothing()
+            .returning(self.model)
+        )
+        created = (await self.session.scalars(query)).first()
+        if created is None:
+            await self.session.rollback()
+            taken_cpfs, _ = await self.get_existing_keys([values["cpf"]], [values["email"]])
+            raise MotoristaDuplicadoError("cpf" if taken_cpfs else "email")
+        await self.session.commit()
+        return created
+
     async def get_by_cpf(self, cpf: str) -> Motorista | None:
         """Get motorista by CPF"""
         query = select(self.model).where(self.model.cpf == cpf)
@@ -26,6 +117,186 @@ class MotoristaRepository(BaseRepository[Motorista]):
         result = await self.session.execute(query)
         return result.scalars().first()
 
+    async def get_with_recent_refills(self, motorista_id: int, limit: int) -> Motorista | None:
+        """
+        Get a motorista with its latest refills loaded, in one query.
+
+        The refills are joined to the motorista row and loaded into
+        Motorista.abastecimentos (contains_eager), newest first and at most
+        limit of them. On PostgreSQL a LATERAL subquery reads them backwards
+        from the (motorista_id, data_abastecimento) index and stops after
+        limit rows; other databases, which have no LATERAL, rank the
+        motorista's refills with row_number() instead.
+
+        Args:
+            motorista_id: Motorista ID
+            limit: Maximum number of refills to load
+
+        Returns:
+            Motorista with abastecimentos loaded, or None if not found
+        """
+        newest_first = (Abastecimento.data_abastecimento.desc(), Abastecimento.id.desc())
+        if self.session.get_bind().dialect.name == "postgresql":
+            recent = (
+                select(Abastecimento)
+                .where(Abastecimento.motorista_id == self.model.id)
+                .order_by(*newest_first)
+                .limit(limit)
+                .lateral("recentes")
+            )
+            onclause = true()
+        else:
+            position = func.row_number().over(order_by=newest_first).label("posicao")
+            recent = (
+                select(Abastecimento, position)
+                .where(Abastecimento.motorista_id == motorista_id)
+                .subquery("recentes")
+            )
+            onclause = and_(recent.c.motorista_id == self.model.id, recent.c.posicao <= limit)
+
+        refills = aliased(Abastecimento, recent)
+        query = (
+            select(self.model)
+            .outerjoin(refills, onclause)
+            .where(self.model.id == motorista_id)
+            .order_by(refills.data_abastecimento.desc(), refills.id.desc())
+            .options(contains_eager(self.model.abastecimentos.of_type(refills)))
+            # Replace a collection loaded earlier in this session
+            .execution_options(populate_existing=True)
+        )
+        result = await self.session.execute(query)
+        return result.unique().scalars().first()
+
+    def _search_condition(self, termo: str) -> ColumnElement[bool] | None:
+        """Condition for a search term, or None if it has nothing to search for"""
+        termo = termo.strip()
+        digits = _NUMBER_FORMATTING.sub("", termo)
+        if digits.isascii() and digits.isdigit():
+            pattern = _prefix_pattern(digits)
+            return or_(
+                self.model.cpf.like(pattern, escape="/"),
+                self.model.telefone.like(pattern, escape="/"),
+            )
+
+        email = func.lower(self.model.email).like(_prefix_pattern(termo.lower()), escape="/")
+        if "@" in termo:
+            return email
+
+        words = _search_words(termo)
+        if not words:
+            return None
+        if self.session.get_bind().dialect.name == "postgresql":
+            tsquery = func.to_tsquery(
+                literal_column("'simple'::regconfig"), _inline(" & ".join(words))
+            )
+            name = _nome_busca.bool_op("@@")(tsquery)
+        else:
+            # Fallback without accent folding: each word starts a word of the name
+            lowered = func.lower(" " + self.model.nome)
+            name = and_(*(lowered.like(_inline(f"% {word}%")) for word in words))
+        # A single word can also be the start of an email ("ana.souza")
+        return or_(name, email) if len(termo.split()) == 1 else name
+
+    async def search(self, termo: str, limit: int = 10) -> list[Motorista]:
+        """
+        Search motoristas by name, email, CPF or telefone, for autocomplete.
+
+        The term is read as:
+
+        - a CPF or telefone prefix if it has only digits, ignoring CPF and
+          phone formatting (both are stored as digits only);
+        - an email prefix (case-insensitive) if it contains "@";
+        - otherwise words that must all start words of the name, in any
+          order and without accents ("jo sil" finds "João da Silva"); a
+          single word also matches the start of the email.
+
+        On PostgreSQL every lookup is indexed (migration 0010): names through
+        the nome_busca prefix tsvector, the others through text_pattern_ops
+        indexes. Other databases (tests) run the same search with LIKE.
+
+        Up to SEARCH_CANDIDATES matches are taken in registration order and
+        the first limit of them by name are returned, so a term matching
+        thousands of motoristas costs no more than a rare one.
+
+        Args:
+            termo: Search term
+            limit: Maximum number of motoristas returned
+
+        Returns:
+            Matching motoristas, ordered by name
+        """
+        condition = self._search_condition(termo)
+        if condition is None:
+            return []
+        candidates = (
+            select(self.model.id)
+            .where(condition)
+            .order_by(self.model.id)
+            .limit(_inline(SEARCH_CANDIDATES))
+            .correlate(None)
+        )
+        query = (
+            select(self.model)
+            .where(self.model.id.in_(candidates))
+            .order_by(self.model.nome, self.model.id)
+            .limit(_inline(limit))
+        )
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def get_existing_keys(
+        self, cpfs: list[str], emails: list[str]
+    ) -> tuple[set[str], set[str]]:
+        """
+        Find which CPFs and emails are already taken, with one IN query.
+
+        Returns:
+            Tuple of (taken CPFs, taken emails) among the given ones
+        """
+        if not cpfs and not emails:
+            return set(), set()
+        query = select(self.model.cpf, self.model.email).where(
+            or_(self.model.cpf.in_(cpfs), self.model.email.in_(emails))
+        )
+        result = await self.session.execute(query)
+        taken_cpfs, taken_emails = set(), set()
+        for cpf, email in result.all():
+            taken_cpfs.add(cpf)
+            taken_emails.add(email)
+        return taken_cpfs & set(cpfs), taken_emails & set(emails)
+
+    async def insert_new(self, values: list[dict]) -> dict[str, int]:
+        """
+        Insert motoristas in bulk, skipping duplicates (no commit).
+
+        Sent as an executemany, which SQLAlchemy batches into multi-row
+        INSERT ... RETURNING statements from one cached compilation. ON
+        CONFLICT DO NOTHING covers both unique columns, so rows whose CPF or
+        email was taken by a concurrent writer are skipped instead of failing
+        the whole statement.
+
+        Returns:
+            ID of each inserted motorista, by CPF
+        """
+        if not values:
+            return {}
+        table = self.model.__table__
+        query = (
+            self._insert_factory()(table)
+            .on_conflict_do_nothing()
+            .returning(table.c.cpf, table.c.id)
+        )
+        result = await self.session.execute(query, values)
+        return {cpf: motorista_id for cpf, motorista_id in result.all()}
+
+    async def get_active_flags(self, ids: set[int]) -> dict[int, bool]:
+        """Return the ativo flag of each existing motorista among the given IDs"""
+        if not ids:
+            return {}
+        query = select(self.model.id, self.model.ativo).where(self.model.id.in_(ids))
+        result = await self.session.execute(query)
+        return {motorista_id: ativo for motorista_id, ativo in result.all()}
+
     async def get_active(self, skip: int = 0, limit: int = 100) -> list[Motorista]:
         """Get all active motoristas"""
         query = (
@@ -44,9 +315,7 @@ class MotoristaRepository(BaseRepository[Motorista]):
         skip = (page - 1) * page_size
 
         # Get total count
-        count_query = select(func.count()).select_from(self.model)
-        count_result = await self.session.execute(count_query)
-        total = count_result.scalar() or 0
+        total = await self.count()
 
         # Get paginated results
         query = select(self.model).offset(skip).limit(page_size)
@@ -0,0 +1,44 @@
+"""Keyset (cursor) pagination helpers"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+
+def encode_cursor(data_abastecimento: datetime, obj_id: int) -> str:
+    """
+    Encode a keyset position into an opaque cursor.
+
+    Args:
+        data_abastecimento: Sort key of the last item returned
+        obj_id: ID of the last item returned (tie-breaker)
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps(
+        {"d": data_abastecimento.isoformat(), "i": obj_id}, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode an opaque cursor back into its keyset position.
+
+    Args:
+        cursor: Cursor previously returned by encode_cursor
+
+    Returns:
+        Tuple of (data_abastecimento, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["d"]), int(payload["i"])
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Cursor inválido") from exc
@@ -1,11 +1,26 @@
 """Abastecimento service with business logic"""
 
+from collections.abc import Sequence
+from datetime import datetime
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.timezone import naive_utc
+from app.domain.exceptions import TransicaoInvalidaError
 from app.domain.models.abastecimento import Abastecimento
-from app.domain.models.enums import StatusAbastecimento
+from app.domain.models.enums import StatusAbastecimento, TipoEvento, origens_permitidas
+from app.domain.schemas.abastecimento import AbastecimentoCreate
 from app.repositories.abastecimento_repository import AbastecimentoRepository
-from app.services.anomaly_service import AnomalyService
+from app.repositories.consumo_repository import ConsumoDeltas, ConsumoRepository
+from app.repositories.evento_repository import EventoRepository
+from app.services.anomaly_queue import anomaly_queue
+from app.services.anomaly_rules import AnomalyEvaluation, RefillFacts, RuleSet, anomaly_rules
+from app.services.event_feed import build_event, event_feed
+from app.services.price_baseline import price_baseline
+from app.services.refill_velocity import refill_velocity
+
+# Statuses set by review, which scoring must not overwrite
+REVIEWED_STATUSES = (StatusAbastecimento.APROVADO, StatusAbastecimento.RECUSADO)
 
 
 class AbastecimentoService:
@@ -15,7 +30,8 @@ class AbastecimentoService:
         """Initialize service with database session"""
         self.session = session
         self.repository = AbastecimentoRepository(session)
-        self.anomaly_service = AnomalyService()
+        self.consumo_repository = ConsumoRepository(session)
+        self.evento_repository = EventoRepository(session)
 
     async def create_abastecimento(
         self,
@@ -31,6 +47,12 @@ class AbastecimentoService:
         - If anomaly detected: status = ANOMALIA
         - Otherwise: status = PENDENTE
 
+        The anomaly score and fired rules are stored with the refill. Rules
+        about the motorista's recent refills read the in-memory windows of
+        refill_velocity, so no history is queried here. While the async
+        scoring queue runs, the refill is stored as PENDENTE and queued for
+        score_pending instead.
+
         Args:
             motorista_id: ID of the driver
             tipo_combustivel: Type of fuel
@@ -47,34 +69,331 @@ class AbastecimentoService:
             valor=valor,
             litros=litros,
             status=StatusAbastecimento.PENDENTE,
+            data_abastecimento=datetime.utcnow(),
         )
 
+        if anomaly_queue.running:
+            created = await self.repository.create(abastecimento, commit=False)
+            deltas = ConsumoDeltas()
+            deltas.add_refill(created)
+            await self._commit(deltas, [build_event(TipoEvento.CRIADO, created)])
+            await anomaly_queue.submit([created.id])
+            return created
+
         # Check for anomalies
-        is_anomaly = self.anomaly_service.detect_anomaly(abastecimento)
-        if is_anomaly:
-            abastecimento.status = StatusAbastecimento.ANOMALIA
-            abastecimento.eh_anomalia = True
+        evaluation = self._evaluate(
+            anomaly_rules.ruleset,
+            motorista_id,
+            tipo_combustivel,
+            valor,
+            litros,
+            abastecimento.data_abastecimento,
+        )
+        is_anomaly = evaluation.eh_anomalia
+        for column, value in self._evaluation_values(
+            evaluation, abastecimento.data_abastecimento
+        ).items():
+            setattr(abastecimento, column, value)
+
+        # Save to database, together with the daily aggregates and its event
+        created = await self.repository.create(abastecimento, commit=False)
+        deltas = ConsumoDeltas()
+        deltas.add_refill(created)
+        await self._commit(deltas, [build_event(TipoEvento.CRIADO, created)])
+
+        # Normal prices feed the baseline used by the next detections
+        if not is_anomaly:
+            price_baseline.observe(tipo_combustivel, valor / litros, created.data_abastecimento)
+
+        return created
+
+    async def create_abastecimentos(
+        self, records: Sequence[AbastecimentoCreate]
+    ) -> list[Abastecimento]:
+        """
+        Create many abastecimentos at once with anomaly detection.
+
+        Applies the same business rules as create_abastecimento, but runs
+        anomaly detection over the whole batch and writes every row in a
+        single bulk insert. Earlier records of the same motorista in the batch
+        count as recent refills. While the async scoring queue runs, rows are
+        stored as PENDENTE and queued instead. Motorista existence must be
+        checked by the caller.
+
+        Args:
+            records: Validated abastecimento data
+
+        Returns:
+            Created Abastecimento objects, in input order
+        """
+        ruleset = anomaly_rules.ruleset
+        now = datetime.utcnow()
+        score_inline = not anomaly_queue.running
+
+        rows = []
+        for record in records:
+            row = {
+                "motorista_id": record.motorista_id,
+                "tipo_combustivel": record.tipo_combustivel,
+                "valor": record.valor,
+                "litros": record.litros,
+                "status": StatusAbastecimento.PENDENTE,
+                "eh_anomalia": False,
+                "data_abastecimento": now,
+            }
+            if score_inline:
+                evaluation = self._evaluate(
+                    ruleset,
+                    record.motorista_id,
+                    record.tipo_combustivel,
+                    record.valor,
+                    record.litros,
+                    now,
+                )
+                row.update(self._evaluation_values(evaluation, now))
+            rows.append(row)
+        created = await self.repository.create_many(rows, commit=False)
+        deltas = ConsumoDeltas()
+        for abastecimento in created:
+            deltas.add_refill(abastecimento)
+        await self._commit(
+            deltas, [build_event(TipoEvento.CRIADO, abastecimento) for abastecimento in created]
+        )
+
+        if not score_inline:
+            await anomaly_queue.submit([abastecimento.id for abastecimento in created])
+            return created
+
+        for abastecimento in created:
+            if not abastecimento.eh_anomalia:
+                price_baseline.observe(
+                    abastecimento.tipo_combustivel,
+                    abastecimento.valor / abastecimento.litros,
+                    abastecimento.data_abastecimento,
+                )
 
-        # Save to database
-        return await self.repository.create(abastecimento)
+        return created
+
+    async def score_pending(self, ids: Sequence[int]) -> list[Abastecimento]:
+        """
+        Score refills stored while the async scoring queue was running.
+
+        Refills scored meanwhile, or that another scorer holds locked, are
+        skipped. Refills approved or rejected before being scored get their
+        score and anomaly flag but keep their status. Scores, statuses and
+        the daily anomaly counts are committed together.
+
+        Args:
+            ids: Abastecimento IDs
+
+        Returns:
+            The abastecimentos scored by this call
+        """
+        refills = await self.repository.lock_unscored(list(ids))
+        ruleset = anomaly_rules.ruleset
+        scored_at = datetime.utcnow()
+        deltas = ConsumoDeltas()
+        for abastecimento in refills:
+            evaluation = self._evaluate(
+                ruleset,
+                abastecimento.motorista_id,
+                abastecimento.tipo_combustivel,
+                abastecimento.valor,
+                abastecimento.litros,
+                abastecimento.data_abastecimento,
+            )
+            values = self._evaluation_values(evaluation, scored_at)
+            if abastecimento.status in REVIEWED_STATUSES:
+                del values["status"]
+            for column, value in values.items():
+                setattr(abastecimento, column, value)
+            if evaluation.eh_anomalia:
+                deltas.add(
+                    abastecimento.motorista_id,
+                    abastecimento.data_abastecimento,
+                    quantidade_anomalias=1,
+                )
+        await self._commit(
+            deltas, [build_event(TipoEvento.PONTUADO, abastecimento) for abastecimento in refills]
+        )
+
+        for abastecimento in refills:
+            # As on review, an approved price counts even if anomalous
+            if abastecimento.status == StatusAbastecimento.APROVADO or (
+                abastecimento.status != StatusAbastecimento.RECUSADO
+                and not abastecimento.eh_anomalia
+            ):
+                price_baseline.observe(
+                    abastecimento.tipo_combustivel,
+                    abastecimento.valor / abastecimento.litros,
+                    abastecimento.data_abastecimento,
+                )
+        return refills
 
     async def approve_abastecimento(self, abastecimento_id: int) -> Abastecimento | None:
-        """Approve an abastecimento"""
-        abastecimento = await self.repository.get_by_id(abastecimento_id)
-        if not abastecimento:
-            return None
+        """
+        Approve an abastecimento.
 
-        abastecimento.status = StatusAbastecimento.APROVADO
-        return await self.repository.update(abastecimento)
+        Returns:
+            Approved Abastecimento, or None if it does not exist
+
+        Raises:
+            TransicaoInvalidaError: If its current status cannot be approved
+        """
+        updated, failures = await self.approve_abastecimentos([abastecimento_id])
+        return self._single_result(updated, failures, StatusAbastecimento.APROVADO)
 
     async def reject_abastecimento(
         self, abastecimento_id: int, motivo: str
     ) -> Abastecimento | None:
-        """Reject an abastecimento"""
-        abastecimento = await self.repository.get_by_id(abastecimento_id)
-        if not abastecimento:
+        """
+        Reject an abastecimento.
+
+        Returns:
+            Rejected Abastecimento, or None if it does not exist
+
+        Raises:
+            TransicaoInvalidaError: If its current status cannot be rejected
+        """
+        updated, failures = await self.reject_abastecimentos([abastecimento_id], motivo)
+        return self._single_result(updated, failures, StatusAbastecimento.RECUSADO)
+
+    async def approve_abastecimentos(
+        self, ids: Sequence[int]
+    ) -> tuple[list[Abastecimento], dict[int, str | None]]:
+        """
+        Approve many abastecimentos in one statement.
+
+        Args:
+            ids: Abastecimento IDs
+
+        Returns:
+            Tuple of (approved abastecimentos, failures), failures mapping each
+            id that was not approved to its current status (None if missing)
+        """
+        updated, failures = await self._transition(ids, StatusAbastecimento.APROVADO)
+
+        # A reviewed anomaly is a legitimate price (e.g. a real price increase)
+        for abastecimento in updated:
+            if abastecimento.eh_anomalia and abastecimento.litros:
+                price_baseline.observe(
+                    abastecimento.tipo_combustivel,
+                    abastecimento.valor / abastecimento.litros,
+                    abastecimento.data_abastecimento,
+                )
+
+        return updated, failures
+
+    async def reject_abastecimentos(
+        self, ids: Sequence[int], motivo: str
+    ) -> tuple[list[Abastecimento], dict[int, str | None]]:
+        """
+        Reject many abastecimentos in one statement.
+
+        Args:
+            ids: Abastecimento IDs
+            motivo: Reason for rejection, recorded on every row
+
+        Returns:
+            Tuple of (rejected abastecimentos, failures), as in approve_abastecimentos
+        """
+        return await self._transition(ids, StatusAbastecimento.RECUSADO, motivo_recusa=motivo)
+
+    async def _transition(
+        self, ids: Sequence[int], destino: StatusAbastecimento, **values: object
+    ) -> tuple[list[Abastecimento], dict[int, str | None]]:
+        """
+        Apply a state machine transition with one conditional UPDATE ... RETURNING.
+
+        Rows that did not match (missing, or in a status from which destino is
+        not allowed) are looked up afterwards, only to report why.
+        """
+        ids = list(dict.fromkeys(ids))
+        updated = await self.repository.transition_status(
+            ids, destino, origens_permitidas(destino), **values
+        )
+
+        # Allowed origins are never approved/rejected, so only destino's counter moves
+        deltas = ConsumoDeltas()
+        for abastecimento in updated:
+            deltas.add_status_change(abastecimento, None, destino)
+        aprovado = destino == StatusAbastecimento.APROVADO
+        tipo = TipoEvento.APROVADO if aprovado else TipoEvento.RECUSADO
+        await self._commit(deltas, [build_event(tipo, abastecimento) for abastecimento in updated])
+
+        updated_ids = {abastecimento.id for abastecimento in updated}
+        missing = [obj_id for obj_id in ids if obj_id not in updated_ids]
+        statuses = await self.repository.get_statuses(missing)
+        return updated, {obj_id: statuses.get(obj_id) for obj_id in missing}
+
+    @staticmethod
+    def _single_result(
+        updated: list[Abastecimento],
+        failures: dict[int, str | None],
+        destino: StatusAbastecimento,
+    ) -> Abastecimento | None:
+        """Unwrap the outcome of a one-id transition"""
+        if updated:
+            return updated[0]
+        [current] = failures.values()
+        if current is None:
             return None
+        raise TransicaoInvalidaError(current, destino)
 
-        abastecimento.status = StatusAbastecimento.RECUSADO
-        abastecimento.motivo_recusa = motivo
-        return await self.repository.update(abastecimento)
+    @staticmethod
+    def _evaluate(
+        ruleset: RuleSet,
+        motorista_id: int,
+        tipo_combustivel: str,
+        valor: float,
+        litros: float,
+        data: datetime,
+    ) -> AnomalyEvaluation:
+        """
+        Evaluate the anomaly rules for a new refill and add it to its motorista's window.
+
+        Evaluation and recording happen without awaiting in between, so
+        concurrent requests of the same motorista always see each other. A
+        refill whose insert fails afterwards stays in the window, which can
+        only make velocity rules stricter until it expires.
+        """
+        data = naive_utc(data)
+        if ruleset.janela_historico is None:
+            return ruleset.evaluate(
+                RefillFacts.build(motorista_id, tipo_combustivel, valor, litros, data)
+            )
+        historico = refill_velocity.history(motorista_id, data - ruleset.janela_historico)
+        evaluation = ruleset.evaluate(
+            RefillFacts.build(motorista_id, tipo_combustivel, valor, litros, data, historico)
+        )
+        refill_velocity.record(motorista_id, data, litros)
+        return evaluation
+
+    @staticmethod
+    def _evaluation_values(evaluation: AnomalyEvaluation, scored_at: datetime) -> dict:
+        """Columns that record an anomaly evaluation on a pending abastecimento"""
+        return {
+            "status": (
+                StatusAbastecimento.ANOMALIA
+                if evaluation.eh_anomalia
+                else StatusAbastecimento.PENDENTE
+            ),
+            "eh_anomalia": evaluation.eh_anomalia,
+            "pontuacao_anomalia": evaluation.pontuacao,
+            "regras_anomalia": evaluation.regras(),
+            "pontuado_em": scored_at,
+        }
+
+    async def _commit(self, deltas: ConsumoDeltas, eventos: Sequence[dict] = ()) -> None:
+        """
+        Apply aggregate changes and commit them with the pending refill changes.
+
+        The change events are written in the same transaction (a transactional
+        outbox), so the feed never misses or invents a change; the feed numbers
+        them once committed.
+        """
+        await self.consumo_repository.apply(deltas)
+        await self.evento_repository.add_many(list(eventos))
+        await self.session.commit()
+        if eventos:
+            event_feed.notify()
@@ -0,0 +1,130 @@
+"""Rescoring of stored abastecimentos after anomaly rules change"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import logger
+from app.domain.models.enums import StatusAbastecimento, TipoEvento
+from app.repositories.abastecimento_repository import AbastecimentoRepository
+from app.repositories.consumo_repository import ConsumoDeltas, ConsumoRepository
+from app.repositories.evento_repository import EventoRepository
+from app.services.anomaly_rules import HISTORY_RULE_TYPES, RefillFacts, anomaly_rules
+from app.services.event_feed import build_event, event_feed
+
+# Reviewed refills keep their status; only unreviewed ones are rescored
+RESCORABLE_STATUSES = [StatusAbastecimento.PENDENTE, StatusAbastecimento.ANOMALIA]
+
+
+@dataclass
+class BackfillResult:
+    """Counters reported by backfill_anomalies"""
+
+    analisados: int = 0
+    marcados: int = 0
+    desmarcados: int = 0
+
+
+async def backfill_anomalies(
+    session: AsyncSession, chunk_size: int = 10_000, dry_run: bool = False
+) -> BackfillResult:
+    """
+    Rescore every unreviewed abastecimento and persist changed flags.
+
+    Walks the table in id order, scoring each chunk of columns at once with
+    RuleSet.score_batch (vectorized with NumPy). Only rows whose flag changed
+    are evaluated again one by one, for their fired rules, and written with
+    their new score in one bulk UPDATE per chunk: newly anomalous rows
+    become ANOMALIA and rows that are no longer anomalous go back to
+    PENDENTE. The daily anomaly counts and a pontuado event per
+    changed row are written in the same transaction.
+
+    History-based rules (e.g. refills per motorista) are not re-evaluated,
+    so rows flagged by one of them when created stay flagged.
+
+    Args:
+        session: Database session
+        chunk_size: Rows scored and updated per round trip
+        dry_run: Count changes without writing them
+
+    Returns:
+        Number of rows analysed, newly flagged and cleared
+    """
+    repository = AbastecimentoRepository(session)
+    consumo_repository = ConsumoRepository(session)
+    evento_repository = EventoRepository(session)
+    result = BackfillResult()
+    last_id = 0
+
+    while True:
+        rows = await repository.get_scoring_chunk(last_id, chunk_size, RESCORABLE_STATUSES)
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        ruleset = anomaly_rules.ruleset
+        scored_at = datetime.utcnow()
+        updates = []
+        eventos = []
+        deltas = ConsumoDeltas()
+        _, flags = ruleset.score_batch(
+            [row.tipo_combustivel for row in rows],
+            [row.valor for row in rows],
+            [row.litros for row in rows],
+            [row.data_abastecimento for row in rows],
+        )
+        current = np.fromiter((row.eh_anomalia for row in rows), dtype=bool, count=len(rows))
+        for i in np.flatnonzero(flags != current).tolist():
+            row = rows[i]
+            flagged = bool(flags[i])
+            if not flagged and any(
+                regra.get("tipo") in HISTORY_RULE_TYPES for regra in row.regras_anomalia or ()
+            ):
+                continue
+            evaluation = ruleset.evaluate(
+                RefillFacts.build(
+                    row.motorista_id,
+                    row.tipo_combustivel,
+                    row.valor,
+                    row.litros,
+                    row.data_abastecimento,
+                )
+            )
+            update = {
+                "id": row.id,
+                "eh_anomalia": flagged,
+                "status": (
+                    StatusAbastecimento.ANOMALIA if flagged else StatusAbastecimento.PENDENTE
+                ),
+                "pontuacao_anomalia": evaluation.pontuacao,
+                "regras_anomalia": evaluation.regras(),
+                "pontuado_em": scored_at,
+            }
+            updates.append(update)
+            eventos.append(
+                build_event(TipoEvento.PONTUADO, SimpleNamespace(**{**row._mapping, **update}))
+            )
+            deltas.add(
+                row.motorista_id, row.data_abastecimento, quantidade_anomalias=1 if flagged else -1
+            )
+
+        if updates and not dry_run:
+            await repository.update_many(updates, commit=False)
+            await consumo_repository.apply(deltas)
+            await evento_repository.add_many(eventos)
+            await session.commit()
+            event_feed.notify()
+
+        result.analisados += len(rows)
+        newly_flagged = sum(1 for update in updates if update["eh_anomalia"])
+        result.marcados += newly_flagged
+        result.desmarcados += len(updates) - newly_flagged
+        logger.info(
+            f"Backfill: {result.analisados} analisados, "
+            f"{result.marcados} marcados, {result.desmarcados} desmarcados"
+        )
+
+    return result
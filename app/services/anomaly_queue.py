@@ -0,0 +1,206 @@
+"""Asynchronous anomaly scoring of stored refills"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import CallbackMetric, Counter, Histogram, registry
+from app.repositories.abastecimento_repository import AbastecimentoRepository
+
+# Scores the given refill ids and commits (see AbastecimentoService.score_pending)
+ScoreHandler = Callable[[AsyncSession, list[int]], Awaitable[object]]
+
+anomaly_queue_overflow = registry.register(
+    Counter(
+        "anomaly_queue_overflow_total",
+        "Refills not queued because the scoring queue stayed full (left to the sweep)",
+    )
+)
+anomaly_scoring_batches = registry.register(
+    Counter("anomaly_scoring_batches_total", "Anomaly scoring batches by result", ("result",))
+)
+anomaly_scoring_wait = registry.register(
+    Histogram(
+        "anomaly_scoring_queue_seconds",
+        "Time from queueing a refill until its scoring batch finished",
+    )
+)
+
+
+class AnomalyScoringQueue:
+    """
+    Bounded queue of refill ids scored in batches by a pool of asyncio workers.
+
+    The in-memory queue is only a fast path: the durable record of pending
+    work is the refill itself (pontuado_em NULL, even if already reviewed).
+    A periodic sweep queues such refills again, which covers refills that did
+    not fit in the queue, batches that kept failing after their retries and
+    anything lost in a restart.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_size: int = 10_000,
+        batch_size: int = 200,
+        max_retries: int = 3,
+        retry_delay: float = 0.5,
+        put_timeout: float = 0.05,
+        sweep_interval: float = 30.0,
+    ):
+        """Initialize a stopped queue"""
+        self.workers = workers
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.put_timeout = put_timeout
+        self.sweep_interval = sweep_interval
+        self.running = False
+        self._queue: asyncio.Queue[int] | None = None
+        # Queued or in-flight ids and when they were queued (time.monotonic)
+        self._queued: dict[int, float] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._handler: ScoreHandler | None = None
+
+    @property
+    def depth(self) -> int:
+        """Refills waiting in the queue"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(
+        self, session_factory: async_sessionmaker[AsyncSession], handler: ScoreHandler
+    ) -> None:
+        """Start the workers and the sweep (which first recovers pending refills)"""
+        self._session_factory = session_factory
+        self._handler = handler
+        self._queue = asyncio.Queue(self.max_size)
+        self._queued.clear()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep_forever()))
+        self.running = True
+        logger.info(f"Anomaly scoring queue started with {self.workers} workers")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop accepting refills, drain the queue for at most timeout seconds and stop"""
+        if not self.running:
+            return
+        self.running = False
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Anomaly scoring queue stopped with {self.depth} refills queued; "
+                "they will be scored after the next start"
+            )
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, ids: Iterable[int]) -> int:
+        """
+        Queue refills for scoring.
+
+        When the queue is full the caller waits up to put_timeout for room
+        (backpressure on writers); if it is still full, the remaining
+        refills are left for the sweep.
+
+        Returns:
+            Number of refills queued
+        """
+        queued = 0
+        pending = [obj_id for obj_id in ids if obj_id not in self._queued]
+        for index, obj_id in enumerate(pending):
+            try:
+                self._queue.put_nowait(obj_id)
+            except asyncio.QueueFull:
+                try:
+                    await asyncio.wait_for(self._queue.put(obj_id), self.put_timeout)
+                except asyncio.TimeoutError:
+                    anomaly_queue_overflow.inc(len(pending) - index)
+                    break
+            self._queued[obj_id] = time.monotonic()
+            queued += 1
+        return queued
+
+    async def sweep(self) -> int:
+        """Queue stored refills that are still waiting for scoring"""
+        room = self.max_size - self.depth
+        if room < self.batch_size:
+            return 0
+        async with self._session_factory() as session:
+            ids = await AbastecimentoRepository(session).get_unscored_ids(room)
+        return await self.submit(ids)
+
+    async def _sweep_forever(self) -> None:
+        """Run sweep every sweep_interval seconds"""
+        while True:
+            try:
+                recovered = await self.sweep()
+                if recovered:
+                    logger.info(f"Anomaly scoring sweep queued {recovered} refills")
+            except Exception as exc:
+                logger.error(f"Anomaly scoring sweep failed: {exc!r}")
+            await asyncio.sleep(self.sweep_interval)
+
+    async def _worker(self) -> None:
+        """Take up to batch_size queued ids at a time and score them"""
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                await self._score(batch)
+            finally:
+                now = time.monotonic()
+                for obj_id in batch:
+                    queued_at = self._queued.pop(obj_id, None)
+                    if queued_at is not None:
+                        anomaly_scoring_wait.observe(now - queued_at)
+                    self._queue.task_done()
+
+    async def _score(self, batch: list[int]) -> None:
+        """Score a batch, retrying with exponential backoff"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._session_factory() as session:
+                    await self._handler(session, batch)
+                anomaly_scoring_batches.inc(result="ok")
+                return
+            except Exception as exc:
+                if attempt == self.max_retries:
+                    anomaly_scoring_batches.inc(result="failed")
+                    logger.error(
+                        f"Anomaly scoring of {len(batch)} refills failed after "
+                        f"{attempt + 1} attempts, left to the sweep: {exc!r}"
+                    )
+                    return
+                anomaly_scoring_batches.inc(result="retried")
+                logger.warning(f"Anomaly scoring batch failed, retrying: {exc!r}")
+                await asyncio.sleep(self.retry_delay * 2**attempt)
+
+
+anomaly_queue = AnomalyScoringQueue(
+    workers=settings.anomaly_queue_workers,
+    max_size=settings.anomaly_queue_max_size,
+    batch_size=settings.anomaly_queue_batch_size,
+    max_retries=settings.anomaly_queue_max_retries,
+    sweep_interval=settings.anomaly_queue_sweep_seconds,
+)
+
+registry.register(
+    CallbackMetric(
+        "anomaly_queue_depth",
+        "Refills waiting in the anomaly scoring queue",
+        lambda: {(): anomaly_queue.depth},
+    )
+)
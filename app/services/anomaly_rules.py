@@ -0,0 +1,536 @@
+"""Configurable anomaly rule engine"""
+
+import asyncio
+import json
+import os
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, time as dt_time, timedelta
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.timezone import naive_utc, to_local
+from app.services.price_baseline import price_baseline
+from app.services.refill_velocity import RefillWindow
+
+# A compiled rule returns its score (0.0-1.0) when it fires, or None
+RuleCheck = Callable[["RefillFacts"], float | None]
+RuleCompiler = Callable[[dict[str, Any]], RuleCheck]
+# The same check over the valor and litros columns of refills of one fuel
+# type, returning the score of each refill (0.0 where the rule does not fire)
+BatchRuleCheck = Callable[[str, np.ndarray, np.ndarray], np.ndarray]
+BatchRuleCompiler = Callable[[dict[str, Any]], BatchRuleCheck]
+
+
+@dataclass(frozen=True)
+class RefillFacts:
+    """
+    Everything the rules may look at for one refill.
+
+    Datetimes are naive UTC. historico holds the same motorista's refills
+    within RuleSet.janela_historico, or None when history is not available
+    (history-based rules are then skipped). It may also hold refills newer
+    than this one when it is scored late; rules only count those up to
+    data_abastecimento.
+    """
+
+    motorista_id: int
+    tipo_combustivel: str
+    valor: float
+    litros: float
+    data_abastecimento: datetime
+    historico: RefillWindow | None = None
+
+    @classmethod
+    def build(
+        cls,
+        motorista_id: int,
+        tipo_combustivel: str,
+        valor: float,
+        litros: float,
+        data_abastecimento: datetime | None = None,
+        historico: RefillWindow | None = None,
+    ) -> "RefillFacts":
+        """Normalize enum and datetime values"""
+        return cls(
+            motorista_id=motorista_id,
+            tipo_combustivel=str(getattr(tipo_combustivel, "value", tipo_combustivel)),
+            valor=valor,
+            litros=litros,
+            data_abastecimento=naive_utc(data_abastecimento or datetime.utcnow()),
+            historico=historico,
+        )
+
+
+@dataclass(frozen=True)
+class RuleHit:
+    """A rule that fired, with its unweighted score"""
+
+    regra: str
+    tipo: str
+    pontuacao: float
+
+    def as_dict(self) -> dict[str, Any]:
+        """JSON-serializable form stored with the refill"""
+        return {"regra": self.regra, "tipo": self.tipo, "pontuacao": round(self.pontuacao, 4)}
+
+
+@dataclass(frozen=True)
+class AnomalyEvaluation:
+    """Outcome of evaluating a rule set against one refill"""
+
+    eh_anomalia: bool
+    pontuacao: float
+    disparos: tuple[RuleHit, ...] = ()
+    avaliadas: int = 0
+
+    def regras(self) -> list[dict[str, Any]]:
+        """Fired rules in their stored form"""
+        return [hit.as_dict() for hit in self.disparos]
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """A rule with its parameters bound into a check function"""
+
+    id: str
+    tipo: str
+    peso: float
+    custo: int
+    check: RuleCheck
+    check_batch: BatchRuleCheck | None = None
+
+
+# Rules in evaluation order, each with the weight of itself and the rules after it
+RulePlan = tuple[tuple[CompiledRule, float], ...]
+
+# tipo -> (compiler, relative cost); cheaper rules are evaluated first
+RULE_TYPES: dict[str, tuple[RuleCompiler, int]] = {}
+
+# tipo -> compiler of the vectorized form, for rule types that have one
+BATCH_RULE_TYPES: dict[str, BatchRuleCompiler] = {}
+
+# Rule types that need RefillFacts.historico
+HISTORY_RULE_TYPES: set[str] = set()
+
+
+def rule_type(tipo: str, custo: int = 1, historico: bool = False):
+    """Register a compiler for a rule type"""
+
+    def decorator(compiler: RuleCompiler) -> RuleCompiler:
+        RULE_TYPES[tipo] = (compiler, custo)
+        if historico:
+            HISTORY_RULE_TYPES.add(tipo)
+        return compiler
+
+    return decorator
+
+
+def batch_rule_type(tipo: str):
+    """Register the vectorized form of a rule type, used by RuleSet.score_batch"""
+
+    def decorator(compiler: BatchRuleCompiler) -> BatchRuleCompiler:
+        BATCH_RULE_TYPES[tipo] = compiler
+        return compiler
+
+    return decorator
+
+
+def _excess_score(value: float, limit: float) -> float:
+    """Score of a value above its limit: 0.5 at the limit, 1.0 at twice the limit"""
+    return min(0.5 + (value - limit) / limit * 0.5, 1.0)
+
+
+def _excess_scores(values: np.ndarray, limit: float) -> np.ndarray:
+    """_excess_score of each value above limit, 0.0 for the others"""
+    return np.where(values > limit, np.minimum(0.5 + (values - limit) / limit * 0.5, 1.0), 0.0)
+
+
+@rule_type("preco_litro", custo=1)
+def _compile_preco_litro(config: dict[str, Any]) -> RuleCheck:
+    """Price per liter above the fuel's reference price plus a tolerance"""
+    tolerancia = float(config.get("tolerancia", 0.25))
+
+    def check(facts: RefillFacts) -> float | None:
+        if facts.litros <= 0:
+            return None
+        threshold = price_baseline.threshold(facts.tipo_combustivel, tolerancia)
+        price = facts.valor / facts.litros
+        return _excess_score(price, threshold) if price > threshold else None
+
+    return check
+
+
+@batch_rule_type("preco_litro")
+def _compile_preco_litro_batch(config: dict[str, Any]) -> BatchRuleCheck:
+    """Vectorized preco_litro"""
+    tolerancia = float(config.get("tolerancia", 0.25))
+
+    def check(tipo: str, valores: np.ndarray, litros: np.ndarray) -> np.ndarray:
+        threshold = price_baseline.threshold(tipo, tolerancia)
+        prices = np.divide(valores, litros, out=np.zeros_like(valores), where=litros > 0)
+        return _excess_scores(prices, threshold)
+
+    return check
+
+
+def _tank_limits(config: dict[str, Any]) -> tuple[dict[str, float], float | None]:
+    """Liters allowed per fuel type by a volume_maximo rule, and the default"""
+    limits = config["max_litros"]
+    if not isinstance(limits, dict):
+        limits = {"padrao": limits}
+    limits = {tipo: float(limit) for tipo, limit in limits.items()}
+    return limits, limits.get("padrao")
+
+
+@rule_type("volume_maximo", custo=1)
+def _compile_volume_maximo(config: dict[str, Any]) -> RuleCheck:
+    """More liters than a vehicle tank holds"""
+    limits, default = _tank_limits(config)
+
+    def check(facts: RefillFacts) -> float | None:
+        limit = limits.get(facts.tipo_combustivel, default)
+        if limit is None or facts.litros <= limit:
+            return None
+        return _excess_score(facts.litros, limit)
+
+    return check
+
+
+@batch_rule_type("volume_maximo")
+def _compile_volume_maximo_batch(config: dict[str, Any]) -> BatchRuleCheck:
+    """Vectorized volume_maximo"""
+    limits, default = _tank_limits(config)
+
+    def check(tipo: str, valores: np.ndarray, litros: np.ndarray) -> np.ndarray:
+        limit = limits.get(tipo, default)
+        return np.zeros_like(litros) if limit is None else _excess_scores(litros, limit)
+
+    return check
+
+
+@rule_type("fora_do_horario", custo=2)
+def _compile_fora_do_horario(config: dict[str, Any]) -> RuleCheck:
+    """Refill outside the allowed local hours (inicio-fim, may cross midnight)"""
+    inicio = dt_time.fromisoformat(config.get("inicio", "06:00"))
+    fim = dt_time.fromisoformat(config.get("fim", "22:00"))
+
+    def check(facts: RefillFacts) -> float | None:
+        hora = to_local(facts.data_abastecimento).time()
+        allowed = inicio <= hora < fim if inicio <= fim else hora >= inicio or hora < fim
+        return None if allowed else 1.0
+
+    return check
+
+
+@rule_type("frequencia_motorista", custo=3, historico=True)
+def _compile_frequencia_motorista(config: dict[str, Any]) -> RuleCheck:
+    """More than max_abastecimentos refills by the same motorista within janela_horas"""
+    maximo = int(config["max_abastecimentos"])
+    janela = timedelta(hours=float(config["janela_horas"]))
+
+    def check(facts: RefillFacts) -> float | None:
+        if facts.historico is None:
+            return None
+        count, _ = facts.historico.since(
+            facts.data_abastecimento - janela, facts.data_abastecimento
+        )
+        count += 1
+        return _excess_score(count, maximo) if count > maximo else None
+
+    return check
+
+
+@rule_type("volume_motorista", custo=3, historico=True)
+def _compile_volume_motorista(config: dict[str, Any]) -> RuleCheck:
+    """More than max_litros refilled by the same motorista within janela_horas"""
+    maximo = float(config["max_litros"])
+    janela = timedelta(hours=float(config["janela_horas"]))
+
+    def check(facts: RefillFacts) -> float | None:
+        if facts.historico is None:
+            return None
+        _, litros = facts.historico.since(
+            facts.data_abastecimento - janela, facts.data_abastecimento
+        )
+        litros += facts.litros
+        return _excess_score(litros, maximo) if litros > maximo else None
+
+    return check
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """
+    Rules compiled for evaluation.
+
+    Rules are grouped per fuel type ahead of time, so a refill only visits
+    the rules that apply to it, already sorted by cost. Each rule is paired
+    with the total weight of itself and the rules after it, which is what
+    evaluate needs to stop early.
+    """
+
+    limiar: float
+    por_combustivel: dict[str, RulePlan]
+    padrao: RulePlan
+    janela_historico: timedelta | None
+
+    @classmethod
+    def compile(cls, config: dict[str, Any]) -> "RuleSet":
+        """
+        Compile a rule configuration.
+
+        Raises:
+            ValueError: If a rule is malformed or of an unknown type
+        """
+        if not isinstance(config, dict):
+            raise ValueError("A configuração de regras deve ser um objeto JSON")
+        regras = config.get("regras", [])
+        if not isinstance(regras, list):
+            raise ValueError("'regras' deve ser uma lista")
+        try:
+            limiar = float(config.get("limiar", 0.5))
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"limiar inválido: {exc!r}") from exc
+        compiled: list[tuple[CompiledRule, frozenset[str] | None]] = []
+        janela: timedelta | None = None
+        seen: set[str] = set()
+
+        for index, rule in enumerate(regras):
+            if not isinstance(rule, dict):
+                raise ValueError(f"Regra {index}: deve ser um objeto JSON")
+            if not rule.get("ativo", True):
+                continue
+            tipo = rule.get("tipo")
+            if tipo not in RULE_TYPES:
+                raise ValueError(f"Regra {index}: tipo desconhecido {tipo!r}")
+            rule_id = str(rule.get("id", f"{tipo}_{index}"))
+            if rule_id in seen:
+                raise ValueError(f"Regra {index}: id duplicado {rule_id!r}")
+            seen.add(rule_id)
+
+            compiler, custo = RULE_TYPES[tipo]
+            try:
+                check = compiler(rule)
+                check_batch = BATCH_RULE_TYPES[tipo](rule) if tipo in BATCH_RULE_TYPES else None
+                peso = float(rule.get("peso", 1.0))
+                combustiveis = rule.get("combustiveis")
+                fuels = frozenset(map(str, combustiveis)) if combustiveis else None
+                rule_window = (
+                    timedelta(hours=float(rule["janela_horas"]))
+                    if tipo in HISTORY_RULE_TYPES
+                    else None
+                )
+            except (KeyError, TypeError, ValueError) as exc:
+                raise ValueError(f"Regra {rule_id!r} inválida: {exc!r}") from exc
+
+            if peso <= 0:
+                continue
+            compiled.append((CompiledRule(rule_id, tipo, peso, custo, check, check_batch), fuels))
+            if rule_window is not None:
+                janela = rule_window if janela is None else max(janela, rule_window)
+
+        compiled.sort(key=lambda item: (item[0].custo, -item[0].peso))
+        fuel_types = set().union(*(fuels for _, fuels in compiled if fuels))
+
+        def plan(tipo: str | None) -> RulePlan:
+            rules = [rule for rule, fuels in compiled if fuels is None or tipo in fuels]
+            return tuple(
+                (rule, sum(other.peso for other in rules[i:])) for i, rule in enumerate(rules)
+            )
+
+        return cls(limiar, {tipo: plan(tipo) for tipo in fuel_types}, plan(None), janela)
+
+    def rules_for(self, tipo_combustivel: str) -> tuple[CompiledRule, ...]:
+        """Rules that apply to a fuel type, in evaluation order"""
+        return tuple(rule for rule, _ in self.por_combustivel.get(tipo_combustivel, self.padrao))
+
+    def evaluate(self, facts: RefillFacts) -> AnomalyEvaluation:
+        """
+        Evaluate the rules that apply to a refill.
+
+        The score is the weighted sum of fired rules. Evaluation stops as soon
+        as the outcome is settled: once the score reaches limiar, or when the
+        weight of the remaining rules can no longer bring it there.
+        """
+        total = 0.0
+        hits: list[RuleHit] = []
+        evaluated = 0
+
+        for rule, remaining in self.por_combustivel.get(facts.tipo_combustivel, self.padrao):
+            if total >= self.limiar or total + remaining < self.limiar:
+                break
+            evaluated += 1
+            score = rule.check(facts)
+            if score is not None:
+                total += rule.peso * score
+                hits.append(RuleHit(rule.id, rule.tipo, score))
+
+        return AnomalyEvaluation(
+            eh_anomalia=total >= self.limiar,
+            pontuacao=round(total, 4),
+            disparos=tuple(hits),
+            avaliadas=evaluated,
+        )
+
+    def score_batch(
+        self,
+        tipos_combustivel: Sequence[str] | np.ndarray,
+        valores: Sequence[float] | np.ndarray,
+        litros: Sequence[float] | np.ndarray,
+        datas: Sequence[datetime] | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate the rules against a batch of refills given as columns.
+
+        Gives the same score and flag as evaluate without history for each
+        refill, early stops included. Rules run over each fuel type's rows
+        at once, vectorized with NumPy where the rule type registered a
+        batch form (see batch_rule_type) and row by row otherwise.
+        History-based rules are skipped.
+
+        Args:
+            tipos_combustivel: Fuel type of each refill
+            valores: Value of each refill
+            litros: Liters of each refill
+            datas: Date of each refill (naive UTC), or None for now
+
+        Returns:
+            Tuple of (scores as float64 array, anomaly flags as bool array)
+        """
+        valores = np.asarray(valores, dtype=np.float64)
+        litros = np.asarray(litros, dtype=np.float64)
+        if not isinstance(tipos_combustivel, np.ndarray):
+            # Enum members must be converted to their values explicitly
+            tipos_combustivel = [getattr(tipo, "value", tipo) for tipo in tipos_combustivel]
+        tipos = np.asarray(tipos_combustivel, dtype=str)
+        if not (len(tipos) == len(valores) == len(litros)):
+            raise ValueError("tipos_combustivel, valores and litros must have the same length")
+        now = datetime.utcnow()
+
+        scores = np.zeros(len(tipos), dtype=np.float64)
+        fuel_types, fuel_index = np.unique(tipos, return_inverse=True)
+        for index, tipo in enumerate(fuel_types.tolist()):
+            rows = np.flatnonzero(fuel_index == index)
+            fuel_valores, fuel_litros = valores[rows], litros[rows]
+            total = np.zeros(len(rows), dtype=np.float64)
+            for rule, remaining in self.por_combustivel.get(tipo, self.padrao):
+                active = (total < self.limiar) & (total + remaining >= self.limiar)
+                if not active.any():
+                    break
+                if rule.tipo in HISTORY_RULE_TYPES:
+                    continue
+                if rule.check_batch is not None:
+                    rule_scores = rule.check_batch(tipo, fuel_valores, fuel_litros)
+                else:
+                    rule_scores = np.zeros(len(rows), dtype=np.float64)
+                    for i in np.flatnonzero(active).tolist():
+                        facts = RefillFacts.build(
+                            0,
+                            tipo,
+                            float(fuel_valores[i]),
+                            float(fuel_litros[i]),
+                            datas[rows[i]] if datas is not None else now,
+                        )
+                        rule_scores[i] = rule.check(facts) or 0.0
+                total = np.where(active, total + rule.peso * rule_scores, total)
+            scores[rows] = total
+
+        return np.round(scores, 4), scores >= self.limiar
+
+
+DEFAULT_RULES: dict[str, Any] = {
+    "limiar": 0.5,
+    "regras": [{"id": "preco_por_litro", "tipo": "preco_litro", "peso": 1.0, "tolerancia": 0.25}],
+}
+
+
+class AnomalyRuleEngine:
+    """
+    Rule set loaded from a JSON file and recompiled when the file changes.
+
+    Once started, a background task checks the file's modification time
+    every reload_interval seconds, reading the file in a worker thread, so
+    requests only ever read the compiled rules. A file that fails to load
+    or compile is logged and the previous rules stay in use. Without a
+    file, DEFAULT_RULES (price per liter only) apply.
+    """
+
+    def __init__(self, path: str | os.PathLike[str] | None, reload_interval: float = 5.0):
+        """Initialize the engine and compile the current rules"""
+        self.path = Path(path) if path else None
+        self.reload_interval = reload_interval
+        self._mtime: float | None = None
+        self._ruleset = RuleSet.compile(DEFAULT_RULES)
+        self._task: asyncio.Task | None = None
+        self.reload()
+
+    @property
+    def ruleset(self) -> RuleSet:
+        """Current rules"""
+        return self._ruleset
+
+    async def start(self) -> None:
+        """Watch the rules file for changes"""
+        if self.path is not None:
+            self._task = asyncio.create_task(self._watch_forever())
+
+    async def stop(self) -> None:
+        """Stop watching the rules file"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _watch_forever(self) -> None:
+        """Run reload every reload_interval seconds"""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await asyncio.to_thread(self.reload)
+            except Exception as exc:
+                logger.error(f"Anomaly rules reload failed: {exc!r}")
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Recompile the rules if the file changed since the last load.
+
+        Returns:
+            True if a new rule set is in use
+        """
+        if self.path is None:
+            return False
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            if self._mtime is not None:
+                logger.warning(f"Anomaly rules file {self.path} not found; keeping current rules")
+            return False
+        if mtime == self._mtime and not force:
+            return False
+
+        try:
+            ruleset = RuleSet.compile(json.loads(self.path.read_text(encoding="utf-8")))
+        except (OSError, ValueError) as exc:
+            # Includes JSON syntax errors and wrongly shaped rules
+            logger.error(f"Invalid anomaly rules in {self.path}: {exc}; keeping current rules")
+            self._mtime = mtime
+            return False
+
+        self._ruleset = ruleset
+        self._mtime = mtime
+        logger.info(f"Anomaly rules loaded from {self.path}")
+        return True
+
+    def evaluate(self, facts: RefillFacts) -> AnomalyEvaluation:
+        """Evaluate the current rules against a refill"""
+        return self.ruleset.evaluate(facts)
+
+
+anomaly_rules = AnomalyRuleEngine(
+    settings.anomaly_rules_path, reload_interval=settings.anomaly_rules_reload_seconds
+)
@@ -1,62 +1,127 @@
 """Anomaly detection service"""
 
+from collections.abc import Sequence
+from datetime import datetime
+
+import numpy as np
+
 from app.domain.models.abastecimento import Abastecimento
+from app.services.anomaly_rules import AnomalyEvaluation, RefillFacts, anomaly_rules
+from app.services.refill_velocity import RefillWindow
 
 
 class AnomalyService:
     """Service for detecting anomalies in fuel refills"""
 
-    ANOMALY_THRESHOLD = 0.25  # 25% threshold for anomaly detection
+    @staticmethod
+    def evaluate(
+        abastecimento: Abastecimento, historico: RefillWindow | None = None
+    ) -> AnomalyEvaluation:
+        """
+        Evaluate the configured anomaly rules against an abastecimento.
+
+        Args:
+            abastecimento: Abastecimento object to analyze
+            historico: The motorista's previous refills within
+                anomaly_rules.ruleset.janela_historico, or None to skip the
+                rules that depend on history
+
+        Returns:
+            Overall score and flag, and the rules that fired
+        """
+        return anomaly_rules.evaluate(
+            RefillFacts.build(
+                abastecimento.motorista_id,
+                abastecimento.tipo_combustivel,
+                abastecimento.valor,
+                abastecimento.litros,
+                abastecimento.data_abastecimento,
+                historico,
+            )
+        )
 
     @staticmethod
-    def detect_anomaly(abastecimento: Abastecimento) -> bool:
+    def detect_anomaly(
+        abastecimento: Abastecimento, historico: RefillWindow | None = None
+    ) -> bool:
         """
-        Detect if an abastecimento is anomalous based on price per liter.
+        Detect if an abastecimento is anomalous according to the configured rules.
 
-        An abastecimento is considered anomalous if the price per liter
-        exceeds 25% of the average price for that fuel type.
+        With the default rules, an abastecimento is anomalous if the price per
+        liter exceeds by more than 25% the reference price for its fuel type,
+        taken from the in-memory rolling baseline (see price_baseline). See
+        anomaly_rules for the other rule types.
 
         Args:
             abastecimento: Abastecimento object to analyze
+            historico: The motorista's previous refills (see evaluate)
 
         Returns:
             True if anomalous, False otherwise
         """
-        if abastecimento.litros == 0:
-            return False
+        return AnomalyService.evaluate(abastecimento, historico).eh_anomalia
 
-        price_per_liter = abastecimento.valor / abastecimento.litros
+    @staticmethod
+    def detect_anomalies(
+        tipos_combustivel: Sequence[str], valores: Sequence[float], litros: Sequence[float]
+    ) -> list[bool]:
+        """
+        Detect anomalies for a batch of refills in one pass.
 
-        # For now, we use a simple threshold based on typical fuel prices
-        # In a real scenario, this would compare against historical data
-        # or use machine learning models
+        Same rules as detect_anomaly, applied to plain column values so that
+        batches do not need to build ORM objects first. Refills are taken as
+        happening now and history-based rules are skipped.
 
-        # Typical threshold: ~R$ 6.50 per liter (adjusted for 25% threshold)
-        # This is a placeholder - in production, you'd fetch from database
-        normal_price_threshold = 8.12  # ~25% above R$ 6.50
+        Args:
+            tipos_combustivel: Fuel type of each refill
+            valores: Value of each refill
+            litros: Liters of each refill
 
-        return price_per_liter > normal_price_threshold
+        Returns:
+            Anomaly flag for each refill, in input order
+        """
+        _, flags = AnomalyService.score_batch(tipos_combustivel, valores, litros)
+        return flags.tolist()
 
     @staticmethod
-    def get_anomaly_score(abastecimento: Abastecimento) -> float:
+    def score_batch(
+        tipos_combustivel: Sequence[str] | np.ndarray,
+        valores: Sequence[float] | np.ndarray,
+        litros: Sequence[float] | np.ndarray,
+        datas: Sequence[datetime] | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
         """
-        Calculate anomaly score for an abastecimento (0.0 to 1.0).
+        Score a batch of refills given as columns, vectorized with NumPy.
+
+        Produces exactly what get_anomaly_score and detect_anomaly return for
+        each refill without history, under the configured rules (see
+        RuleSet.score_batch), without building ORM objects.
 
         Args:
-            abastecimento: Abastecimento object to analyze
+            tipos_combustivel: Fuel type of each refill
+            valores: Value of each refill
+            litros: Liters of each refill
+            datas: Date of each refill, or None for now
 
         Returns:
-            Anomaly score between 0.0 (normal) and 1.0 (highly anomalous)
+            Tuple of (scores as float64 array, anomaly flags as bool array)
         """
-        if abastecimento.litros == 0:
-            return 0.0
+        return anomaly_rules.ruleset.score_batch(tipos_combustivel, valores, litros, datas)
 
-        price_per_liter = abastecimento.valor / abastecimento.litros
-        normal_price_threshold = 8.12
+    @staticmethod
+    def get_anomaly_score(abastecimento: Abastecimento) -> float:
+        """
+        Calculate the anomaly score of an abastecimento under the configured rules.
+
+        The score is the weighted sum of the rules that fired (see
+        anomaly_rules); the abastecimento is anomalous from the rule set's
+        limiar on. With the default rules it is 0.0 up to 25% above the
+        reference price and grows to 1.0 at twice that price.
 
-        if price_per_liter <= normal_price_threshold:
-            score = (price_per_liter / normal_price_threshold) * 0.5
-        else:
-            score = 0.5 + ((price_per_liter - normal_price_threshold) / normal_price_threshold) * 0.5
+        Args:
+            abastecimento: Abastecimento object to analyze
 
-        return min(score, 1.0)
+        Returns:
+            Anomaly score, 0.0 when no rule fired
+        """
+        return AnomalyService.evaluate(abastecimento).pontuacao
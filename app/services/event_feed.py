@@ -0,0 +1,171 @@
+"""Change feed of abastecimento events"""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import async_session_maker
+from app.domain.models.enums import TipoEvento
+from app.domain.models.evento import EventoAbastecimento
+from app.repositories.evento_repository import EventoRepository
+
+
+def build_event(tipo: TipoEvento, abastecimento: Any) -> dict:
+    """
+    Event row describing the current state of an abastecimento.
+
+    Args:
+        tipo: What happened
+        abastecimento: Abastecimento, or any object with the same attributes
+
+    Returns:
+        Values for EventoRepository.add_many
+    """
+    data = abastecimento.data_abastecimento
+    return {
+        "abastecimento_id": abastecimento.id,
+        "motorista_id": abastecimento.motorista_id,
+        "tipo": tipo.value,
+        "dados": {
+            "id": abastecimento.id,
+            "motorista_id": abastecimento.motorista_id,
+            "tipo_combustivel": getattr(
+                abastecimento.tipo_combustivel, "value", abastecimento.tipo_combustivel
+            ),
+            "valor": abastecimento.valor,
+            "litros": abastecimento.litros,
+            "status": getattr(abastecimento.status, "value", abastecimento.status),
+            "eh_anomalia": abastecimento.eh_anomalia,
+            "pontuacao_anomalia": getattr(abastecimento, "pontuacao_anomalia", None),
+            "motivo_recusa": getattr(abastecimento, "motivo_recusa", None),
+            "data_abastecimento": data.isoformat() if isinstance(data, datetime) else data,
+        },
+    }
+
+
+class EventFeed:
+    """
+    Wakes up change feed readers when events are committed.
+
+    Readers in this process are notified right after the commit; events
+    written by other processes are picked up by polling every poll_interval
+    seconds while waiting. Readers also number the committed events (see
+    sequence) before each query, so seqs need no coordination between
+    writers.
+    """
+
+    def __init__(self, poll_interval: float = 1.0):
+        """Initialize the feed"""
+        self.poll_interval = poll_interval
+        self._changed = asyncio.Event()
+
+    def notify(self) -> None:
+        """Signal that new events were committed"""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def subscribe(self) -> asyncio.Event:
+        """
+        Event set on the next notify.
+
+        Take it before querying, so that events committed between the query
+        and the wait are not missed.
+        """
+        return self._changed
+
+    async def wait(self, changed: asyncio.Event, timeout: float) -> bool:
+        """Wait for changed or at most min(timeout, poll_interval) seconds"""
+        try:
+            await asyncio.wait_for(changed.wait(), min(timeout, self.poll_interval))
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def sequence(self, session: AsyncSession) -> None:
+        """Number the committed events (see EventoRepository.assign_seqs)"""
+        if await EventoRepository(session).assign_seqs():
+            # Wakes up the readers that found numbering already in progress
+            self.notify()
+
+    async def read(
+        self, session: AsyncSession, apos: int, limite: int, espera: float
+    ) -> list[EventoAbastecimento]:
+        """
+        Get events after apos, waiting up to espera seconds for the first one (long polling).
+
+        Events committed since the last query are numbered first. The session
+        is closed after each query (the events stay loaded), so no database
+        connection is held while waiting.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + espera
+        repository = EventoRepository(session)
+        while True:
+            changed = self.subscribe()
+            await self.sequence(session)
+            eventos = await repository.get_after(apos, limite)
+            await session.close()
+            remaining = deadline - loop.time()
+            if eventos or remaining <= 0:
+                return eventos
+            await self.wait(changed, remaining)
+
+    async def stream(
+        self,
+        apos: int,
+        limite: int = 500,
+        heartbeat: float = 15.0,
+        session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+    ) -> AsyncIterator[str]:
+        """
+        Yield events after apos as Server-Sent Events, forever.
+
+        Each event carries its seq as the SSE id, so a reconnecting client
+        resumes with the Last-Event-ID header. A comment line is sent after
+        heartbeat seconds without events to keep proxies from closing the
+        connection. The generator owns short-lived sessions because it
+        outlives the request handler.
+        """
+        loop = asyncio.get_running_loop()
+        last_sent = loop.time()
+        while True:
+            changed = self.subscribe()
+            async with session_factory() as session:
+                await self.sequence(session)
+                eventos = await EventoRepository(session).get_after(apos, limite)
+            for evento in eventos:
+                apos = evento.seq
+                yield format_sse(evento)
+            if eventos:
+                last_sent = loop.time()
+                if len(eventos) == limite:
+                    continue
+            elif loop.time() - last_sent >= heartbeat:
+                last_sent = loop.time()
+                yield ": keepalive\n\n"
+            await self.wait(changed, heartbeat)
+
+
+def event_json(evento: EventoAbastecimento) -> dict:
+    """JSON form of an event, as served by the change feed"""
+    return {
+        "seq": evento.seq,
+        "tipo": evento.tipo,
+        "abastecimento_id": evento.abastecimento_id,
+        "motorista_id": evento.motorista_id,
+        "dados": evento.dados,
+        "criado_em": evento.criado_em.isoformat(),
+    }
+
+
+def format_sse(evento: EventoAbastecimento) -> str:
+    """Server-Sent Events frame of an event"""
+    data = json.dumps(event_json(evento), ensure_ascii=False)
+    return f"id: {evento.seq}\nevent: {evento.tipo}\ndata: {data}\n\n"
+
+
+event_feed = EventFeed()
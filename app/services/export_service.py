@@ -0,0 +1,96 @@
+"""Streaming export of abastecimentos"""
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import async_session_maker
+from app.domain.models.abastecimento import Abastecimento
+from app.repositories.abastecimento_repository import (
+    AbastecimentoFilters,
+    AbastecimentoRepository,
+)
+
+EXPORT_COLUMNS = [column.name for column in Abastecimento.__table__.columns]
+
+
+class FormatoExportacao(str, Enum):
+    """Export file formats"""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        """HTTP media type of the format"""
+        return "application/x-ndjson" if self is FormatoExportacao.NDJSON else "text/csv"
+
+
+def _plain(value: object) -> object:
+    """Convert a column value to a JSON/CSV friendly value"""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _csv_plain(value: object) -> object:
+    """Like _plain, with JSON columns (e.g. regras_anomalia) encoded as JSON text"""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return _plain(value)
+
+
+async def export_abastecimentos(
+    filters: AbastecimentoFilters,
+    formato: FormatoExportacao,
+    chunk_size: int = 1000,
+    session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+) -> AsyncIterator[str]:
+    """
+    Stream abastecimentos matching filters as NDJSON or CSV text.
+
+    Rows come from a server-side cursor and are encoded straight from their
+    column values, chunk_size rows per yielded string, so memory stays
+    constant for any export size. The generator owns its session because it
+    outlives the request handler that creates it.
+
+    Args:
+        filters: Same filters as the listing endpoint
+        formato: Output format
+        chunk_size: Rows fetched from the database and yielded at a time
+        session_factory: Session factory (overridable in tests)
+
+    Yields:
+        Encoded chunks of the export
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if formato is FormatoExportacao.CSV:
+        writer.writerow(EXPORT_COLUMNS)
+
+    async with session_factory() as session:
+        repository = AbastecimentoRepository(session)
+        rows = 0
+        async for row in repository.stream_rows(filters, chunk_size):
+            if formato is FormatoExportacao.CSV:
+                writer.writerow([_csv_plain(value) for value in row])
+            else:
+                buffer.write(
+                    json.dumps(
+                        {column: _plain(value) for column, value in zip(EXPORT_COLUMNS, row)},
+                        ensure_ascii=False,
+                    )
+                )
+                buffer.write("\n")
+
+            rows += 1
+            if rows % chunk_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
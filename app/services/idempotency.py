@@ -0,0 +1,202 @@
+"""Idempotency key store"""
+
+import asyncio
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.logging import logger
+from app.core.metrics import Counter, registry
+from app.repositories.idempotencia_repository import IdempotenciaRepository
+
+idempotency_requests = registry.register(
+    Counter(
+        "idempotency_requests_total",
+        "Requests with an Idempotency-Key by outcome",
+        ("outcome",),
+    )
+)
+
+
+class Desfecho(str, Enum):
+    """Outcome of looking up an Idempotency-Key"""
+
+    # First request with this key: process it and record the response
+    NOVA = "nova"
+    # Retry of a finished request: send the recorded response
+    REPETIDA = "repetida"
+    # The first request with this key is still being processed
+    EM_ANDAMENTO = "em_andamento"
+    # The key was used for a different request
+    CONFLITO = "conflito"
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """Response recorded for a key (body zlib-compressed)"""
+
+    fingerprint: str
+    status_code: int
+    content_type: str | None
+    corpo: bytes
+
+    @property
+    def body(self) -> bytes:
+        """Uncompressed response body"""
+        return zlib.decompress(self.corpo)
+
+
+class IdempotencyStore:
+    """
+    Expiring record of the responses sent for each Idempotency-Key.
+
+    The table is the source of truth and serializes concurrent requests with
+    the same key; finished responses are also kept in an in-process TTL/LRU
+    cache, so a retry reaching the same process is answered without a
+    database round trip. Entries never change once finished, so the cache
+    needs no invalidation.
+
+    A key is reserved for lease while its first request runs, and for ttl
+    once its response is recorded. If the process dies or the request is
+    cancelled before either, retries get EM_ANDAMENTO only until the lease
+    runs out and then take the key over.
+    """
+
+    def __init__(
+        self,
+        ttl: timedelta,
+        lease: timedelta = timedelta(seconds=60),
+        cache_size: int = 10_000,
+        purge_interval: float = 3600.0,
+        session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+    ):
+        """Initialize store"""
+        self.ttl = ttl
+        self.lease = lease
+        self.purge_interval = purge_interval
+        self.session_factory = session_factory
+        self.cache = TTLCache(maxsize=cache_size, ttl=ttl.total_seconds())
+        self._purge_task: asyncio.Task | None = None
+
+    async def begin(
+        self, chave: str, fingerprint: str
+    ) -> tuple[Desfecho, StoredResponse | None, datetime | None]:
+        """
+        Look up a key and reserve it if it is new (or expired).
+
+        Args:
+            chave: Idempotency-Key header value
+            fingerprint: Hash identifying the request
+
+        Returns:
+            Tuple of (outcome, recorded response for REPETIDA, reservation
+            time for NOVA, to pass to complete or release)
+        """
+        stored = self.cache.get(chave)
+        if stored is None:
+            now = datetime.utcnow()
+            async with self.session_factory() as session:
+                repository = IdempotenciaRepository(session)
+                reserved = await repository.reserve(chave, fingerprint, now, now + self.lease)
+                row = None if reserved else await repository.get(chave)
+                await session.commit()
+            if reserved:
+                return self._outcome(Desfecho.NOVA, reservada_em=now)
+            if row is None:
+                # Released between the two statements; let the client retry
+                return self._outcome(Desfecho.EM_ANDAMENTO)
+            if row.fingerprint != fingerprint:
+                return self._outcome(Desfecho.CONFLITO)
+            if row.status_code is None:
+                return self._outcome(Desfecho.EM_ANDAMENTO)
+            stored = StoredResponse(row.fingerprint, row.status_code, row.content_type, row.corpo)
+            self.cache.set(chave, stored)
+
+        if stored.fingerprint != fingerprint:
+            return self._outcome(Desfecho.CONFLITO)
+        return self._outcome(Desfecho.REPETIDA, stored)
+
+    async def complete(
+        self,
+        chave: str,
+        fingerprint: str,
+        reservada_em: datetime,
+        status_code: int,
+        content_type: str | None,
+        body: bytes,
+    ) -> None:
+        """Record the response of a reservation made by begin"""
+        stored = StoredResponse(fingerprint, status_code, content_type, zlib.compress(body, 1))
+        async with self.session_factory() as session:
+            recorded = await IdempotenciaRepository(session).complete(
+                chave,
+                reservada_em,
+                status_code,
+                content_type,
+                stored.corpo,
+                datetime.utcnow() + self.ttl,
+            )
+            await session.commit()
+        if recorded:
+            self.cache.set(chave, stored)
+        else:
+            logger.warning(f"Idempotency-Key {chave!r} was taken over after its lease ran out")
+
+    async def release(self, chave: str, reservada_em: datetime) -> None:
+        """Free a reservation made by begin whose request failed"""
+        async with self.session_factory() as session:
+            await IdempotenciaRepository(session).release(chave, reservada_em)
+            await session.commit()
+
+    async def purge(self) -> int:
+        """Delete expired keys"""
+        async with self.session_factory() as session:
+            deleted = await IdempotenciaRepository(session).delete_expired(datetime.utcnow())
+            await session.commit()
+        return deleted
+
+    async def start(self) -> None:
+        """Start purging expired keys every purge_interval seconds"""
+        self._purge_task = asyncio.create_task(self._purge_forever())
+
+    async def stop(self) -> None:
+        """Stop the purge task"""
+        if self._purge_task is not None:
+            self._purge_task.cancel()
+            await asyncio.gather(self._purge_task, return_exceptions=True)
+            self._purge_task = None
+
+    async def _purge_forever(self) -> None:
+        """Run purge every purge_interval seconds"""
+        while True:
+            try:
+                deleted = await self.purge()
+                if deleted:
+                    logger.info(f"Idempotency keys purged: {deleted}")
+            except Exception as exc:
+                logger.error(f"Idempotency key purge failed: {exc!r}")
+            await asyncio.sleep(self.purge_interval)
+
+    @staticmethod
+    def _outcome(
+        desfecho: Desfecho,
+        stored: StoredResponse | None = None,
+        reservada_em: datetime | None = None,
+    ) -> tuple[Desfecho, StoredResponse | None, datetime | None]:
+        """Count an outcome and return it"""
+        idempotency_requests.inc(outcome=desfecho.value)
+        return desfecho, stored, reservada_em
+
+
+idempotency_store = IdempotencyStore(
+    ttl=timedelta(hours=settings.idempotency_ttl_hours),
+    lease=timedelta(seconds=settings.idempotency_lease_seconds),
+    cache_size=settings.idempotency_cache_max_size,
+    purge_interval=settings.idempotency_purge_seconds,
+)
@@ -0,0 +1,125 @@
+"""Read-through cache of motorista existence and active status"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import CacheBackend, TTLCache
+from app.core.config import settings
+from app.core.metrics import CallbackMetric, registry
+from app.repositories.motorista_repository import MotoristaRepository
+
+
+class MotoristaCache:
+    """
+    Cache in front of MotoristaRepository for the refill write path.
+
+    Lookups go to an in-process TTL/LRU cache first, then to the optional
+    shared backend, and finally to the database with a single IN query for
+    all misses. The shared backend is read and written with one multi-key
+    call per lookup rather than one call per id. Only existing motoristas are
+    cached, so a newly created motorista is never reported as missing.
+    Entries are invalidated explicitly when a motorista changes; other
+    processes without a shared backend see the change after at most ttl
+    seconds.
+    """
+
+    KEY_PREFIX = "motorista:"
+
+    def __init__(self, maxsize: int, ttl: float, backend: CacheBackend | None = None):
+        """Initialize cache"""
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.backend = backend
+
+    async def get_active_flags(self, session: AsyncSession, ids: set[int]) -> dict[int, bool]:
+        """
+        Get the ativo flag of each existing motorista among the given IDs.
+
+        Args:
+            session: Database session used for cache misses
+            ids: Motorista IDs to look up
+
+        Returns:
+            Mapping of existing motorista ID to its ativo flag
+        """
+        found: dict[int, bool] = {}
+        missing: set[int] = set()
+        for motorista_id in ids:
+            ativo = self.local.get(motorista_id)
+            if ativo is None:
+                missing.add(motorista_id)
+            else:
+                found[motorista_id] = ativo
+
+        if missing and self.backend is not None:
+            keys = sorted(missing)
+            values = await self.backend.get_many([f"{self.KEY_PREFIX}{key}" for key in keys])
+            for motorista_id, value in zip(keys, values):
+                if value is not None:
+                    ativo = value == "1"
+                    self.local.set(motorista_id, ativo)
+                    found[motorista_id] = ativo
+                    missing.discard(motorista_id)
+
+        if missing:
+            loaded = await MotoristaRepository(session).get_active_flags(missing)
+            for motorista_id, ativo in loaded.items():
+                self.local.set(motorista_id, ativo)
+            if loaded and self.backend is not None:
+                await self.backend.set_many(
+                    {
+                        f"{self.KEY_PREFIX}{motorista_id}": "1" if ativo else "0"
+                        for motorista_id, ativo in loaded.items()
+                    },
+                    self.local.ttl,
+                )
+            found.update(loaded)
+
+        return found
+
+    async def get_active_flag(self, session: AsyncSession, motorista_id: int) -> bool | None:
+        """Get the ativo flag of a motorista, or None if it does not exist"""
+        flags = await self.get_active_flags(session, {motorista_id})
+        return flags.get(motorista_id)
+
+    async def invalidate(self, motorista_id: int) -> None:
+        """Drop a motorista from the local and shared caches"""
+        self.local.delete(motorista_id)
+        if self.backend is not None:
+            await self.backend.delete(f"{self.KEY_PREFIX}{motorista_id}")
+
+    def metrics(self) -> dict[str, int | float]:
+        """Hit/miss counters of the local cache"""
+        stats = self.local.stats
+        return {
+            "hits": stats.hits,
+            "misses": stats.misses,
+            "hit_rate": stats.hit_rate,
+            "evictions": stats.evictions,
+            "size": len(self.local),
+        }
+
+
+motorista_cache = MotoristaCache(
+    maxsize=settings.motorista_cache_max_size,
+    ttl=settings.motorista_cache_ttl_seconds,
+)
+
+
+def _cache_events() -> dict[tuple[str, ...], float]:
+    """Cache counters for the cache_events_total metric"""
+    stats = motorista_cache.local.stats
+    return {
+        ("motoristas", "hit"): stats.hits,
+        ("motoristas", "miss"): stats.misses,
+        ("motoristas", "eviction"): stats.evictions,
+    }
+
+
+registry.register(
+    CallbackMetric(
+        "cache_events_total",
+        "Cache hits, misses and evictions",
+        _cache_events,
+        ("cache", "event"),
+        type="counter",
+    )
+)
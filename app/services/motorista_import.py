@@ -0,0 +1,254 @@
+"""Bulk import of motoristas from CSV or NDJSON files"""
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from enum import Enum
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import async_session_maker
+from app.core.logging import logger
+from app.domain.exceptions import MotoristaDuplicadoError
+from app.domain.schemas.motorista import (
+    MotoristaImportErro,
+    MotoristaImportRegistro,
+    MotoristaImportResponse,
+)
+from app.domain.validators.cpf import strip_cpf, validate_cpfs
+from app.domain.validators.email import normalize_emails
+from app.repositories.motorista_repository import MotoristaRepository
+
+
+class FormatoImportacao(str, Enum):
+    """Import file formats"""
+
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+    @classmethod
+    def from_media_type(cls, content_type: str) -> "FormatoImportacao | None":
+        """Format of a Content-Type header, or None if not supported"""
+        media_type = content_type.split(";", 1)[0].strip().lower()
+        if media_type in ("text/csv", "application/csv"):
+            return cls.CSV
+        if media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+            return cls.NDJSON
+        return None
+
+
+@dataclass(frozen=True)
+class ProgressoImportacao:
+    """Import progress, reported after each chunk"""
+
+    processados: int
+    total: int
+    criados: int
+    falhas: int
+
+
+def parse_rows(content: bytes, formato: FormatoImportacao) -> list[tuple[int, object]]:
+    """
+    Split an import file into (line number, raw row) pairs.
+
+    CSV files need a header with the column names (nome, cpf, email and
+    optionally telefone); empty cells are missing values. NDJSON has one
+    JSON object per line, blank lines ignored; lines that are not valid JSON
+    are kept as None so they can be reported.
+
+    Raises:
+        ValueError: If the file is not UTF-8 or a CSV file has no header
+    """
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError as exc:
+        raise ValueError("O arquivo deve estar em UTF-8") from exc
+    rows: list[tuple[int, object]] = []
+
+    if formato is FormatoImportacao.CSV:
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames:
+            raise ValueError("O arquivo CSV deve ter um cabeçalho")
+        for row in reader:
+            values = {key.strip(): value.strip() for key, value in row.items() if key and value}
+            rows.append((reader.line_num, values))
+        return rows
+
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            rows.append((number, json.loads(line)))
+        except ValueError:
+            rows.append((number, None))
+    return rows
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    """Summarize a Pydantic validation error in one line"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'registro'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+class MotoristaImporter:
+    """
+    Imports motoristas in bulk, reporting progress and per-row errors.
+
+    Every row is validated up front: fields with Pydantic, then all CPFs
+    with validate_cpfs and all emails with normalize_emails in one pass.
+    Rows repeating the CPF or email of an earlier row are rejected. The
+    remaining rows are written chunk_size at a time, each chunk with one IN
+    query for CPFs and emails already registered and one multi-row INSERT
+    ... ON CONFLICT DO NOTHING, and committed. A failure therefore keeps the
+    chunks imported so far.
+    """
+
+    def __init__(self, session: AsyncSession, chunk_size: int = 1000):
+        """Initialize importer"""
+        self.session = session
+        self.repository = MotoristaRepository(session)
+        self.chunk_size = chunk_size
+        self.total = 0
+        self.criados = 0
+        self.erros: list[MotoristaImportErro] = []
+
+    def _fail(self, linha: int, erro: str) -> None:
+        """Record a rejected row"""
+        self.erros.append(MotoristaImportErro(linha=linha, erro=erro))
+
+    def _validate(self, rows: list[tuple[int, object]]) -> list[tuple[int, dict]]:
+        """Validate every row, returning the importable ones as insert values"""
+        parsed: list[tuple[int, MotoristaImportRegistro]] = []
+        for linha, raw in rows:
+            if raw is None:
+                self._fail(linha, "JSON inválido")
+                continue
+            try:
+                parsed.append((linha, MotoristaImportRegistro.model_validate(raw)))
+            except ValidationError as exc:
+                self._fail(linha, _format_validation_error(exc))
+
+        cpfs = [strip_cpf(registro.cpf) for _, registro in parsed]
+        valid_cpfs = validate_cpfs(cpfs).tolist()
+        emails = normalize_emails([registro.email for _, registro in parsed])
+
+        values: list[tuple[int, dict]] = []
+        cpf_lines: dict[str, int] = {}
+        email_lines: dict[str, int] = {}
+        for (linha, registro), cpf, cpf_ok, email in zip(parsed, cpfs, valid_cpfs, emails):
+            if not cpf_ok:
+                self._fail(linha, "cpf: CPF inválido")
+            elif email is None:
+                self._fail(linha, "email: email inválido")
+            elif cpf in cpf_lines:
+                self._fail(linha, f"CPF repetido no arquivo (linha {cpf_lines[cpf]})")
+            elif email in email_lines:
+                self._fail(linha, f"Email repetido no arquivo (linha {email_lines[email]})")
+            else:
+                cpf_lines[cpf] = email_lines[email] = linha
+                values.append(
+                    (
+                        linha,
+                        {
+                            "nome": registro.nome,
+                            "cpf": cpf,
+                            "email": email,
+                            "telefone": registro.telefone,
+                        },
+                    )
+                )
+        return values
+
+    async def _insert_chunk(self, chunk: list[tuple[int, dict]]) -> None:
+        """Insert one chunk of validated rows and commit"""
+        taken_cpfs, taken_emails = await self.repository.get_existing_keys(
+            [row["cpf"] for _, row in chunk], [row["email"] for _, row in chunk]
+        )
+        now = datetime.utcnow()
+        pending = []
+        for linha, row in chunk:
+            if row["cpf"] in taken_cpfs:
+                self._fail(linha, str(MotoristaDuplicadoError("cpf")))
+            elif row["email"] in taken_emails:
+                self._fail(linha, str(MotoristaDuplicadoError("email")))
+            else:
+                pending.append(
+                    (linha, {**row, "ativo": True, "criado_em": now, "atualizado_em": now})
+                )
+
+        inserted = await self.repository.insert_new([row for _, row in pending])
+        await self.session.commit()
+        for linha, row in pending:
+            if row["cpf"] not in inserted:
+                # Registered by a concurrent request since the IN query
+                self._fail(linha, "Motorista com este CPF ou email já existe")
+        self.criados += len(inserted)
+
+    async def run(self, rows: list[tuple[int, object]]) -> AsyncIterator[ProgressoImportacao]:
+        """
+        Import the rows of a file.
+
+        Yields:
+            Progress after validation and after each committed chunk
+        """
+        self.total = len(rows)
+        values = self._validate(rows)
+        processed = self.total - len(values)
+        yield self._progress(processed)
+
+        for start in range(0, len(values), self.chunk_size):
+            chunk = values[start : start + self.chunk_size]
+            await self._insert_chunk(chunk)
+            processed += len(chunk)
+            yield self._progress(processed)
+
+        logger.info(f"Motorista import: {self.criados} created, {len(self.erros)} rejected")
+
+    def _progress(self, processed: int) -> ProgressoImportacao:
+        """Current progress, processed rows being validated or written"""
+        return ProgressoImportacao(
+            processados=processed, total=self.total, criados=self.criados, falhas=len(self.erros)
+        )
+
+    def report(self) -> MotoristaImportResponse:
+        """Final counts and per-row errors, in file order"""
+        return MotoristaImportResponse(
+            total=self.total,
+            criados=self.criados,
+            falhas=len(self.erros),
+            erros=sorted(self.erros, key=lambda erro: erro.linha),
+        )
+
+
+async def stream_import(
+    rows: list[tuple[int, object]],
+    chunk_size: int = 1000,
+    session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+) -> AsyncIterator[str]:
+    """
+    Import rows and stream the progress as NDJSON.
+
+    Yields one {"evento": "progresso", ...} line per chunk and a final
+    {"evento": "resultado", ...} line with the MotoristaImportResponse. The
+    generator owns its session because it outlives the request handler.
+
+    Args:
+        rows: Rows from parse_rows
+        chunk_size: Rows written per transaction
+        session_factory: Session factory (overridable in tests)
+
+    Yields:
+        NDJSON lines
+    """
+    async with session_factory() as session:
+        importer = MotoristaImporter(session, chunk_size)
+        async for progress in importer.run(rows):
+            yield json.dumps({"evento": "progresso", **asdict(progress)}) + "\n"
+    report = importer.report().model_dump()
+    yield json.dumps({"evento": "resultado", **report}, ensure_ascii=False) + "\n"
@@ -0,0 +1,248 @@
+"""Monthly partitions of the abastecimentos table"""
+
+import asyncio
+import gzip
+import os
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.logging import logger
+
+PARENT_TABLE = "abastecimentos"
+PARTITION_PREFIX = "abastecimentos_p"
+
+# Key of the advisory lock that serializes partition maintenance
+PARTITION_LOCK = 0x50415254
+
+
+def month_start(value: date) -> date:
+    """First day of the month of a date (or datetime, taken as UTC)"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month that is months after the given month"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Name of the partition holding a month, e.g. abastecimentos_p202405"""
+    return f"{PARTITION_PREFIX}{month.year:04d}{month.month:02d}"
+
+
+def partition_month(name: str) -> date | None:
+    """Month held by a partition, or None if name is not a monthly partition"""
+    suffix = name.removeprefix(PARTITION_PREFIX)
+    if suffix == name or len(suffix) != 6 or not suffix.isdigit():
+        return None
+    year, month = int(suffix[:4]), int(suffix[4:])
+    return date(year, month, 1) if 1 <= month <= 12 else None
+
+
+def _bound(month: date) -> str:
+    """Partition bound literal of the start of a month (UTC)"""
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+@dataclass(frozen=True)
+class ArchivedPartition:
+    """A partition written to an archive file"""
+
+    nome: str
+    linhas: int
+    arquivo: Path
+    removida: bool
+
+
+class PartitionManager:
+    """
+    Creates and archives the monthly range partitions of abastecimentos.
+
+    Partitions cover calendar months in UTC on data_abastecimento, so the
+    planner skips every month outside a query's date range. There is no
+    default partition (it would keep the planner from reading partitions
+    in date order), so a row whose month has no partition is rejected:
+    ensure() must cover the months of historical imports before they are
+    inserted. Everything is a no-op on databases where the table is not
+    partitioned (SQLite in tests, or a schema created without the
+    migrations).
+    """
+
+    def __init__(self, months_ahead: int = 3, check_interval: float = 43_200.0):
+        """Initialize manager"""
+        self.months_ahead = months_ahead
+        self.check_interval = check_interval
+        self._task: asyncio.Task | None = None
+
+    async def is_partitioned(self, session: AsyncSession) -> bool:
+        """Whether abastecimentos is a partitioned table"""
+        if session.get_bind().dialect.name != "postgresql":
+            return False
+        result = await session.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(:parent))"
+            ),
+            {"parent": PARENT_TABLE},
+        )
+        return bool(result.scalar())
+
+    async def list_partitions(self, session: AsyncSession) -> list[str]:
+        """Names of the monthly partitions attached to abastecimentos, oldest first"""
+        result = await session.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:parent)"
+            ),
+            {"parent": PARENT_TABLE},
+        )
+        return sorted(name for name in result.scalars() if partition_month(name) is not None)
+
+    async def ensure(
+        self, session: AsyncSession, inicio: date | None = None, fim: date | None = None
+    ) -> list[str]:
+        """
+        Create the missing monthly partitions from inicio to fim and commit.
+
+        Defaults to the current month and the next months_ahead months.
+
+        Returns:
+            Names of the partitions created
+        """
+        if not await self.is_partitioned(session):
+            return []
+        current = month_start(datetime.utcnow())
+        first = month_start(inicio) if inicio is not None else current
+        last = month_start(fim) if fim is not None else add_months(current, self.months_ahead)
+
+        await session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK})
+        existing = set(await self.list_partitions(session))
+        created = []
+        month = first
+        while month <= last:
+            name = partition_name(month)
+            if name not in existing:
+                await self._create(session, month)
+                created.append(name)
+            month = add_months(month, 1)
+        await session.commit()
+
+        if created:
+            logger.info(f"Partitions created: {', '.join(created)}")
+        return created
+
+    async def _create(self, session: AsyncSession, month: date) -> None:
+        """Create one monthly partition"""
+        await session.execute(
+            text(
+                f"CREATE TABLE {partition_name(month)} PARTITION OF {PARENT_TABLE} "
+                f"FOR VALUES FROM ({_bound(month)}) TO ({_bound(add_months(month, 1))})"
+            )
+        )
+
+    async def archive(
+        self, session: AsyncSession, antes_de: date, output_dir: Path, drop: bool = True
+    ) -> list[ArchivedPartition]:
+        """
+        Detach the monthly partitions older than antes_de and dump them to files.
+
+        The partitions are detached in one short transaction, then each one is
+        copied to <output_dir>/<partition>.csv.gz (CSV with header, via COPY) and
+        dropped when drop is set. A partition is only dropped after its file
+        is complete; partitions detached by an interrupted run are picked up
+        again. Daily aggregates in consumo_diario are kept.
+
+        Args:
+            session: Database session
+            antes_de: Partitions of months ending on or before this date are archived
+            output_dir: Directory for the archive files
+            drop: Drop each partition once archived
+
+        Returns:
+            The partitions archived
+        """
+        if not await self.is_partitioned(session):
+            return []
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        await session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK})
+        attached = await self.list_partitions(session)
+        expired = [
+            name for name in attached if add_months(partition_month(name), 1) <= antes_de
+        ]
+        for name in expired:
+            await session.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        await session.commit()
+
+        # Detached by this run or left behind by an interrupted one
+        result = await session.execute(
+            text(
+                "SELECT c.relname FROM pg_class c "
+                "WHERE c.relname LIKE :prefix AND c.relkind = 'r' AND NOT c.relispartition"
+            ),
+            {"prefix": f"{PARTITION_PREFIX}%"},
+        )
+        detached = sorted(
+            name
+            for name in result.scalars()
+            if partition_month(name) is not None
+            and add_months(partition_month(name), 1) <= antes_de
+        )
+
+        archived = []
+        for name in detached:
+            path = output_dir / f"{name}.csv.gz"
+            rows = await self._dump(session, name, path)
+            if drop:
+                await session.execute(text(f"DROP TABLE {name}"))
+                await session.commit()
+            archived.append(ArchivedPartition(name, rows, path, drop))
+            logger.info(f"Partition {name} archived to {path} ({rows} rows)")
+        return archived
+
+    @staticmethod
+    async def _dump(session: AsyncSession, name: str, path: Path) -> int:
+        """Copy a table to a gzip-compressed CSV file, returning the row count"""
+        partial = path.with_name(path.name + ".partial")
+        connection = await session.connection()
+        raw = await connection.get_raw_connection()
+        with gzip.open(partial, "wb", compresslevel=6) as file:
+            status = await raw.driver_connection.copy_from_table(
+                name, output=file, format="csv", header=True
+            )
+        await session.commit()
+        os.replace(partial, path)
+        return int(status.split()[-1])
+
+    async def start(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        """Create missing partitions now and every check_interval seconds"""
+        self._task = asyncio.create_task(self._ensure_forever(session_factory))
+
+    async def stop(self) -> None:
+        """Stop the maintenance task"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _ensure_forever(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        """Run ensure every check_interval seconds"""
+        while True:
+            try:
+                async with session_factory() as session:
+                    await self.ensure(session)
+            except Exception as exc:
+                logger.error(f"Partition maintenance failed: {exc!r}")
+            await asyncio.sleep(self.check_interval)
+
+
+partition_manager = PartitionManager(
+    months_ahead=settings.partition_months_ahead,
+    check_interval=settings.partition_check_hours * 3600,
+)
@@ -0,0 +1,203 @@
+"""Rolling price-per-liter baseline per fuel type"""
+
+import math
+from bisect import bisect_left, insort
+from collections import deque
+from datetime import datetime, timedelta
+
+from sqlalchemy import Float, cast, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.timezone import naive_utc
+from app.domain.models.abastecimento import Abastecimento
+from app.domain.models.enums import StatusAbastecimento, TipoCombustivel
+
+
+class PriceStats:
+    """
+    Rolling statistics over the most recent price-per-liter samples.
+
+    Keeps running sums for mean/stddev and a sorted copy of the window for
+    percentiles, so every read is O(1) and every insert only touches the
+    sample being added and the one being evicted.
+    """
+
+    def __init__(self, window: int, max_age: timedelta | None = None):
+        """Initialize empty statistics for at most `window` samples"""
+        self.window = window
+        self.max_age = max_age
+        self._samples: deque[tuple[datetime, float]] = deque()
+        self._sorted: list[float] = []
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    @property
+    def count(self) -> int:
+        """Number of samples in the window"""
+        return len(self._samples)
+
+    @property
+    def mean(self) -> float:
+        """Mean price per liter (0.0 when empty)"""
+        return self._sum / len(self._samples) if self._samples else 0.0
+
+    @property
+    def stddev(self) -> float:
+        """Population standard deviation of the price per liter"""
+        if not self._samples:
+            return 0.0
+        variance = self._sum_sq / len(self._samples) - self.mean**2
+        return math.sqrt(max(variance, 0.0))
+
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile, q between 0 and 100 (0.0 when empty)"""
+        if not self._sorted:
+            return 0.0
+        rank = math.ceil(q / 100 * len(self._sorted)) - 1
+        return self._sorted[min(max(rank, 0), len(self._sorted) - 1)]
+
+    def add(self, price: float, observed_at: datetime | None = None) -> None:
+        """Add a sample, evicting the oldest ones beyond the window or max_age"""
+        observed_at = datetime.utcnow() if observed_at is None else naive_utc(observed_at)
+        self._samples.append((observed_at, price))
+        insort(self._sorted, price)
+        self._sum += price
+        self._sum_sq += price * price
+
+        while len(self._samples) > self.window:
+            self._evict()
+        if self.max_age is not None:
+            cutoff = observed_at - self.max_age
+            while self._samples and self._samples[0][0] < cutoff:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Remove the oldest sample"""
+        _, price = self._samples.popleft()
+        del self._sorted[bisect_left(self._sorted, price)]
+        self._sum -= price
+        self._sum_sq -= price * price
+
+
+class PriceBaseline:
+    """
+    Per-fuel price-per-liter baseline used by anomaly detection.
+
+    Until a fuel type has min_samples observations its reference price is the
+    configured default; afterwards it is the rolling mean of recent normal
+    refills. Only refills considered normal (or approved after review) should
+    be observed, so that fraudulent prices do not drag the baseline up.
+    """
+
+    def __init__(
+        self,
+        reference_prices: dict[str, float],
+        window: int = 1000,
+        min_samples: int = 30,
+        max_age: timedelta | None = None,
+    ):
+        """Initialize baseline with default reference prices per fuel type"""
+        self.reference_prices = reference_prices
+        self.window = window
+        self.min_samples = min_samples
+        self.max_age = max_age
+        self._stats: dict[str, PriceStats] = {}
+
+    def stats(self, tipo_combustivel: str) -> PriceStats:
+        """Get (or create) the statistics for a fuel type"""
+        key = str(getattr(tipo_combustivel, "value", tipo_combustivel))
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = PriceStats(self.window, self.max_age)
+        return stats
+
+    def observe(
+        self, tipo_combustivel: str, price_per_liter: float, observed_at: datetime | None = None
+    ) -> None:
+        """Add a normal price-per-liter sample for a fuel type"""
+        if price_per_liter > 0:
+            self.stats(tipo_combustivel).add(price_per_liter, observed_at)
+
+    def reference_price(self, tipo_combustivel: str) -> float:
+        """Expected price per liter for a fuel type"""
+        stats = self.stats(tipo_combustivel)
+        if stats.count >= self.min_samples:
+            return stats.mean
+        key = str(getattr(tipo_combustivel, "value", tipo_combustivel))
+        # Unknown fuel types use the highest reference price (fewest false alarms)
+        return self.reference_prices.get(key, max(self.reference_prices.values()))
+
+    def threshold(self, tipo_combustivel: str, tolerance: float) -> float:
+        """Price per liter above which a refill is anomalous"""
+        return self.reference_price(tipo_combustivel) * (1 + tolerance)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """Current statistics per fuel type"""
+        snapshot = {}
+        for tipo in TipoCombustivel:
+            stats = self.stats(tipo)
+            snapshot[tipo.value] = {
+                "amostras": stats.count,
+                "preco_referencia": self.reference_price(tipo),
+                "media": stats.mean,
+                "desvio_padrao": stats.stddev,
+                "p50": stats.percentile(50),
+                "p95": stats.percentile(95),
+            }
+        return snapshot
+
+    async def load(self, session: AsyncSession) -> None:
+        """
+        Warm the baseline from the most recent normal refills of each fuel type.
+
+        Selects the same refills the write and review paths observe: scored
+        normal ones and approved anomalies, never rejected ones. Unscored
+        refills are observed when the sweep scores them. Runs one bounded
+        query per fuel type; afterwards the baseline is kept up to date in
+        memory by observe().
+        """
+        for tipo in TipoCombustivel:
+            query = (
+                select(
+                    # Exact NUMERIC division in the database, one float per row
+                    cast(Abastecimento.valor / Abastecimento.litros, Float),
+                    Abastecimento.data_abastecimento,
+                )
+                .where(
+                    Abastecimento.tipo_combustivel == tipo,
+                    Abastecimento.pontuado_em.is_not(None),
+                    Abastecimento.status != StatusAbastecimento.RECUSADO,
+                    or_(
+                        Abastecimento.eh_anomalia == False,  # noqa: E712
+                        Abastecimento.status == StatusAbastecimento.APROVADO,
+                    ),
+                    Abastecimento.litros > 0,
+                )
+                .order_by(Abastecimento.data_abastecimento.desc())
+                .limit(self.window)
+            )
+            result = await session.execute(query)
+            rows = result.all()
+
+            stats = self._stats[tipo.value] = PriceStats(self.window, self.max_age)
+            for price, data_abastecimento in reversed(rows):
+                stats.add(price, data_abastecimento)
+
+        logger.info(
+            "Price baseline loaded: "
+            + ", ".join(f"{tipo.value}={self.stats(tipo).count}" for tipo in TipoCombustivel)
+        )
+
+
+price_baseline = PriceBaseline(
+    reference_prices=settings.anomaly_reference_prices,
+    window=settings.anomaly_baseline_window,
+    min_samples=settings.anomaly_baseline_min_samples,
+    max_age=(
+        timedelta(days=settings.anomaly_baseline_max_age_days)
+        if settings.anomaly_baseline_max_age_days
+        else None
+    ),
+)
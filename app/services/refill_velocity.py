@@ -0,0 +1,191 @@
+"""In-memory sliding windows of recent refills per motorista"""
+
+from bisect import insort
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from operator import itemgetter
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.timezone import naive_utc
+from app.domain.models.abastecimento import Abastecimento
+
+
+class RefillWindow:
+    """
+    Recent refills of one motorista, oldest first, with a running liter sum.
+
+    Adding a refill and dropping expired ones only touch the ends of the
+    deque, so both are O(1) (amortized for expiry). A refill recorded late
+    (async scoring does not run in timestamp order) is inserted at its
+    sorted position instead, so the deque stays ordered. Totals over the
+    whole window are O(1) too; shorter or earlier periods are summed from the
+    newest end.
+    """
+
+    __slots__ = ("_events", "_litros")
+
+    def __init__(self):
+        """Initialize an empty window"""
+        self._events: deque[tuple[datetime, float]] = deque()
+        self._litros = 0.0
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @property
+    def newest(self) -> datetime | None:
+        """Date of the most recent refill, or None if the window is empty"""
+        return self._events[-1][0] if self._events else None
+
+    def add(self, data: datetime, litros: float, max_events: int | None = None) -> None:
+        """Add a refill (naive UTC) in date order, dropping the oldest beyond max_events"""
+        if self._events and data < self._events[-1][0]:
+            insort(self._events, (data, litros), key=itemgetter(0))
+        else:
+            self._events.append((data, litros))
+        self._litros += litros
+        if max_events is not None:
+            while len(self._events) > max_events:
+                self._pop_oldest()
+
+    def prune(self, cutoff: datetime) -> None:
+        """Drop refills older than cutoff"""
+        while self._events and self._events[0][0] < cutoff:
+            self._pop_oldest()
+
+    def since(self, cutoff: datetime, until: datetime | None = None) -> tuple[int, float]:
+        """
+        Number of refills and liters from cutoff up to until (inclusive).
+
+        until excludes the refills recorded after the one being scored, which
+        a refill scored late by the queue or the sweep must not count. Refills
+        at exactly until still count (earlier records of the same batch share
+        its timestamp).
+        """
+        events = self._events
+        if not events:
+            return 0, 0.0
+        if events[0][0] >= cutoff and (until is None or events[-1][0] <= until):
+            return len(events), self._litros
+        count, litros = 0, 0.0
+        for data, event_litros in reversed(events):
+            if until is not None and data > until:
+                continue
+            if data < cutoff:
+                break
+            count += 1
+            litros += event_litros
+        return count, litros
+
+    def _pop_oldest(self) -> None:
+        """Remove the oldest refill"""
+        _, litros = self._events.popleft()
+        self._litros -= litros
+        if not self._events:
+            # Avoid float drift accumulating in long-lived windows
+            self._litros = 0.0
+
+
+class RefillVelocityTracker:
+    """
+    Sliding windows of recent refills per motorista, for velocity rules.
+
+    Warmed once from the database on startup (load) and then kept up to date
+    by record(), so history-based anomaly rules never query the database on
+    the write path. State is per process: with several workers each one only
+    sees the refills it handled after startup.
+
+    Windows are kept in least recently recorded order, and each history()
+    call also forgets the idle motoristas at the front whose latest refill
+    is older than its cutoff, so motoristas who stop refilling do not stay
+    in memory.
+    """
+
+    def __init__(self, max_events: int = 256):
+        """Initialize an empty tracker keeping at most max_events per motorista"""
+        self.max_events = max_events
+        self._windows: OrderedDict[int, RefillWindow] = OrderedDict()
+
+    @property
+    def motoristas(self) -> int:
+        """Number of motoristas with a window in memory"""
+        return len(self._windows)
+
+    def history(self, motorista_id: int, cutoff: datetime) -> RefillWindow:
+        """
+        Get a motorista's refills from cutoff onwards.
+
+        Older refills are dropped for good, so cutoff must be the start of the
+        longest period any rule looks at.
+        """
+        self._evict_idle(cutoff)
+        window = self._windows.get(motorista_id)
+        if window is None:
+            return RefillWindow()
+        window.prune(cutoff)
+        if not window:
+            del self._windows[motorista_id]
+        return window
+
+    def record(self, motorista_id: int, data: datetime, litros: float) -> None:
+        """Add a refill to its motorista's window"""
+        window = self._windows.get(motorista_id)
+        if window is None:
+            window = self._windows[motorista_id] = RefillWindow()
+        else:
+            self._windows.move_to_end(motorista_id)
+        window.add(naive_utc(data), litros, self.max_events)
+
+    def _evict_idle(self, cutoff: datetime) -> None:
+        """Forget the least recently recorded windows with no refill from cutoff onwards"""
+        while self._windows:
+            motorista_id, window = next(iter(self._windows.items()))
+            if window.newest is not None and window.newest >= cutoff:
+                break
+            del self._windows[motorista_id]
+
+    def clear(self) -> None:
+        """Forget every window"""
+        self._windows.clear()
+
+    async def load(self, session: AsyncSession, janela: timedelta | None) -> None:
+        """
+        Warm the windows with the refills of the last janela.
+
+        Only scored refills are loaded: refills still unscored are added by
+        record() when the sweep scores them, so none is counted twice. Runs
+        one query over the data_abastecimento index; does nothing when janela
+        is None (no rule needs history).
+        """
+        self._windows.clear()
+        if janela is None:
+            return
+
+        query = (
+            select(
+                Abastecimento.motorista_id, Abastecimento.data_abastecimento, Abastecimento.litros
+            )
+            .where(
+                Abastecimento.data_abastecimento >= datetime.utcnow() - janela,
+                # Unscored refills are recorded when the sweep scores them
+                Abastecimento.pontuado_em.is_not(None),
+            )
+            .order_by(Abastecimento.data_abastecimento)
+        )
+        result = await session.execute(query)
+        refills = 0
+        for motorista_id, data_abastecimento, litros in result:
+            self.record(motorista_id, data_abastecimento, litros)
+            refills += 1
+
+        logger.info(
+            f"Refill velocity windows loaded: {refills} abastecimentos, "
+            f"{self.motoristas} motoristas"
+        )
+
+
+refill_velocity = RefillVelocityTracker(max_events=settings.velocity_max_events)
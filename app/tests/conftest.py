@@ -7,6 +7,15 @@ from sqlalchemy.orm import sessionmaker
 from app.core.database import Base, get_session
 from app.domain.models import Abastecimento, Motorista  # noqa: F401
 from app.main import app
+from app.services.refill_velocity import refill_velocity
+
+
+@pytest.fixture(autouse=True)
+def reset_refill_velocity():
+    """Start every test without refill history in memory"""
+    refill_velocity.clear()
+    yield
+    refill_velocity.clear()
 
 
 @pytest.fixture
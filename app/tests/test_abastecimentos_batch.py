@@ -0,0 +1,128 @@
+"""Tests for batch ingestion of abastecimentos"""
+
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.domain.models.abastecimento import Abastecimento
+from app.domain.models.motorista import Motorista
+from app.services.motorista_cache import motorista_cache
+
+URL = "/api/v1/abastecimentos/batch"
+
+
+def _registro(**overrides) -> dict:
+    """Valid batch record, with the given fields replaced"""
+    return {
+        "motorista_id": 1,
+        "tipo_combustivel": "diesel",
+        "valor": 300.0,
+        "litros": 50.0,
+        **overrides,
+    }
+
+
+@pytest.fixture
+async def motorista(test_session):
+    """One active motorista, with no stale cache entries from other tests"""
+    motorista_cache.local.clear()
+    test_session.add(Motorista(nome="Ana", cpf="12345678909", email="ana@example.com"))
+    await test_session.commit()
+    yield
+    motorista_cache.local.clear()
+
+
+async def _count(test_session) -> int:
+    """Number of stored abastecimentos"""
+    return await test_session.scalar(select(func.count()).select_from(Abastecimento))
+
+
+class TestBatchIngestion:
+    """Test POST /api/v1/abastecimentos/batch"""
+
+    async def test_json_array_creates_every_record(self, test_session, test_client, motorista):
+        """Test that a JSON array is created in input order"""
+        response = test_client.post(
+            URL, json=[_registro(valor=300.0), _registro(valor=310.0, litros=51.0)]
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["total"], body["criados"], body["falhas"]) == (2, 2, 0)
+        assert [r["indice"] for r in body["resultados"]] == [0, 1]
+        assert [r["abastecimento"]["valor"] for r in body["resultados"]] == [300.0, 310.0]
+        assert await _count(test_session) == 2
+
+    async def test_ndjson_body_skips_blank_lines(self, test_session, test_client, motorista):
+        """Test that an NDJSON body is read one record per non-blank line"""
+        content = "\n".join([json.dumps(_registro()), "", json.dumps(_registro(litros=40.0))])
+
+        response = test_client.post(
+            URL, content=content, headers={"Content-Type": "application/x-ndjson"}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["criados"] == 2
+        assert await _count(test_session) == 2
+
+    async def test_malformed_ndjson_line_fails_only_that_record(
+        self, test_session, test_client, motorista
+    ):
+        """Test that a line that is not JSON is reported by its own index"""
+        linhas = [json.dumps(_registro()), '{"motorista_id": 1,', json.dumps(_registro())]
+        content = "\n".join(linhas)
+
+        response = test_client.post(
+            URL, content=content, headers={"Content-Type": "application/x-ndjson; charset=utf-8"}
+        )
+
+        assert response.status_code == 200
+        resultados = response.json()["resultados"]
+        assert [r["sucesso"] for r in resultados] == [True, False, True]
+        assert resultados[1]["erro"] == "JSON inválido"
+        assert await _count(test_session) == 2
+
+    async def test_invalid_records_do_not_block_the_valid_ones(
+        self, test_session, test_client, motorista
+    ):
+        """Test per-record validation and motorista errors alongside created records"""
+        response = test_client.post(
+            URL,
+            json=[
+                _registro(valor=-1.0),
+                _registro(),
+                _registro(motorista_id=999),
+                "não é um objeto",
+            ],
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["total"], body["criados"], body["falhas"]) == (4, 1, 3)
+        resultados = body["resultados"]
+        assert [r["sucesso"] for r in resultados] == [False, True, False, False]
+        assert resultados[0]["erro"].startswith("valor:")
+        assert resultados[1]["abastecimento"]["motorista_id"] == 1
+        assert resultados[2]["erro"] == "Motorista não encontrado"
+        assert resultados[3]["erro"]
+        assert await _count(test_session) == 1
+
+    async def test_batch_over_the_limit_is_rejected(
+        self, test_session, test_client, motorista, monkeypatch
+    ):
+        """Test that a batch larger than batch_max_items is refused as a whole"""
+        monkeypatch.setattr(settings, "batch_max_items", 2)
+
+        response = test_client.post(URL, json=[_registro()] * 3)
+
+        assert response.status_code == 413
+        assert response.json()["detail"] == "O lote excede o limite de 2 registros"
+        assert await _count(test_session) == 0
+
+    def test_body_that_is_not_a_list_is_rejected(self, test_client):
+        """Test that a JSON object body is a bad request"""
+        response = test_client.post(URL, json=_registro())
+
+        assert response.status_code == 400
@@ -75,3 +75,51 @@ class TestAnomalyDetection:
 
         score = AnomalyService.get_anomaly_score(abastecimento)
         assert score == 0.0
+
+    def test_batch_detection_matches_single(self):
+        """Test that batch detection flags the same refills as detect_anomaly"""
+        tipos = [TipoCombustivel.GASOLINA, TipoCombustivel.GASOLINA, TipoCombustivel.ETANOL]
+        valores = [250.00, 600.00, 250.00]
+        litros = [40.0, 20.0, 0.0]
+
+        flags = AnomalyService.detect_anomalies(tipos, valores, litros)
+
+        expected = [
+            AnomalyService.detect_anomaly(
+                Abastecimento(motorista_id=1, tipo_combustivel=tipo, valor=valor, litros=litro)
+            )
+            for tipo, valor, litro in zip(tipos, valores, litros)
+        ]
+        assert flags == expected == [False, True, False]
+
+    def test_threshold_depends_on_fuel_type(self):
+        """Test that a normal gasoline price is anomalous for ethanol"""
+        gasolina = Abastecimento(
+            motorista_id=1, tipo_combustivel=TipoCombustivel.GASOLINA, valor=260.0, litros=40.0
+        )
+        etanol = Abastecimento(
+            motorista_id=1, tipo_combustivel=TipoCombustivel.ETANOL, valor=260.0, litros=40.0
+        )
+
+        assert AnomalyService.detect_anomaly(gasolina) is False
+        assert AnomalyService.detect_anomaly(etanol) is True
+
+    def test_score_batch_matches_single_scoring(self):
+        """Test that vectorized scores and flags equal the per-object results"""
+        rows = [
+            (TipoCombustivel.GASOLINA, 250.00, 40.0),
+            (TipoCombustivel.GASOLINA, 600.00, 20.0),
+            (TipoCombustivel.DIESEL, 200.00, 40.0),
+            (TipoCombustivel.ETANOL, 260.00, 40.0),
+            (TipoCombustivel.GNV, 100.00, 0.0),
+        ]
+        tipos, valores, litros = zip(*rows)
+
+        scores, flags = AnomalyService.score_batch(tipos, valores, litros)
+
+        for (tipo, valor, litro), score, flag in zip(rows, scores, flags):
+            abastecimento = Abastecimento(
+                motorista_id=1, tipo_combustivel=tipo, valor=valor, litros=litro
+            )
+            assert score == pytest.approx(AnomalyService.get_anomaly_score(abastecimento))
+            assert bool(flag) is AnomalyService.detect_anomaly(abastecimento)
@@ -0,0 +1,173 @@
+"""Tests for asynchronous anomaly scoring"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.domain.models.abastecimento import Abastecimento
+from app.domain.models.enums import StatusAbastecimento, TipoCombustivel
+from app.domain.models.motorista import Motorista
+from app.repositories.consumo_repository import ConsumoRepository
+from app.services.abastecimento_service import AbastecimentoService
+from app.services.anomaly_queue import (
+    AnomalyScoringQueue,
+    anomaly_queue,
+    anomaly_queue_overflow,
+    anomaly_scoring_batches,
+)
+from app.services.price_baseline import PriceBaseline
+from app.services.refill_velocity import refill_velocity
+
+
+@pytest.fixture
+async def file_db(tmp_path):
+    """
+    SQLite database in a file.
+
+    The in-memory test database shares one connection between sessions, so
+    the workers' transactions would interleave with the test's.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'queue.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+def _score(session, ids):
+    """Queue handler used by the application"""
+    return AbastecimentoService(session).score_pending(ids)
+
+
+async def _add_motorista(session) -> None:
+    """Insert the motorista used by the tests"""
+    session.add(Motorista(nome="Ana", cpf="12345678909", email="ana@example.com"))
+    await session.commit()
+
+
+class TestAsyncScoring:
+    """Test refills stored first and scored by the worker pool"""
+
+    async def test_refill_is_scored_after_the_insert(self, file_db):
+        """Test that a queued refill gets its status, score and anomaly count later"""
+        async with file_db() as session:
+            await _add_motorista(session)
+        await anomaly_queue.start(file_db, _score)
+        try:
+            async with file_db() as session:
+                created = await AbastecimentoService(session).create_abastecimento(
+                    1, TipoCombustivel.GASOLINA, 600.0, 20.0
+                )
+            assert created.status == StatusAbastecimento.PENDENTE
+            assert created.pontuado_em is None
+        finally:
+            await anomaly_queue.stop()
+
+        async with file_db() as session:
+            stored = await session.get(Abastecimento, created.id)
+            [consumo] = await ConsumoRepository(session).get_days_by_motorista(1)
+        assert stored.status == StatusAbastecimento.ANOMALIA
+        assert stored.eh_anomalia is True
+        assert stored.pontuado_em is not None
+        assert consumo.quantidade_anomalias == 1
+
+    async def test_failed_batches_are_retried(self, file_db):
+        """Test that a batch failing once is scored on the retry"""
+        async with file_db() as session:
+            await _add_motorista(session)
+            session.add(
+                Abastecimento(
+                    motorista_id=1,
+                    tipo_combustivel=TipoCombustivel.DIESEL,
+                    valor=300.0,
+                    litros=50.0,
+                )
+            )
+            await session.commit()
+        failures = [RuntimeError("connection lost")]
+
+        async def flaky(session, ids):
+            if failures:
+                raise failures.pop()
+            return await _score(session, ids)
+
+        retried = anomaly_scoring_batches.value(result="retried")
+        queue = AnomalyScoringQueue(workers=1, retry_delay=0)
+        await queue.start(file_db, flaky)
+        # The sweep queues the unscored refill; stop waits for the queue to drain
+        await queue.sweep()
+        await queue.stop()
+
+        assert anomaly_scoring_batches.value(result="retried") == retried + 1
+        async with file_db() as session:
+            assert (await session.get(Abastecimento, 1)).pontuado_em is not None
+
+    async def test_refill_reviewed_before_scoring_is_still_scored(self, file_db):
+        """Test that the sweep scores an approved refill without undoing the review"""
+        async with file_db() as session:
+            await _add_motorista(session)
+            session.add(
+                Abastecimento(
+                    motorista_id=1,
+                    tipo_combustivel=TipoCombustivel.GASOLINA,
+                    valor=600.0,
+                    litros=20.0,
+                )
+            )
+            await session.commit()
+            await AbastecimentoService(session).approve_abastecimento(1)
+
+        queue = AnomalyScoringQueue(workers=1, retry_delay=0)
+        await queue.start(file_db, _score)
+        await queue.sweep()
+        await queue.stop()
+
+        async with file_db() as session:
+            stored = await session.get(Abastecimento, 1)
+            [consumo] = await ConsumoRepository(session).get_days_by_motorista(1)
+        assert stored.status == StatusAbastecimento.APROVADO
+        assert stored.eh_anomalia is True
+        assert stored.pontuado_em is not None
+        assert consumo.quantidade_anomalias == 1
+        assert consumo.quantidade_aprovados == 1
+
+    async def test_refill_left_unscored_by_a_restart_counts_once(self, test_session):
+        """Test that warm-up skips unscored refills, so the sweep records them only once"""
+        await _add_motorista(test_session)
+        now = datetime.utcnow()
+        test_session.add(
+            Abastecimento(
+                motorista_id=1,
+                tipo_combustivel=TipoCombustivel.DIESEL,
+                valor=300.0,
+                litros=50.0,
+                data_abastecimento=now,
+            )
+        )
+        await test_session.commit()
+
+        # Restart: the warm-ups run before the sweep picks the refill up
+        await refill_velocity.load(test_session, timedelta(hours=6))
+        baseline = PriceBaseline({"diesel": 6.0})
+        await baseline.load(test_session)
+        assert refill_velocity.motoristas == 0
+        assert baseline.stats("diesel").count == 0
+
+        [scored] = await AbastecimentoService(test_session).score_pending([1])
+
+        assert scored.regras_anomalia == []
+        assert len(refill_velocity.history(1, now - timedelta(hours=6))) == 1
+
+    async def test_full_queue_leaves_refills_to_the_sweep(self, test_db):
+        """Test that submit gives up on a full queue instead of blocking writers"""
+        queue = AnomalyScoringQueue(workers=0, max_size=1, put_timeout=0.01)
+        await queue.start(async_sessionmaker(test_db), _score)
+        overflow = anomaly_queue_overflow.value()
+        try:
+            assert await queue.submit([1, 2, 3]) == 1
+            assert queue.depth == 1
+            assert anomaly_queue_overflow.value() == overflow + 2
+        finally:
+            await queue.stop(timeout=0.01)
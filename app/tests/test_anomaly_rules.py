@@ -0,0 +1,227 @@
+"""Tests for the configurable anomaly rule engine"""
+
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.domain.models.enums import StatusAbastecimento, TipoCombustivel
+from app.domain.models.motorista import Motorista
+from app.domain.schemas.abastecimento import AbastecimentoCreate
+from app.services.abastecimento_service import AbastecimentoService
+from app.services.anomaly_rules import AnomalyRuleEngine, RefillFacts, RuleSet
+from app.services.refill_velocity import RefillWindow
+
+# 12:00 UTC is 09:00 in America/Sao_Paulo, inside business hours
+MIDDAY = datetime(2024, 3, 1, 12, 0)
+
+RULES = {
+    "limiar": 0.5,
+    "regras": [
+        {"id": "frequencia", "tipo": "frequencia_motorista", "max_abastecimentos": 2,
+         "janela_horas": 6},
+        {"id": "horario", "tipo": "fora_do_horario", "peso": 0.3, "inicio": "05:00",
+         "fim": "23:00"},
+        {"id": "preco", "tipo": "preco_litro", "tolerancia": 0.25},
+        {"id": "tanque_gnv", "tipo": "volume_maximo", "max_litros": 40,
+         "combustiveis": ["gnv"]},
+    ],
+}
+
+
+def _window(*datas: datetime, litros: float = 40.0) -> RefillWindow:
+    """Refill window with the given dates"""
+    window = RefillWindow()
+    for data in datas:
+        window.add(data, litros)
+    return window
+
+
+def _facts(tipo: str = "gasolina", valor: float = 250.0, litros: float = 40.0, **kwargs):
+    """Refill facts at midday, normal unless overridden"""
+    kwargs.setdefault("data_abastecimento", MIDDAY)
+    return RefillFacts.build(1, tipo, valor, litros, **kwargs)
+
+
+class TestRuleSet:
+    """Test rule compilation and evaluation"""
+
+    def test_rules_are_indexed_per_fuel_and_sorted_by_cost(self):
+        """Test that fuel-specific rules only apply to their fuel, cheapest rules first"""
+        ruleset = RuleSet.compile(RULES)
+
+        assert [rule.id for rule in ruleset.rules_for("gnv")] == [
+            "preco", "tanque_gnv", "horario", "frequencia"
+        ]
+        assert [rule.id for rule in ruleset.rules_for("diesel")] == [
+            "preco", "horario", "frequencia"
+        ]
+        assert ruleset.janela_historico == timedelta(hours=6)
+
+    def test_invalid_rules_are_rejected(self):
+        """Test that unknown types and missing parameters fail compilation"""
+        with pytest.raises(ValueError, match="tipo desconhecido"):
+            RuleSet.compile({"regras": [{"tipo": "inexistente"}]})
+        with pytest.raises(ValueError, match="inválida"):
+            RuleSet.compile({"regras": [{"id": "x", "tipo": "volume_maximo"}]})
+
+    def test_evaluation_stops_once_the_outcome_is_settled(self):
+        """Test short-circuiting on a decisive hit and on insufficient remaining weight"""
+        ruleset = RuleSet.compile(RULES)
+
+        expensive = ruleset.evaluate(_facts(valor=600.0, litros=20.0, historico=RefillWindow()))
+        assert expensive.eh_anomalia is True
+        assert [hit.regra for hit in expensive.disparos] == ["preco"]
+        assert expensive.avaliadas == 1
+
+        # Only the 0.3 out-of-hours rule is left after price and frequency pass
+        light = RuleSet.compile({**RULES, "regras": RULES["regras"][1:2]})
+        assert light.evaluate(_facts()).avaliadas == 0
+
+    def test_frequency_needs_history(self):
+        """Test the refills-per-motorista rule with and without history"""
+        ruleset = RuleSet.compile(RULES)
+        datas = [MIDDAY - timedelta(hours=7), MIDDAY - timedelta(hours=2), MIDDAY]
+
+        evaluation = ruleset.evaluate(_facts(historico=_window(*datas)))
+        assert evaluation.eh_anomalia is True
+        assert evaluation.regras() == [
+            {"regra": "frequencia", "tipo": "frequencia_motorista", "pontuacao": 0.75}
+        ]
+        assert ruleset.evaluate(_facts(historico=_window(*datas[:2]))).eh_anomalia is False
+        assert ruleset.evaluate(_facts()).eh_anomalia is False
+
+    def test_out_of_hours_alone_is_not_an_anomaly(self):
+        """Test that a low-weight rule only contributes to the score"""
+        ruleset = RuleSet.compile(RULES)
+
+        # 04:00 UTC is 01:00 local time
+        evaluation = ruleset.evaluate(_facts(data_abastecimento=datetime(2024, 3, 1, 4, 0)))
+        assert evaluation.eh_anomalia is False
+        assert evaluation.pontuacao == 0.3
+        assert [hit.regra for hit in evaluation.disparos] == ["horario"]
+
+
+    def test_score_batch_matches_evaluate(self):
+        """Test that vectorized scoring gives evaluate's score and flag for every refill"""
+        ruleset = RuleSet.compile(
+            {
+                **RULES,
+                "limiar": 0.9,
+                "regras": [{**rule, "peso": 0.6} for rule in RULES["regras"]],
+            }
+        )
+        rows = [
+            ("gasolina", 250.0, 40.0, MIDDAY),
+            ("gasolina", 340.0, 40.0, MIDDAY),
+            ("gasolina", 340.0, 40.0, datetime(2024, 3, 1, 4, 0)),
+            ("gnv", 100.0, 60.0, datetime(2024, 3, 1, 4, 0)),
+            ("gnv", 100.0, 0.0, datetime(2024, 3, 1, 4, 0)),
+            ("diesel", 600.0, 20.0, datetime(2024, 3, 1, 4, 0)),
+        ]
+        tipos, valores, litros, datas = zip(*rows)
+
+        scores, flags = ruleset.score_batch(tipos, valores, litros, datas)
+
+        expected = [
+            ruleset.evaluate(_facts(tipo, valor, litro, data_abastecimento=data))
+            for tipo, valor, litro, data in rows
+        ]
+        assert scores.tolist() == [evaluation.pontuacao for evaluation in expected]
+        assert flags.tolist() == [evaluation.eh_anomalia for evaluation in expected]
+        assert flags.tolist() == [False, False, True, True, False, True]
+
+
+class TestAnomalyRuleEngine:
+    """Test loading and hot reloading of the rules file"""
+
+    def test_reloads_changed_file_and_keeps_rules_on_error(self, tmp_path):
+        """Test that a changed file is picked up and a broken one is ignored"""
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps(RULES))
+        engine = AnomalyRuleEngine(path)
+        assert engine.evaluate(_facts(valor=600.0, litros=20.0)).eh_anomalia is True
+
+        path.write_text(json.dumps({"limiar": 0.5, "regras": []}))
+        os.utime(path, (1, 1))
+        # Requests never touch the file; only reload does
+        assert engine.evaluate(_facts(valor=600.0, litros=20.0)).eh_anomalia is True
+        assert engine.reload() is True
+        assert engine.evaluate(_facts(valor=600.0, litros=20.0)).eh_anomalia is False
+
+        path.write_text("{not json")
+        os.utime(path, (2, 2))
+        assert engine.reload() is False
+        assert engine.ruleset.limiar == 0.5
+        assert engine.evaluate(_facts(valor=600.0, litros=20.0)).eh_anomalia is False
+
+    @pytest.mark.parametrize(
+        "content", ["[1, 2]", '{"regras": [1]}', '{"regras": {"id": "x"}}', '{"limiar": []}']
+    )
+    def test_wrongly_shaped_file_keeps_rules(self, tmp_path, content):
+        """Test that valid JSON of the wrong shape is rejected like a syntax error"""
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps(RULES))
+        engine = AnomalyRuleEngine(path)
+
+        path.write_text(content)
+        os.utime(path, (1, 1))
+        assert engine.reload() is False
+        assert [rule.id for rule in engine.ruleset.rules_for("diesel")] == [
+            "preco", "horario", "frequencia"
+        ]
+
+    async def test_watcher_reloads_in_the_background(self, tmp_path):
+        """Test that the started engine picks up a changed file by itself"""
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps(RULES))
+        engine = AnomalyRuleEngine(path, reload_interval=0.01)
+        await engine.start()
+        try:
+            path.write_text(json.dumps({"limiar": 0.7, "regras": []}))
+            os.utime(path, (1, 1))
+            for _ in range(100):
+                if engine.ruleset.limiar == 0.7:
+                    break
+                await asyncio.sleep(0.01)
+            assert engine.ruleset.limiar == 0.7
+        finally:
+            await engine.stop()
+
+    def test_missing_file_uses_default_rules(self, tmp_path):
+        """Test that the price per liter rule applies without a rules file"""
+        engine = AnomalyRuleEngine(tmp_path / "missing.json")
+
+        assert [rule.id for rule in engine.ruleset.rules_for("gasolina")] == ["preco_por_litro"]
+        assert engine.ruleset.janela_historico is None
+
+
+class TestRuleEngineIngestion:
+    """Test anomaly rules applied when refills are created"""
+
+    async def test_frequent_refills_in_a_batch_are_flagged(self, test_session):
+        """Test that earlier records of the batch count as the motorista's history"""
+        test_session.add(Motorista(nome="Ana", cpf="12345678909", email="ana@example.com"))
+        await test_session.commit()
+        service = AbastecimentoService(test_session)
+
+        first = await service.create_abastecimento(1, TipoCombustivel.DIESEL, 300.0, 50.0)
+        assert first.eh_anomalia is False
+        assert first.pontuacao_anomalia is not None
+
+        records = [
+            AbastecimentoCreate(
+                motorista_id=1, tipo_combustivel=TipoCombustivel.DIESEL, valor=300.0, litros=50.0
+            )
+            for _ in range(3)
+        ]
+        created = await service.create_abastecimentos(records)
+
+        # The repository rule set allows 3 refills per motorista within 6 hours
+        assert [refill.eh_anomalia for refill in created] == [False, False, True]
+        assert created[2].status == StatusAbastecimento.ANOMALIA
+        assert "abastecimentos_frequentes" in {
+            regra["regra"] for regra in created[2].regras_anomalia
+        }
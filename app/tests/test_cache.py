@@ -0,0 +1,125 @@
+"""Tests for caching utilities"""
+
+from app.core.cache import TTLCache
+from app.domain.models.motorista import Motorista
+from app.services.motorista_cache import MotoristaCache
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache:
+    """Test TTL/LRU cache"""
+
+    def test_entries_expire_after_ttl(self):
+        """Test that entries are served until their TTL elapses"""
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=5.0, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 4.9
+        assert cache.get("a") == 1
+        clock.now = 5.0
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that reads refresh the LRU position"""
+        cache = TTLCache(maxsize=2, ttl=60.0)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats.evictions == 1
+
+    def test_falsy_values_are_hits(self):
+        """Test that cached False is distinguished from a miss"""
+        cache = TTLCache(maxsize=10, ttl=60.0)
+        cache.set("inativo", False)
+
+        assert cache.get("inativo") is False
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 0
+
+
+class DictBackend:
+    """In-memory shared backend"""
+
+    def __init__(self):
+        self.data: dict[str, str] = {}
+        self.calls = 0
+
+    async def get(self, key: str) -> str | None:
+        self.calls += 1
+        return self.data.get(key)
+
+    async def get_many(self, keys: list[str]) -> list[str | None]:
+        self.calls += 1
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        self.calls += 1
+        self.data[key] = value
+
+    async def set_many(self, items: dict[str, str], ttl: float) -> None:
+        self.calls += 1
+        self.data.update(items)
+
+    async def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+
+class TestMotoristaCache:
+    """Test the motorista read-through cache"""
+
+    async def test_read_through_and_invalidation(self, test_session):
+        """Test that lookups are cached, missing ids are not, and updates invalidate"""
+        motorista = Motorista(nome="João", cpf="12345678909", email="joao@example.com")
+        test_session.add(motorista)
+        await test_session.commit()
+
+        backend = DictBackend()
+        cache = MotoristaCache(maxsize=100, ttl=60.0, backend=backend)
+
+        assert await cache.get_active_flags(test_session, {motorista.id, 999}) == {
+            motorista.id: True
+        }
+        assert backend.data == {f"motorista:{motorista.id}": "1"}
+        assert await cache.get_active_flag(test_session, motorista.id) is True
+        assert cache.metrics()["hits"] == 1
+
+        motorista.ativo = False
+        await test_session.commit()
+        await cache.invalidate(motorista.id)
+
+        assert backend.data == {}
+        assert await cache.get_active_flag(test_session, motorista.id) is False
+
+    async def test_backend_is_read_and_filled_in_one_call_each(self, test_session):
+        """Test that local misses cost one shared-backend read and one write, not one per id"""
+        test_session.add_all(
+            Motorista(nome=f"M{i}", cpf=cpf, email=f"m{i}@example.com")
+            for i, cpf in enumerate(["12345678909", "98765432100", "11144477735"])
+        )
+        await test_session.commit()
+
+        backend = DictBackend()
+        backend.data["motorista:1"] = "0"
+        cache = MotoristaCache(maxsize=100, ttl=60.0, backend=backend)
+
+        flags = await cache.get_active_flags(test_session, {1, 2, 3, 999})
+
+        assert flags == {1: False, 2: True, 3: True}
+        assert backend.calls == 2
+        assert backend.data == {"motorista:1": "0", "motorista:2": "1", "motorista:3": "1"}
@@ -0,0 +1,123 @@
+"""Tests for daily consumption aggregates"""
+
+from datetime import date, datetime
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import select
+
+from app.domain.models.consumo import ConsumoDiario
+from app.domain.models.enums import TipoCombustivel
+from app.domain.models.motorista import Motorista
+from app.domain.schemas.abastecimento import AbastecimentoCreate
+from app.repositories.consumo_repository import ConsumoDeltas, ConsumoRepository
+from app.services.abastecimento_service import AbastecimentoService
+
+
+async def _add_motorista(session) -> None:
+    """Insert the motorista with id 1"""
+    session.add(Motorista(nome="Maria", cpf="12345678909", email="maria@example.com"))
+    await session.commit()
+
+
+async def _aggregates(session) -> list[tuple]:
+    """All aggregate rows as comparable tuples"""
+    result = await session.execute(select(ConsumoDiario).order_by(ConsumoDiario.dia))
+    return [
+        (
+            row.motorista_id,
+            row.dia,
+            row.quantidade,
+            row.total_litros,
+            row.total_valor,
+            row.quantidade_anomalias,
+            row.quantidade_aprovados,
+            row.quantidade_recusados,
+        )
+        for row in result.scalars().all()
+    ]
+
+
+class TestConsumoDeltas:
+    """Test accumulation of aggregate changes"""
+
+    def test_refills_are_grouped_by_local_day(self):
+        """Test that refills are keyed by the local (São Paulo) calendar day"""
+        deltas = ConsumoDeltas()
+        # 01:30 UTC is still the previous day in America/Sao_Paulo (UTC-3)
+        deltas.add(1, datetime(2024, 5, 2, 1, 30), quantidade=1, total_litros=10.0)
+        deltas.add(1, datetime(2024, 5, 1, 15, 0), quantidade=1, total_litros=5.0)
+
+        [row] = deltas.rows()
+        assert row["dia"] == date(2024, 5, 1)
+        assert row["quantidade"] == 2
+        assert row["total_litros"] == 15.0
+
+    async def test_apply_adds_to_existing_rows(self, test_session):
+        """Test that applying deltas twice accumulates instead of overwriting"""
+        await _add_motorista(test_session)
+        repository = ConsumoRepository(test_session)
+
+        for _ in range(2):
+            deltas = ConsumoDeltas()
+            deltas.add(1, datetime(2024, 5, 1, 15), quantidade=1, total_valor=100.0)
+            await repository.apply(deltas)
+        await test_session.commit()
+
+        totals = await repository.get_totals_by_motorista(1)
+        assert totals.quantidade == 2
+        assert totals.total_valor == 200.0
+
+    async def test_fleet_totals_are_summed_over_the_range(self, test_session):
+        """Test that fleet totals cover only the requested days"""
+        await _add_motorista(test_session)
+        repository = ConsumoRepository(test_session)
+        deltas = ConsumoDeltas()
+        deltas.add(1, datetime(2024, 5, 1, 15), quantidade=1, total_litros=40.125)
+        deltas.add(1, datetime(2024, 5, 2, 15), quantidade=2, total_litros=10.5)
+        deltas.add(1, datetime(2024, 6, 1, 15), quantidade=1, total_litros=99.0)
+        await repository.apply(deltas)
+        await test_session.commit()
+
+        totals = await repository.get_fleet_totals(date(2024, 5, 1), date(2024, 5, 31))
+        assert (totals.quantidade, totals.total_litros) == (3, 50.625)
+
+
+class TestFixedPointInput:
+    """Test that new refills are rounded to the stored scale"""
+
+    def test_valor_and_litros_are_rounded(self):
+        """Test that valor keeps centavos and litros keeps millilitres"""
+        record = AbastecimentoCreate(
+            motorista_id=1, tipo_combustivel=TipoCombustivel.DIESEL, valor=300.126, litros=50.12345
+        )
+        assert (record.valor, record.litros) == (300.13, 50.123)
+
+        with pytest.raises(ValidationError):
+            AbastecimentoCreate(
+                motorista_id=1, tipo_combustivel=TipoCombustivel.DIESEL, valor=0.004, litros=1.0
+            )
+
+
+class TestConsumoMaintenance:
+    """Test that AbastecimentoService keeps the aggregates up to date"""
+
+    async def test_incremental_matches_rebuild(self, test_session):
+        """Test that incremental updates produce the same rows as a full rebuild"""
+        await _add_motorista(test_session)
+        service = AbastecimentoService(test_session)
+
+        normal = await service.create_abastecimento(1, TipoCombustivel.GASOLINA, 120.0, 20.0)
+        anomaly = await service.create_abastecimento(1, TipoCombustivel.GASOLINA, 900.0, 20.0)
+        other = await service.create_abastecimento(1, TipoCombustivel.DIESEL, 300.0, 50.0)
+        await service.approve_abastecimento(normal.id)
+        await service.reject_abastecimento(anomaly.id, "Preço acima do esperado")
+        await service.reject_abastecimento(other.id, "Nota fiscal ilegível")
+
+        incremental = await _aggregates(test_session)
+        [(_, _, quantidade, litros, valor, anomalias, aprovados, recusados)] = incremental
+        assert (quantidade, litros, valor) == (3, 90.0, 1320.0)
+        assert (anomalias, aprovados, recusados) == (1, 1, 2)
+
+        await ConsumoRepository(test_session).rebuild()
+        assert await _aggregates(test_session) == incremental
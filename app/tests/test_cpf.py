@@ -1,8 +1,10 @@
 """Tests for CPF validation"""
 
 import pytest
+from pydantic import ValidationError
 
-from app.domain.validators.cpf import format_cpf, validate_cpf
+from app.domain.schemas.motorista import MotoristaCreate
+from app.domain.validators.cpf import format_cpf, validate_cpf, validate_cpfs
 
 
 class TestValidateCPF:
@@ -50,3 +52,37 @@ class TestFormatCPF:
         """Test formatting CPF with invalid length"""
         with pytest.raises(ValueError):
             format_cpf("1234567890")
+
+
+class TestValidateCPFs:
+    """Test batch CPF validation"""
+
+    def test_matches_single_validation(self):
+        """Test that the batch result agrees with validate_cpf for every input"""
+        cpfs = [
+            "123.456.789-09",
+            "12345678909",
+            "529.982.247-25",
+            "123.456.789-00",
+            "111.111.111-11",
+            "123.456.789",
+            "12345678901234",
+            "ABC.DEF.GHI-JK",
+            "",
+        ]
+        assert validate_cpfs(cpfs).tolist() == [validate_cpf(cpf) for cpf in cpfs]
+        assert validate_cpfs([]).tolist() == []
+
+
+class TestCPFField:
+    """Test the CPF field of MotoristaCreate"""
+
+    def test_formatted_cpf_is_normalized(self):
+        """Test that a formatted CPF is accepted and kept as 11 digits"""
+        motorista = MotoristaCreate(nome="Ana", cpf="123.456.789-09", email="ana@example.com")
+        assert motorista.cpf == "12345678909"
+
+    def test_invalid_cpf_is_rejected(self):
+        """Test that a wrong check digit fails schema validation"""
+        with pytest.raises(ValidationError, match="CPF inválido"):
+            MotoristaCreate(nome="Ana", cpf="123.456.789-00", email="ana@example.com")
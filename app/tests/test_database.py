@@ -0,0 +1,50 @@
+"""Tests for connection pool configuration"""
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.database import ping_idle_connections, pool_size_per_worker
+
+
+class TestPoolSizing:
+    """Test the per-worker pool size"""
+
+    def test_workers_share_the_connection_budget(self):
+        """Test that pools plus overflow of all workers fit in max_connections"""
+        assert pool_size_per_worker(20, 1, 0) == 20
+        assert pool_size_per_worker(100, 4, 5) == 20
+        assert pool_size_per_worker(10, 16, 0) == 1
+
+
+class TestIdlePrePing:
+    """Test the liveness check of idle connections"""
+
+    def test_only_idle_connections_are_pinged_and_replaced(self, tmp_path, monkeypatch):
+        """Test that a connection failing the check is replaced, a busy one is not pinged"""
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=1, max_overflow=0
+        )
+        pinged = []
+        now = [1000.0]
+
+        def failing_ping(dbapi_connection):
+            pinged.append(dbapi_connection)
+            raise OSError("connection reset")
+
+        monkeypatch.setattr(engine.dialect, "do_ping", failing_ping)
+        monkeypatch.setattr("app.core.database.time.monotonic", lambda: now[0])
+        ping_idle_connections(engine, idle_seconds=60)
+
+        with engine.connect() as connection:
+            first = connection.connection.dbapi_connection
+        now[0] += 30
+        with engine.connect() as connection:
+            assert connection.connection.dbapi_connection is first
+        assert pinged == []
+
+        now[0] += 61
+        with engine.connect() as connection:
+            replaced = connection.connection.dbapi_connection
+        assert pinged == [first]
+        assert replaced is not first
+        engine.dispose()
@@ -0,0 +1,122 @@
+"""Tests for the abastecimento change feed"""
+
+import asyncio
+import json
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.domain.models.enums import TipoCombustivel
+from app.domain.models.motorista import Motorista
+from app.repositories.evento_repository import EventoRepository
+from app.services.abastecimento_service import AbastecimentoService
+from app.services.event_feed import event_feed
+
+
+async def _add_motorista(session) -> None:
+    """Insert the motorista used by the tests"""
+    session.add(Motorista(nome="Ana", cpf="12345678909", email="ana@example.com"))
+    await session.commit()
+
+
+class TestEventOutbox:
+    """Test events written with the changes they describe"""
+
+    async def test_create_and_review_write_events_in_order(self, test_session):
+        """Test that create, approve and reject each write one event with the new state"""
+        await _add_motorista(test_session)
+        service = AbastecimentoService(test_session)
+        first = await service.create_abastecimento(1, TipoCombustivel.DIESEL, 300.0, 50.0)
+        second = await service.create_abastecimento(1, TipoCombustivel.DIESEL, 310.0, 50.0)
+        await service.approve_abastecimento(first.id)
+        await service.reject_abastecimento(second.id, "Nota fiscal ilegível")
+
+        repository = EventoRepository(test_session)
+        assert await repository.get_after(0, 10) == []
+        assert await repository.assign_seqs() == 4
+        eventos = await repository.get_after(0, 10)
+
+        assert [(e.tipo, e.abastecimento_id) for e in eventos] == [
+            ("criado", first.id),
+            ("criado", second.id),
+            ("aprovado", first.id),
+            ("recusado", second.id),
+        ]
+        assert [e.seq for e in eventos] == sorted(e.seq for e in eventos)
+        assert eventos[0].dados["status"] == "pendente"
+        assert eventos[3].dados["motivo_recusa"] == "Nota fiscal ilegível"
+
+    async def test_failed_transition_writes_no_event(self, test_session):
+        """Test that a refill that cannot be approved leaves the feed unchanged"""
+        await _add_motorista(test_session)
+        service = AbastecimentoService(test_session)
+        created = await service.create_abastecimento(1, TipoCombustivel.DIESEL, 300.0, 50.0)
+        await service.reject_abastecimento(created.id, "Duplicado")
+
+        updated, failures = await service.approve_abastecimentos([created.id])
+
+        assert updated == [] and failures == {created.id: "recusado"}
+        repository = EventoRepository(test_session)
+        await repository.assign_seqs()
+        assert await repository.get_last_seq() == 2
+
+    async def test_seqs_continue_across_numbering_rounds(self, test_session):
+        """Test that each round numbers the new events after the last seq, up to its limit"""
+        await _add_motorista(test_session)
+        service = AbastecimentoService(test_session)
+        repository = EventoRepository(test_session)
+        for _ in range(3):
+            await service.create_abastecimento(1, TipoCombustivel.DIESEL, 300.0, 50.0)
+
+        assert await repository.assign_seqs(limit=2) == 2
+        assert [e.seq for e in await repository.get_after(0, 10)] == [1, 2]
+        await service.create_abastecimento(1, TipoCombustivel.DIESEL, 300.0, 50.0)
+        assert await repository.assign_seqs() == 2
+        assert await repository.assign_seqs() == 0
+
+        eventos = await repository.get_after(1, 10)
+        assert [e.seq for e in eventos] == [2, 3, 4]
+        assert [e.id for e in eventos] == [2, 3, 4]
+
+
+class TestChangeFeed:
+    """Test reading the feed by long polling and Server-Sent Events"""
+
+    async def test_long_poll_returns_when_an_event_is_committed(self, test_db):
+        """Test that a waiting reader is woken up by the commit of a new event"""
+        session_factory = async_sessionmaker(test_db, expire_on_commit=False)
+        async with session_factory() as session:
+            await _add_motorista(session)
+
+        async with session_factory() as reader:
+            waiting = asyncio.create_task(event_feed.read(reader, 0, 10, espera=5))
+            await asyncio.sleep(0.05)
+            assert not waiting.done()
+            async with session_factory() as writer:
+                created = await AbastecimentoService(writer).create_abastecimento(
+                    1, TipoCombustivel.GASOLINA, 60.0, 10.0
+                )
+            eventos = await asyncio.wait_for(waiting, 1)
+
+        assert [e.abastecimento_id for e in eventos] == [created.id]
+
+    async def test_stream_resumes_after_the_given_seq(self, test_db, test_session):
+        """Test that SSE frames carry the seq as id and skip events up to apos"""
+        await _add_motorista(test_session)
+        service = AbastecimentoService(test_session)
+        created = await service.create_abastecimento(1, TipoCombustivel.DIESEL, 300.0, 50.0)
+        await service.approve_abastecimento(created.id)
+
+        stream = event_feed.stream(1, session_factory=async_sessionmaker(test_db))
+        frame = await stream.__anext__()
+        await stream.aclose()
+
+        lines = frame.strip().split("\n")
+        assert lines[:2] == ["id: 2", "event: aprovado"]
+        assert json.loads(lines[2].removeprefix("data: "))["dados"]["status"] == "aprovado"
+
+    def test_feed_endpoint_is_not_shadowed_by_the_id_route(self, test_client):
+        """Test that /abastecimentos/eventos reaches the feed and reports the resume seq"""
+        response = test_client.get("/api/v1/abastecimentos/eventos", params={"apos": 7})
+
+        assert response.status_code == 200
+        assert response.json() == {"eventos": [], "ultimo_seq": 7}
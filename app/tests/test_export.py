@@ -0,0 +1,70 @@
+"""Tests for streaming export"""
+
+import csv
+import io
+import json
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.domain.models.abastecimento import Abastecimento
+from app.domain.models.enums import StatusAbastecimento, TipoCombustivel
+from app.domain.models.motorista import Motorista
+from app.repositories.abastecimento_repository import AbastecimentoFilters
+from app.services.export_service import EXPORT_COLUMNS, FormatoExportacao, export_abastecimentos
+
+
+async def _seed(session) -> None:
+    """Insert one motorista and five abastecimentos, two of them approved"""
+    session.add(Motorista(nome="João", cpf="12345678909", email="joao@example.com"))
+    await session.commit()
+    for i in range(5):
+        session.add(
+            Abastecimento(
+                motorista_id=1,
+                tipo_combustivel=TipoCombustivel.DIESEL,
+                valor=300.0 + i,
+                litros=50.0,
+                status=StatusAbastecimento.APROVADO if i < 2 else StatusAbastecimento.PENDENTE,
+            )
+        )
+    await session.commit()
+
+
+class TestExport:
+    """Test NDJSON and CSV export"""
+
+    async def test_ndjson_export_applies_filters(self, test_db, test_session):
+        """Test that NDJSON export yields one object per matching row"""
+        await _seed(test_session)
+
+        chunks = [
+            chunk
+            async for chunk in export_abastecimentos(
+                AbastecimentoFilters(status=StatusAbastecimento.APROVADO),
+                FormatoExportacao.NDJSON,
+                session_factory=async_sessionmaker(test_db),
+            )
+        ]
+        records = [json.loads(line) for line in "".join(chunks).splitlines()]
+
+        assert sorted(record["valor"] for record in records) == [300.0, 301.0]
+        assert all(record["status"] == "aprovado" for record in records)
+
+    async def test_csv_export_is_chunked(self, test_db, test_session):
+        """Test that CSV export has a header and spans several chunks"""
+        await _seed(test_session)
+
+        chunks = [
+            chunk
+            async for chunk in export_abastecimentos(
+                AbastecimentoFilters(),
+                FormatoExportacao.CSV,
+                chunk_size=2,
+                session_factory=async_sessionmaker(test_db),
+            )
+        ]
+        rows = list(csv.reader(io.StringIO("".join(chunks))))
+
+        assert len(chunks) == 3
+        assert rows[0] == EXPORT_COLUMNS
+        assert len(rows) == 6
@@ -0,0 +1,107 @@
+"""Tests for Idempotency-Key support"""
+
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.domain.models.abastecimento import Abastecimento
+from app.domain.models.motorista import Motorista
+from app.services.idempotency import Desfecho, IdempotencyStore, idempotency_store
+
+
+@pytest.fixture
+def store(test_db):
+    """Idempotency store on the test database"""
+    return IdempotencyStore(
+        ttl=timedelta(hours=1), session_factory=async_sessionmaker(test_db, expire_on_commit=False)
+    )
+
+
+@pytest.fixture
+def app_store(test_db, monkeypatch):
+    """Point the application's idempotency store at the test database"""
+    monkeypatch.setattr(
+        idempotency_store, "session_factory", async_sessionmaker(test_db, expire_on_commit=False)
+    )
+    idempotency_store.cache.clear()
+    yield idempotency_store
+    idempotency_store.cache.clear()
+
+
+class TestIdempotencyStore:
+    """Test key reservation and recorded responses"""
+
+    async def test_key_is_reserved_until_its_response_is_recorded(self, store):
+        """Test that a key in use is reported as in progress, then replayed"""
+        desfecho, _, reservada_em = await store.begin("k1", "a")
+        assert desfecho == Desfecho.NOVA and reservada_em is not None
+        assert await store.begin("k1", "a") == (Desfecho.EM_ANDAMENTO, None, None)
+
+        await store.complete("k1", "a", reservada_em, 201, "application/json", b'{"id": 1}')
+        store.cache.clear()
+        desfecho, stored, _ = await store.begin("k1", "a")
+
+        assert desfecho == Desfecho.REPETIDA
+        assert (stored.status_code, stored.body) == (201, b'{"id": 1}')
+        assert await store.begin("k1", "b") == (Desfecho.CONFLITO, None, None)
+
+    async def test_released_and_expired_keys_can_be_reused(self, test_db, store):
+        """Test that failed requests and expired keys do not block a new request"""
+        _, _, reservada_em = await store.begin("k1", "a")
+        await store.release("k1", reservada_em)
+        assert (await store.begin("k1", "b"))[0] == Desfecho.NOVA
+
+        expired = IdempotencyStore(
+            ttl=timedelta(0), lease=timedelta(0), session_factory=store.session_factory
+        )
+        _, _, reservada_em = await expired.begin("k2", "a")
+        await expired.complete("k2", "a", reservada_em, 200, None, b"")
+        expired.cache.clear()
+        assert (await expired.begin("k2", "b"))[0] == Desfecho.NOVA
+        assert await expired.purge() == 1
+
+    async def test_abandoned_reservation_is_taken_over_after_its_lease(self, store):
+        """Test that a request that never finished blocks retries only for the lease"""
+        abandoned = IdempotencyStore(
+            ttl=timedelta(hours=1), lease=timedelta(0), session_factory=store.session_factory
+        )
+        _, _, lost = await abandoned.begin("k1", "a")
+
+        desfecho, _, reservada_em = await store.begin("k1", "a")
+        assert desfecho == Desfecho.NOVA
+        # The first request finishing late neither overwrites nor frees the new reservation
+        await abandoned.complete("k1", "a", lost, 500, None, b"")
+        await abandoned.release("k1", lost)
+        assert (await store.begin("k1", "a"))[0] == Desfecho.EM_ANDAMENTO
+
+        await store.complete("k1", "a", reservada_em, 201, None, b"ok")
+        store.cache.clear()
+        assert (await store.begin("k1", "a"))[0] == Desfecho.REPETIDA
+
+
+class TestIdempotencyMiddleware:
+    """Test retries of POST /api/v1/abastecimentos"""
+
+    async def test_retry_replays_the_response_without_creating_again(
+        self, test_session, test_client, app_store
+    ):
+        """Test that a retried create returns the first response and stores one refill"""
+        test_session.add(Motorista(nome="Ana", cpf="12345678909", email="ana@example.com"))
+        await test_session.commit()
+        payload = {"motorista_id": 1, "tipo_combustivel": "diesel", "valor": 300.0, "litros": 50.0}
+        headers = {"Idempotency-Key": "bomba-7-0001"}
+
+        first = test_client.post("/api/v1/abastecimentos", json=payload, headers=headers)
+        retry = test_client.post("/api/v1/abastecimentos", json=payload, headers=headers)
+        other = test_client.post(
+            "/api/v1/abastecimentos", json={**payload, "valor": 301.0}, headers=headers
+        )
+
+        assert first.status_code == retry.status_code == 201
+        assert retry.json() == first.json()
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert other.status_code == 422
+        count = await test_session.scalar(select(func.count()).select_from(Abastecimento))
+        assert count == 1
@@ -0,0 +1,76 @@
+"""Tests for request metrics and database instrumentation"""
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.instrumentation import redact_sql
+from app.core.metrics import Counter, Histogram, current_request_stats, http_request_queries
+from app.core.middleware import MetricsMiddleware
+
+
+class TestMetricFormat:
+    """Test the Prometheus text format"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that buckets, count and sum are rendered per label set"""
+        histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value, route="/a")
+
+        lines = histogram.render().splitlines()
+
+        assert lines[:2] == ["# HELP latency_seconds Latency", "# TYPE latency_seconds histogram"]
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{route="/a",le="1.0"} 3' in lines
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+        assert 'latency_seconds_count{route="/a"} 4' in lines
+        assert 'latency_seconds_sum{route="/a"} 4.25' in lines
+
+    def test_label_values_are_escaped(self):
+        """Test that quotes in label values do not break the output"""
+        counter = Counter("errors_total", "Errors", ("detail",))
+        counter.inc(detail='bad "value"')
+
+        assert 'errors_total{detail="bad \\"value\\""} 1' in counter.render()
+
+
+class TestSlowQueryRedaction:
+    """Test redaction of logged SQL"""
+
+    def test_literals_are_redacted(self):
+        """Test that string and numeric literals are hidden but placeholders kept"""
+        statement = (
+            "SELECT *\n  FROM motoristas WHERE cpf = '12345678909' AND id = $1 "
+            "AND valor > 10.5 AND t1.col2 = :p_1 LIMIT 20"
+        )
+
+        assert redact_sql(statement) == (
+            "SELECT * FROM motoristas WHERE cpf = '?' AND id = $1 "
+            "AND valor > ? AND t1.col2 = :p_1 LIMIT ?"
+        )
+
+
+class TestMetricsMiddleware:
+    """Test per-request metrics"""
+
+    async def test_records_route_template_and_queries(self):
+        """Test that requests are labelled by route template with their query count"""
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/itens/{item_id}")
+        async def get_item(item_id: int) -> dict:
+            current_request_stats.get().queries += 2
+            return {"id": item_id}
+
+        labels = {"method": "GET", "route": "/itens/{item_id}"}
+        before_count = http_request_queries.count(**labels)
+        before_sum = http_request_queries.sum(**labels)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for item_id in (1, 2, 3):
+                assert (await client.get(f"/itens/{item_id}")).status_code == 200
+
+        assert http_request_queries.count(**labels) == before_count + 3
+        assert http_request_queries.sum(**labels) == before_sum + 6
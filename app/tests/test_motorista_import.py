@@ -0,0 +1,90 @@
+"""Tests for bulk motorista import"""
+
+import json
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.domain.models.motorista import Motorista
+from app.services.motorista_import import (
+    FormatoImportacao,
+    MotoristaImporter,
+    parse_rows,
+    stream_import,
+)
+
+CSV_FILE = """nome,cpf,email,telefone
+Ana,123.456.789-09,ana@Example.com,11999999999
+Bruno,529.982.247-25,bruno@example.com,
+Carla,123.456.789-00,carla@example.com,
+Davi,52998224725,davi@example.com,
+Eva,111.444.777-35,ana@example.com,
+Fábio,935.411.347-80,fabio@example,
+""".encode()
+
+
+class TestParseRows:
+    """Test reading import files"""
+
+    def test_csv_rows_keep_file_line_numbers(self):
+        """Test that CSV rows are numbered after the header and empty cells are dropped"""
+        rows = parse_rows(CSV_FILE, FormatoImportacao.CSV)
+
+        assert rows[0] == (
+            2,
+            {
+                "nome": "Ana",
+                "cpf": "123.456.789-09",
+                "email": "ana@Example.com",
+                "telefone": "11999999999",
+            },
+        )
+        assert "telefone" not in rows[1][1]
+        assert len(rows) == 6
+
+    def test_invalid_ndjson_lines_are_kept(self):
+        """Test that blank lines are skipped and broken JSON is reported per line"""
+        body = b'{"nome": "Ana"}\n\n{broken\n'
+
+        assert parse_rows(body, FormatoImportacao.NDJSON) == [(1, {"nome": "Ana"}), (3, None)]
+
+
+class TestMotoristaImporter:
+    """Test importing into the database"""
+
+    async def test_rows_are_validated_deduplicated_and_inserted(self, test_session):
+        """Test that only valid, new and unrepeated rows are created"""
+        test_session.add(Motorista(nome="Bia", cpf="52998224725", email="bia@example.com"))
+        await test_session.commit()
+
+        importer = MotoristaImporter(test_session, chunk_size=2)
+        rows = parse_rows(CSV_FILE, FormatoImportacao.CSV)
+        progress = [step async for step in importer.run(rows)]
+        report = importer.report()
+
+        assert (report.total, report.criados, report.falhas) == (6, 1, 5)
+        assert [(erro.linha, erro.erro) for erro in report.erros] == [
+            (3, "Motorista com este CPF já existe"),
+            (4, "cpf: CPF inválido"),
+            (5, "CPF repetido no arquivo (linha 3)"),
+            (6, "Email repetido no arquivo (linha 2)"),
+            (7, "email: email inválido"),
+        ]
+        assert progress[-1].processados == 6
+        ana = await test_session.scalar(select(Motorista).where(Motorista.cpf == "12345678909"))
+        assert ana.email == "ana@example.com"
+
+    async def test_stream_ends_with_the_result(self, test_db):
+        """Test that the NDJSON stream reports progress, then the final counts"""
+        body = b'{"nome": "Ana", "cpf": "12345678909", "email": "ana@example.com"}\n'
+
+        lines = [
+            json.loads(line)
+            async for line in stream_import(
+                parse_rows(body, FormatoImportacao.NDJSON),
+                session_factory=async_sessionmaker(test_db),
+            )
+        ]
+
+        assert [line["evento"] for line in lines] == ["progresso", "progresso", "resultado"]
+        assert lines[-1]["criados"] == 1 and lines[-1]["erros"] == []
@@ -0,0 +1,151 @@
+"""Tests for motorista endpoints"""
+
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app.domain.models.motorista import Motorista
+from app.repositories.abastecimento_repository import AbastecimentoRepository
+from app.repositories.consumo_repository import ConsumoRepository
+
+
+class TestCreateMotorista:
+    """Test POST /api/v1/motoristas"""
+
+    def test_duplicates_get_a_conflict_per_field(self, test_client):
+        """Test that a taken CPF and a taken email return distinct 409 responses"""
+        payload = {"nome": "Ana", "cpf": "123.456.789-09", "email": "ana@example.com"}
+
+        created = test_client.post("/api/v1/motoristas", json=payload)
+        same_cpf = test_client.post(
+            "/api/v1/motoristas", json={**payload, "email": "outra@example.com"}
+        )
+        same_email = test_client.post(
+            "/api/v1/motoristas", json={**payload, "cpf": "529.982.247-25"}
+        )
+
+        assert created.status_code == 201
+        assert created.json()["cpf"] == "12345678909"
+        assert (same_cpf.status_code, same_cpf.json()["detail"]) == (
+            409,
+            "Motorista com este CPF já existe",
+        )
+        assert (same_email.status_code, same_email.json()["detail"]) == (
+            409,
+            "Motorista com este email já existe",
+        )
+
+
+class TestMotoristaPerfil:
+    """Test GET /api/v1/motoristas/{motorista_id}/perfil"""
+
+    async def test_latest_refills_and_totals_in_constant_queries(
+        self, test_db, test_session, test_client
+    ):
+        """Test that the profile costs the same queries with or without refills"""
+        test_session.add_all(
+            [
+                Motorista(nome="Ana", cpf="12345678909", email="ana@example.com"),
+                Motorista(nome="Bia", cpf="52998224725", email="bia@example.com"),
+            ]
+        )
+        await test_session.commit()
+        await AbastecimentoRepository(test_session).create_many(
+            [
+                {
+                    "motorista_id": 1,
+                    "tipo_combustivel": "diesel",
+                    "valor": 300.0,
+                    "litros": 50.0,
+                    "data_abastecimento": datetime(2024, 5, day, 12),
+                }
+                for day in (3, 1, 5, 2, 4)
+            ]
+        )
+        await ConsumoRepository(test_session).rebuild()
+        await test_session.commit()
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(test_db.sync_engine, "before_cursor_execute", record)
+        try:
+            ana = test_client.get("/api/v1/motoristas/1/perfil", params={"ultimos": 3})
+            queries_ana = len(statements)
+            bia = test_client.get("/api/v1/motoristas/2/perfil")
+            queries_bia = len(statements) - queries_ana
+        finally:
+            event.remove(test_db.sync_engine, "before_cursor_execute", record)
+
+        assert ana.status_code == bia.status_code == 200
+        assert queries_ana == queries_bia == 2
+        body = ana.json()
+        assert body["motorista"]["nome"] == "Ana"
+        assert [a["data_abastecimento"][:10] for a in body["ultimos_abastecimentos"]] == [
+            "2024-05-05",
+            "2024-05-04",
+            "2024-05-03",
+        ]
+        assert (body["resumo"]["quantidade"], body["resumo"]["total_valor"]) == (5, 1500.0)
+        assert (bia.json()["ultimos_abastecimentos"], bia.json()["resumo"]["quantidade"]) == ([], 0)
+        assert test_client.get("/api/v1/motoristas/3/perfil").status_code == 404
+
+
+class TestBuscaMotoristas:
+    """Test GET /api/v1/motoristas/busca"""
+
+    @staticmethod
+    def _search(test_client, q: str, **params) -> list[str]:
+        """Names returned by a search"""
+        response = test_client.get("/api/v1/motoristas/busca", params={"q": q, **params})
+        assert response.status_code == 200
+        return [motorista["nome"] for motorista in response.json()]
+
+    async def test_matches_word_prefixes_email_cpf_and_telefone(self, test_session, test_client):
+        """Test that each kind of term finds its motoristas, ordered by name"""
+        test_session.add_all(
+            [
+                Motorista(
+                    nome="Joao da Silva",
+                    cpf="12345678909",
+                    email="jsilva@example.com",
+                    telefone="11987654321",
+                ),
+                Motorista(nome="Maria Silveira", cpf="52998224725", email="maria@example.com"),
+                Motorista(nome="Ana Souza", cpf="11144477735", email="souza.ana@example.com"),
+            ]
+        )
+        await test_session.commit()
+
+        assert self._search(test_client, "sil") == ["Joao da Silva", "Maria Silveira"]
+        assert self._search(test_client, "silva jo") == ["Joao da Silva"]
+        assert self._search(test_client, "sil", limite=1) == ["Joao da Silva"]
+        assert self._search(test_client, "souza.") == ["Ana Souza"]
+        assert self._search(test_client, "MARIA@EX") == ["Maria Silveira"]
+        assert self._search(test_client, "123.456") == ["Joao da Silva"]
+        assert self._search(test_client, "(11) 98765") == ["Joao da Silva"]
+        assert self._search(test_client, "ilva") == []
+
+    def test_formatted_telefone_is_found_by_any_formatting(self, test_client):
+        """Test that a telefone sent with formatting is stored as digits and found"""
+        response = test_client.post(
+            "/api/v1/motoristas",
+            json={
+                "nome": "Joao da Silva",
+                "cpf": "12345678909",
+                "email": "jsilva@example.com",
+                "telefone": "(11) 98765-4321",
+            },
+        )
+        assert response.status_code == 201
+        assert response.json()["telefone"] == "11987654321"
+
+        for termo in ("11 98765", "(11) 9876", "1198765"):
+            assert self._search(test_client, termo) == ["Joao da Silva"]
+
+    def test_term_is_required(self, test_client):
+        """Test that a missing or one-character term is rejected"""
+        assert test_client.get("/api/v1/motoristas/busca").status_code == 422
+        assert test_client.get("/api/v1/motoristas/busca", params={"q": "a"}).status_code == 422
@@ -0,0 +1,126 @@
+"""Tests for keyset pagination"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.domain.models.abastecimento import Abastecimento
+from app.domain.models.enums import StatusAbastecimento, TipoCombustivel
+from app.domain.models.motorista import Motorista
+from app.repositories.abastecimento_repository import (
+    AbastecimentoFilters,
+    AbastecimentoRepository,
+)
+from app.repositories.pagination import decode_cursor, encode_cursor
+
+
+class TestCursorEncoding:
+    """Test cursor encoding and decoding"""
+
+    def test_round_trip(self):
+        """Test that a decoded cursor matches the encoded position"""
+        position = datetime(2024, 5, 17, 10, 30, 15, 123456)
+        cursor = encode_cursor(position, 42)
+
+        assert decode_cursor(cursor) == (position, 42)
+
+    def test_cursor_is_url_safe(self):
+        """Test that cursors can be sent as query parameters unescaped"""
+        cursor = encode_cursor(datetime(2024, 1, 1), 10**9)
+        assert all(c.isalnum() or c in "-_" for c in cursor)
+
+    def test_invalid_cursor(self):
+        """Test that malformed cursors raise ValueError"""
+        for cursor in ("not-a-cursor", "", "W10", encode_cursor(datetime(2024, 1, 1), 1)[:-4]):
+            with pytest.raises(ValueError):
+                decode_cursor(cursor)
+
+
+async def _add_motoristas(session, count: int) -> None:
+    """Insert placeholder motoristas with ids 1..count"""
+    for i in range(count):
+        session.add(Motorista(nome=f"Motorista {i}", cpf=f"{i:011d}", email=f"m{i}@example.com"))
+    await session.commit()
+
+
+class TestCursorPagination:
+    """Test keyset pagination against the database"""
+
+    async def test_pages_cover_all_rows_once(self, test_session):
+        """Test that walking every page returns each row once, newest first"""
+        await _add_motoristas(test_session, 1)
+
+        base = datetime(2024, 1, 1)
+        for i in range(7):
+            test_session.add(
+                Abastecimento(
+                    motorista_id=1,
+                    tipo_combustivel=TipoCombustivel.GASOLINA,
+                    valor=100.0,
+                    litros=20.0,
+                    # Pairs of rows share a timestamp to exercise the id tie-breaker
+                    data_abastecimento=base + timedelta(hours=i // 2),
+                )
+            )
+        await test_session.commit()
+
+        repository = AbastecimentoRepository(test_session)
+        seen: list[int] = []
+        cursor = None
+        while True:
+            items, cursor = await repository.get_with_cursor(cursor, page_size=3)
+            seen.extend(item.id for item in items)
+            if cursor is None:
+                break
+
+        assert seen == [7, 6, 5, 4, 3, 2, 1]
+
+
+class TestFilteredPagination:
+    """Test combined filters with page-based pagination"""
+
+    async def test_filters_are_combined_and_total_is_exact(self, test_session):
+        """Test that filters are ANDed and total counts all matches, not one page"""
+        await _add_motoristas(test_session, 2)
+
+        base = datetime(2024, 3, 1)
+        for i in range(30):
+            test_session.add(
+                Abastecimento(
+                    motorista_id=1 + i % 2,
+                    tipo_combustivel=TipoCombustivel.DIESEL,
+                    valor=300.0,
+                    litros=50.0,
+                    status=StatusAbastecimento.APROVADO if i % 3 else StatusAbastecimento.PENDENTE,
+                    data_abastecimento=base + timedelta(days=i),
+                )
+            )
+        await test_session.commit()
+
+        repository = AbastecimentoRepository(test_session)
+        filters = AbastecimentoFilters(
+            motorista_id=1,
+            status=StatusAbastecimento.APROVADO,
+            data_fim=base + timedelta(days=20),
+        )
+        items, total = await repository.get_with_pagination(page=2, page_size=4, filters=filters)
+
+        # Even offsets below 20 that are not multiples of 3: 16, 14, 10, 8 | 4, 2
+        assert total == 6
+        assert [item.data_abastecimento.day for item in items] == [5, 3]
+
+    async def test_estimated_total_falls_back_to_exact_count(self, test_session):
+        """Test that estimated totals are exact where planner statistics are unavailable"""
+        await _add_motoristas(test_session, 1)
+        for _ in range(3):
+            test_session.add(
+                Abastecimento(
+                    motorista_id=1, tipo_combustivel=TipoCombustivel.ETANOL, valor=80.0, litros=20.0
+                )
+            )
+        await test_session.commit()
+
+        repository = AbastecimentoRepository(test_session)
+        _, total = await repository.get_with_pagination(estimate_total=True)
+
+        assert total == await repository.count() == 3
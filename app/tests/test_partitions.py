@@ -0,0 +1,43 @@
+"""Tests for the monthly partitions of abastecimentos"""
+
+from datetime import date, datetime
+from pathlib import Path
+
+from app.services.partitions import (
+    PartitionManager,
+    add_months,
+    month_start,
+    partition_month,
+    partition_name,
+)
+
+
+class TestPartitionNames:
+    """Test month arithmetic and partition names"""
+
+    def test_months_roll_over_year_boundaries(self):
+        """Test that adding months crosses years in both directions"""
+        assert month_start(datetime(2024, 12, 31, 23, 59)) == date(2024, 12, 1)
+        assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+        assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+
+    def test_partition_name_round_trips(self):
+        """Test that only monthly partition names are parsed back to their month"""
+        assert partition_name(date(2024, 5, 1)) == "abastecimentos_p202405"
+        assert partition_month("abastecimentos_p202405") == date(2024, 5, 1)
+        assert partition_month("abastecimentos_p202413") is None
+        assert partition_month("abastecimentos_default") is None
+        assert partition_month("motoristas") is None
+
+
+class TestPartitionManager:
+    """Test the manager on databases without partitioning"""
+
+    async def test_noop_when_table_is_not_partitioned(self, test_session, tmp_path):
+        """Test that ensure and archive do nothing on SQLite"""
+        manager = PartitionManager()
+
+        assert await manager.is_partitioned(test_session) is False
+        assert await manager.ensure(test_session) == []
+        assert await manager.archive(test_session, date(2030, 1, 1), Path(tmp_path)) == []
+        assert list(tmp_path.iterdir()) == []
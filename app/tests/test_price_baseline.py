@@ -0,0 +1,102 @@
+"""Tests for the rolling price baseline"""
+
+import statistics
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.domain.models.abastecimento import Abastecimento
+from app.domain.models.enums import StatusAbastecimento, TipoCombustivel
+from app.domain.models.motorista import Motorista
+from app.services.price_baseline import PriceBaseline, PriceStats
+
+
+class TestPriceStats:
+    """Test rolling price statistics"""
+
+    def test_statistics_match_reference_implementation(self):
+        """Test mean, stddev and percentiles against the statistics module"""
+        prices = [5.1, 6.3, 5.9, 6.0, 7.2, 5.5, 6.1]
+        stats = PriceStats(window=100)
+        for price in prices:
+            stats.add(price)
+
+        assert stats.count == len(prices)
+        assert stats.mean == pytest.approx(statistics.fmean(prices))
+        assert stats.stddev == pytest.approx(statistics.pstdev(prices))
+        assert stats.percentile(50) == statistics.median_low(prices)
+        assert stats.percentile(100) == max(prices)
+
+    def test_window_keeps_only_latest_samples(self):
+        """Test that samples beyond the window are evicted oldest first"""
+        stats = PriceStats(window=3)
+        for price in [100.0, 1.0, 2.0, 3.0]:
+            stats.add(price)
+
+        assert stats.count == 3
+        assert stats.mean == pytest.approx(2.0)
+        assert stats.percentile(100) == 3.0
+
+    def test_max_age_evicts_old_samples(self):
+        """Test that samples older than max_age are evicted"""
+        stats = PriceStats(window=100, max_age=timedelta(days=7))
+        now = datetime(2024, 6, 30)
+        stats.add(50.0, now - timedelta(days=10))
+        stats.add(6.0, now)
+
+        assert stats.count == 1
+        assert stats.mean == 6.0
+
+
+class TestPriceBaseline:
+    """Test per-fuel baseline"""
+
+    def test_reference_price_until_enough_samples(self):
+        """Test that the default price is used until min_samples is reached"""
+        baseline = PriceBaseline({"diesel": 6.0}, window=10, min_samples=3)
+
+        baseline.observe("diesel", 5.0)
+        baseline.observe("diesel", 5.0)
+        assert baseline.reference_price("diesel") == 6.0
+
+        baseline.observe("diesel", 5.0)
+        assert baseline.reference_price("diesel") == 5.0
+        assert baseline.threshold("diesel", 0.25) == pytest.approx(6.25)
+
+    def test_fuel_types_are_independent(self):
+        """Test that samples of one fuel type do not affect another"""
+        baseline = PriceBaseline({"diesel": 6.0, "gnv": 4.9}, min_samples=1)
+        baseline.observe("diesel", 5.5)
+
+        assert baseline.reference_price("diesel") == 5.5
+        assert baseline.reference_price("gnv") == 4.9
+
+    async def test_load_matches_the_prices_observed_while_running(self, test_session):
+        """Test that warm-up skips rejected refills and keeps approved anomalies"""
+        test_session.add(Motorista(nome="Ana", cpf="12345678909", email="ana@example.com"))
+        now = datetime.utcnow()
+        for valor, status, eh_anomalia in [
+            (250.0, StatusAbastecimento.PENDENTE, False),
+            (350.0, StatusAbastecimento.APROVADO, True),
+            (300.0, StatusAbastecimento.RECUSADO, False),
+            (900.0, StatusAbastecimento.ANOMALIA, True),
+        ]:
+            test_session.add(
+                Abastecimento(
+                    motorista_id=1,
+                    tipo_combustivel=TipoCombustivel.DIESEL,
+                    valor=valor,
+                    litros=50.0,
+                    status=status,
+                    eh_anomalia=eh_anomalia,
+                    data_abastecimento=now,
+                    pontuado_em=now,
+                )
+            )
+        await test_session.commit()
+
+        baseline = PriceBaseline({"diesel": 6.0}, min_samples=1)
+        await baseline.load(test_session)
+
+        assert baseline.stats("diesel").count == 2
+        assert baseline.reference_price("diesel") == pytest.approx(6.0)
@@ -0,0 +1,146 @@
+"""Tests for the per-motorista refill windows"""
+
+from datetime import datetime, timedelta
+
+from app.domain.models.abastecimento import Abastecimento
+from app.domain.models.enums import TipoCombustivel
+from app.domain.models.motorista import Motorista
+from app.services.anomaly_rules import RefillFacts, RuleSet
+from app.services.refill_velocity import RefillVelocityTracker, RefillWindow
+
+NOW = datetime(2024, 3, 1, 12, 0)
+
+
+class TestRefillWindow:
+    """Test the sliding window of one motorista"""
+
+    def test_totals_since_cutoff(self):
+        """Test counts and liters over the whole window and over a shorter period"""
+        window = RefillWindow()
+        for minutes, litros in [(300, 50.0), (30, 40.0), (5, 30.0)]:
+            window.add(NOW - timedelta(minutes=minutes), litros)
+
+        assert window.since(NOW - timedelta(hours=6)) == (3, 120.0)
+        assert window.since(NOW - timedelta(hours=1)) == (2, 70.0)
+
+        window.prune(NOW - timedelta(hours=1))
+        assert len(window) == 2
+        assert window.since(NOW - timedelta(hours=6)) == (2, 70.0)
+
+    def test_max_events_drops_oldest(self):
+        """Test that a window never grows beyond max_events"""
+        window = RefillWindow()
+        for minutes in range(10, 0, -1):
+            window.add(NOW - timedelta(minutes=minutes), 10.0, max_events=3)
+
+        assert window.since(NOW - timedelta(days=1)) == (3, 30.0)
+
+    def test_late_refill_is_inserted_in_order(self):
+        """Test that a refill recorded out of order is kept in date order"""
+        window = RefillWindow()
+        for minutes in (300, 5):
+            window.add(NOW - timedelta(minutes=minutes), 10.0)
+        window.add(NOW - timedelta(minutes=30), 20.0)
+
+        assert window.newest == NOW - timedelta(minutes=5)
+        assert window.since(NOW - timedelta(hours=1)) == (2, 30.0)
+        window.prune(NOW - timedelta(hours=1))
+        assert window.since(NOW - timedelta(days=1)) == (2, 30.0)
+
+
+class TestRefillVelocityTracker:
+    """Test the windows of every motorista"""
+
+    def test_history_expires_old_refills(self):
+        """Test that refills outside the period are dropped and empty windows forgotten"""
+        tracker = RefillVelocityTracker()
+        tracker.record(1, NOW - timedelta(hours=8), 40.0)
+        tracker.record(2, NOW - timedelta(minutes=10), 40.0)
+
+        assert len(tracker.history(1, NOW - timedelta(hours=6))) == 0
+        assert len(tracker.history(2, NOW - timedelta(hours=6))) == 1
+        assert tracker.motoristas == 1
+
+    def test_idle_motoristas_are_forgotten(self):
+        """Test that windows of motoristas who stopped refilling are evicted"""
+        tracker = RefillVelocityTracker()
+        for motorista_id, hours in [(1, 10), (2, 8), (3, 1)]:
+            tracker.record(motorista_id, NOW - timedelta(hours=hours), 40.0)
+        tracker.record(1, NOW - timedelta(hours=2), 40.0)
+
+        tracker.history(4, NOW - timedelta(hours=6))
+
+        assert tracker.motoristas == 2
+        assert len(tracker.history(1, NOW - timedelta(hours=6))) == 1
+        assert len(tracker.history(2, NOW - timedelta(hours=6))) == 0
+
+    async def test_load_warms_recent_refills(self, test_session):
+        """Test that startup loads only the scored refills within the period"""
+        test_session.add(Motorista(nome="Ana", cpf="12345678909", email="ana@example.com"))
+        now = datetime.utcnow()
+        for hours in (30, 2, 1):
+            test_session.add(
+                Abastecimento(
+                    motorista_id=1,
+                    tipo_combustivel=TipoCombustivel.DIESEL,
+                    valor=300.0,
+                    litros=50.0,
+                    data_abastecimento=now - timedelta(hours=hours),
+                    pontuado_em=now,
+                )
+            )
+        test_session.add(
+            Abastecimento(
+                motorista_id=1,
+                tipo_combustivel=TipoCombustivel.DIESEL,
+                valor=300.0,
+                litros=50.0,
+                data_abastecimento=now,
+            )
+        )
+        await test_session.commit()
+
+        tracker = RefillVelocityTracker()
+        await tracker.load(test_session, timedelta(hours=6))
+
+        cutoff = now - timedelta(hours=6)
+        assert tracker.history(1, cutoff).since(cutoff) == (2, 100.0)
+
+    def test_liters_per_motorista_rule(self):
+        """Test the velocity rule on liters refilled by the same motorista"""
+        ruleset = RuleSet.compile(
+            {
+                "regras": [
+                    {"tipo": "volume_motorista", "max_litros": 100, "janela_horas": 1},
+                ]
+            }
+        )
+        window = RefillWindow()
+        window.add(NOW - timedelta(minutes=20), 40.0)
+        window.add(NOW - timedelta(minutes=10), 40.0)
+
+        facts = RefillFacts.build(1, "gasolina", 200.0, 40.0, NOW, window)
+        evaluation = ruleset.evaluate(facts)
+        assert evaluation.eh_anomalia is True
+        assert evaluation.pontuacao == 0.6
+        assert ruleset.evaluate(RefillFacts.build(1, "gasolina", 200.0, 40.0, NOW)).pontuacao == 0
+
+    def test_refill_scored_late_ignores_newer_refills(self):
+        """Test that history rules only count refills up to the one being scored"""
+        ruleset = RuleSet.compile(
+            {
+                "regras": [
+                    {"tipo": "frequencia_motorista", "max_abastecimentos": 2, "janela_horas": 1},
+                    {"tipo": "volume_motorista", "max_litros": 100, "janela_horas": 1},
+                ]
+            }
+        )
+        window = RefillWindow()
+        window.add(NOW - timedelta(minutes=50), 30.0)
+        for minutes in (20, 10, 5):
+            window.add(NOW + timedelta(minutes=minutes), 40.0)
+
+        facts = RefillFacts.build(1, "gasolina", 200.0, 40.0, NOW, window)
+        assert ruleset.evaluate(facts).pontuacao == 0
+        assert window.since(NOW - timedelta(hours=1), NOW) == (1, 30.0)
+        assert window.since(NOW - timedelta(hours=1), NOW + timedelta(minutes=10)) == (3, 110.0)
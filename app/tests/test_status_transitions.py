@@ -0,0 +1,64 @@
+"""Tests for abastecimento status transitions"""
+
+import pytest
+
+from app.domain.exceptions import TransicaoInvalidaError
+from app.domain.models.enums import StatusAbastecimento, TipoCombustivel, origens_permitidas
+from app.domain.models.motorista import Motorista
+from app.services.abastecimento_service import AbastecimentoService
+
+
+async def _create_refills(session, count: int) -> list[int]:
+    """Create a motorista and count pending refills, returning their ids"""
+    session.add(Motorista(nome="Ana", cpf="12345678909", email="ana@example.com"))
+    await session.commit()
+    service = AbastecimentoService(session)
+    ids = []
+    for _ in range(count):
+        created = await service.create_abastecimento(1, TipoCombustivel.DIESEL, 300.0, 50.0)
+        ids.append(created.id)
+    return ids
+
+
+class TestStateMachine:
+    """Test the allowed status transitions"""
+
+    def test_only_unreviewed_refills_can_be_reviewed(self):
+        """Test that approval and rejection start from pending or anomalous refills"""
+        for destino in (StatusAbastecimento.APROVADO, StatusAbastecimento.RECUSADO):
+            assert set(origens_permitidas(destino)) == {
+                StatusAbastecimento.PENDENTE,
+                StatusAbastecimento.ANOMALIA,
+            }
+        assert origens_permitidas(StatusAbastecimento.PENDENTE) == []
+
+
+class TestTransitions:
+    """Test conditional status updates through AbastecimentoService"""
+
+    async def test_reviewed_refill_cannot_change(self, test_session):
+        """Test that a second review of the same refill is refused"""
+        [refill_id] = await _create_refills(test_session, 1)
+        service = AbastecimentoService(test_session)
+
+        approved = await service.approve_abastecimento(refill_id)
+        assert approved.status == StatusAbastecimento.APROVADO
+
+        with pytest.raises(TransicaoInvalidaError) as exc_info:
+            await service.reject_abastecimento(refill_id, "Tarde demais")
+        assert exc_info.value.origem == "aprovado"
+        assert await service.approve_abastecimento(9999) is None
+
+    async def test_bulk_reject_reports_each_failure(self, test_session):
+        """Test that a bulk rejection updates valid ids and explains the others"""
+        first, second, third = await _create_refills(test_session, 3)
+        service = AbastecimentoService(test_session)
+        await service.approve_abastecimento(second)
+
+        updated, failures = await service.reject_abastecimentos(
+            [first, second, third, first, 9999], "Sem nota fiscal"
+        )
+
+        assert sorted(item.id for item in updated) == [first, third]
+        assert all(item.motivo_recusa == "Sem nota fiscal" for item in updated)
+        assert failures == {second: StatusAbastecimento.APROVADO.value, 9999: None}
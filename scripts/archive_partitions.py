@@ -0,0 +1,52 @@
+"""Script to archive and drop the monthly partitions of old abastecimentos"""
+
+import argparse
+import asyncio
+from datetime import datetime
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.database import async_session_maker, dispose_db
+from app.services.partitions import add_months, month_start, partition_manager
+
+
+async def main(keep_months: int, output_dir: Path, keep_tables: bool) -> None:
+    """Archive every partition older than the last keep_months months"""
+    antes_de = add_months(month_start(datetime.utcnow()), -keep_months)
+    async with async_session_maker() as session:
+        if not await partition_manager.is_partitioned(session):
+            print("⚠️  abastecimentos não é particionada (rode as migrations no PostgreSQL)")
+            await dispose_db()
+            return
+        archived = await partition_manager.archive(
+            session, antes_de, output_dir, drop=not keep_tables
+        )
+
+    await dispose_db()
+
+    for partition in archived:
+        print(f"   {partition.nome}: {partition.linhas} linhas -> {partition.arquivo}")
+    print(f"✅ {len(archived)} partições anteriores a {antes_de} arquivadas em {output_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--manter-meses",
+        type=int,
+        default=settings.partition_retention_months,
+        help="Meses completos mantidos no banco, além do mês atual",
+    )
+    parser.add_argument(
+        "--destino",
+        type=Path,
+        default=Path(settings.partition_archive_dir),
+        help="Diretório dos arquivos .csv.gz",
+    )
+    parser.add_argument(
+        "--manter-tabelas",
+        action="store_true",
+        help="Apenas desanexar e exportar, sem apagar as tabelas",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.manter_meses, args.destino, args.manter_tabelas))
@@ -0,0 +1,33 @@
+"""Script to rescore stored abastecimentos with the current anomaly rules"""
+
+import argparse
+import asyncio
+
+from app.core.database import async_session_maker, dispose_db
+from app.services.anomaly_backfill import backfill_anomalies
+from app.services.price_baseline import price_baseline
+
+
+async def main(chunk_size: int, dry_run: bool) -> None:
+    """Load the price baseline and rescore every unreviewed abastecimento"""
+    async with async_session_maker() as session:
+        await price_baseline.load(session)
+        result = await backfill_anomalies(session, chunk_size=chunk_size, dry_run=dry_run)
+
+    await dispose_db()
+
+    prefix = "[dry-run] " if dry_run else ""
+    print(
+        f"✅ {prefix}{result.analisados} abastecimentos analisados: "
+        f"{result.marcados} marcados como anomalia, {result.desmarcados} desmarcados"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="Linhas por lote")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Apenas contar as mudanças, sem gravar"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.chunk_size, args.dry_run))
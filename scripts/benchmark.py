@@ -0,0 +1,321 @@
+"""Script to benchmark API throughput and latency under concurrent load"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import AsyncExitStack
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+import httpx
+
+from app.domain.models.enums import StatusAbastecimento, TipoCombustivel
+
+WORKLOADS = ("create", "list", "approve", "reject")
+
+# Fraction by which a metric may get worse before --baseline reports a regression
+DEFAULT_TOLERANCE = 0.10
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+@dataclass
+class WorkloadResult:
+    """Measurements of one workload at one concurrency level"""
+
+    workload: str
+    concurrency: int
+    requests: int
+    errors: int
+    duration_s: float
+    rps: float
+    latency_ms: dict[str, float] = field(default_factory=dict)
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list, q between 0 and 100"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(q / 100 * len(sorted_values)) - 1
+    return sorted_values[min(max(rank, 0), len(sorted_values) - 1)]
+
+
+def summarize(
+    workload: str, concurrency: int, latencies: list[float], errors: int, duration: float
+) -> WorkloadResult:
+    """Build a WorkloadResult from per-request latencies in seconds"""
+    ordered = sorted(latency * 1000 for latency in latencies)
+    return WorkloadResult(
+        workload=workload,
+        concurrency=concurrency,
+        requests=len(ordered),
+        errors=errors,
+        duration_s=round(duration, 3),
+        rps=round(len(ordered) / duration, 1) if duration else 0.0,
+        latency_ms={
+            "p50": round(percentile(ordered, 50), 2),
+            "p95": round(percentile(ordered, 95), 2),
+            "p99": round(percentile(ordered, 99), 2),
+            "mean": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+            "max": round(ordered[-1], 2) if ordered else 0.0,
+        },
+    )
+
+
+async def run_workload(
+    client: httpx.AsyncClient, request: Request, total: int, concurrency: int
+) -> tuple[list[float], int, float]:
+    """
+    Send total requests with at most concurrency of them in flight.
+
+    Returns:
+        Tuple of (latencies in seconds, number of failed requests, wall time)
+    """
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in counter:
+            started = time.perf_counter()
+            try:
+                response = await request(client, index)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def fetch_motorista_ids(client: httpx.AsyncClient, limit: int = 500) -> list[int]:
+    """IDs of active motoristas to create refills for"""
+    response = await client.get("/api/v1/motoristas", params={"page_size": limit})
+    response.raise_for_status()
+    ids = [item["id"] for item in response.json()["items"] if item["ativo"]]
+    if not ids:
+        sys.exit("Nenhum motorista ativo; rode scripts/seed_benchmark.py primeiro")
+    return ids
+
+
+async def fetch_pending_ids(client: httpx.AsyncClient, count: int) -> list[int]:
+    """IDs of pending refills to approve or reject, walking the cursor endpoint"""
+    ids: list[int] = []
+    cursor = None
+    while len(ids) < count:
+        params: dict = {"page_size": 100, "status_filter": StatusAbastecimento.PENDENTE.value}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/api/v1/abastecimentos/cursor", params=params)
+        response.raise_for_status()
+        page = response.json()
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page["proximo_cursor"]
+        if cursor is None:
+            break
+    if len(ids) < count:
+        sys.exit(f"Apenas {len(ids)} abastecimentos pendentes; são necessários {count}")
+    return ids[:count]
+
+
+def build_request(workload: str, motorista_ids: list[int], pending_ids: list[int]) -> Request:
+    """Request factory for a workload; index is the request number"""
+    rng = random.Random(workload)
+    tipos = [tipo.value for tipo in TipoCombustivel]
+
+    async def create(client: httpx.AsyncClient, index: int) -> httpx.Response:
+        litros = round(rng.uniform(15.0, 80.0), 2)
+        return await client.post(
+            "/api/v1/abastecimentos",
+            json={
+                "motorista_id": rng.choice(motorista_ids),
+                "tipo_combustivel": rng.choice(tipos),
+                "valor": round(litros * rng.uniform(4.0, 7.0), 2),
+                "litros": litros,
+            },
+        )
+
+    async def list_(client: httpx.AsyncClient, index: int) -> httpx.Response:
+        params: dict = {"page": rng.randint(1, 10), "page_size": 20}
+        if index % 2:
+            params["motorista_id"] = rng.choice(motorista_ids)
+        return await client.get("/api/v1/abastecimentos", params=params)
+
+    # Each approve/reject consumes a distinct pending refill
+    pending = iter(pending_ids)
+
+    async def approve(client: httpx.AsyncClient, index: int) -> httpx.Response:
+        return await client.post(f"/api/v1/abastecimentos/{next(pending)}/approve")
+
+    async def reject(client: httpx.AsyncClient, index: int) -> httpx.Response:
+        return await client.post(
+            f"/api/v1/abastecimentos/{next(pending)}/reject",
+            params={"motivo": "Benchmark"},
+        )
+
+    return {"create": create, "list": list_, "approve": approve, "reject": reject}[workload]
+
+
+def git_commit() -> str | None:
+    """Current commit hash, when running from a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(
+    results: list[WorkloadResult], baseline: dict, tolerance: float
+) -> list[str]:
+    """
+    Compare results with a previous report.
+
+    Returns:
+        One message per metric that regressed by more than tolerance
+    """
+    previous = {(r["workload"], r["concurrency"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = previous.get((result.workload, result.concurrency))
+        if old is None:
+            continue
+        label = f"{result.workload} c={result.concurrency}"
+        if old["rps"] and result.rps < old["rps"] * (1 - tolerance):
+            regressions.append(f"{label}: rps {old['rps']} -> {result.rps}")
+        for name in ("p50", "p95", "p99"):
+            before, after = old["latency_ms"][name], result.latency_ms[name]
+            if before and after > before * (1 + tolerance):
+                regressions.append(f"{label}: {name} {before}ms -> {after}ms")
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    """Run every workload at every concurrency level and write the report"""
+    async with AsyncExitStack() as stack:
+        if args.url:
+            transport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(max_connections=max(args.concurrency))
+            )
+            base_url = args.url
+        else:
+            # In-process: no network overhead, measures the app and the database
+            from app.main import app
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            base_url = "http://benchmark"
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout)
+        )
+
+        motorista_ids = await fetch_motorista_ids(client)
+        per_level = args.requests + args.warmup
+        consuming = [w for w in args.workloads if w in ("approve", "reject")]
+        pending_ids = await fetch_pending_ids(
+            client, per_level * len(args.concurrency) * len(consuming)
+        )
+
+        results: list[WorkloadResult] = []
+        offset = 0
+        for workload in args.workloads:
+            for concurrency in args.concurrency:
+                ids = []
+                if workload in consuming:
+                    ids = pending_ids[offset : offset + per_level]
+                    offset += per_level
+                request = build_request(workload, motorista_ids, ids)
+                if args.warmup:
+                    await run_workload(client, request, args.warmup, concurrency)
+                latencies, errors, duration = await run_workload(
+                    client, request, args.requests, concurrency
+                )
+                result = summarize(workload, concurrency, latencies, errors, duration)
+                results.append(result)
+                print(
+                    f"{workload:>8} c={concurrency:<4} {result.rps:>9.1f} req/s  "
+                    f"p50={result.latency_ms['p50']:.1f}ms  "
+                    f"p95={result.latency_ms['p95']:.1f}ms  "
+                    f"p99={result.latency_ms['p99']:.1f}ms  erros={errors}",
+                    file=sys.stderr,
+                )
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "url": args.url,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "workloads": args.workloads,
+        },
+        "results": [asdict(result) for result in results],
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for message in regressions:
+            print(f"⚠️  Regressão: {message}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--url", help="URL de um servidor em execução (padrão: app em processo, banco local)"
+    )
+    parser.add_argument(
+        "--workloads",
+        type=lambda value: value.split(","),
+        default=list(WORKLOADS),
+        help=f"Cargas separadas por vírgula ({','.join(WORKLOADS)})",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(level) for level in value.split(",")],
+        default=[1, 10, 50],
+        help="Níveis de concorrência separados por vírgula",
+    )
+    parser.add_argument(
+        "--requests", type=int, default=1_000, help="Requisições medidas por nível"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=50, help="Requisições de aquecimento por nível"
+    )
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout por requisição (s)")
+    parser.add_argument("--output", help="Arquivo JSON do relatório (padrão: stdout)")
+    parser.add_argument("--baseline", help="Relatório anterior para detectar regressões")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Piora relativa aceita antes de acusar regressão",
+    )
+    args = parser.parse_args()
+    for workload in args.workloads:
+        if workload not in WORKLOADS:
+            parser.error(f"carga desconhecida: {workload}")
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,61 @@
+"""Script to import motoristas in bulk from a CSV or NDJSON file"""
+
+import argparse
+import asyncio
+import csv
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.database import async_session_maker, dispose_db
+from app.services.motorista_import import FormatoImportacao, MotoristaImporter, parse_rows
+
+
+async def main(
+    path: Path, formato: FormatoImportacao, chunk_size: int, report_path: Path | None
+) -> None:
+    """Import the file, printing progress and writing the rejected rows"""
+    rows = parse_rows(path.read_bytes(), formato)
+    async with async_session_maker() as session:
+        importer = MotoristaImporter(session, chunk_size)
+        async for progress in importer.run(rows):
+            print(
+                f"   {progress.processados}/{progress.total} linhas "
+                f"({progress.criados} criados, {progress.falhas} falhas)"
+            )
+
+    await dispose_db()
+
+    report = importer.report()
+    if report_path is not None and report.erros:
+        with report_path.open("w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["linha", "erro"])
+            writer.writerows((erro.linha, erro.erro) for erro in report.erros)
+    for erro in report.erros[:10]:
+        print(f"   linha {erro.linha}: {erro.erro}")
+    if report.falhas > 10:
+        print(f"   ... e mais {report.falhas - 10} falhas")
+    print(f"✅ {report.criados} motoristas importados, {report.falhas} linhas recusadas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("arquivo", type=Path, help="Arquivo .csv ou .ndjson")
+    parser.add_argument(
+        "--formato",
+        type=FormatoImportacao,
+        choices=list(FormatoImportacao),
+        help="Formato do arquivo (padrão: pela extensão)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=settings.motorista_import_chunk_size,
+        help="Linhas por transação",
+    )
+    parser.add_argument("--relatorio", type=Path, help="CSV com as linhas recusadas e o motivo")
+    args = parser.parse_args()
+    formato = args.formato or (
+        FormatoImportacao.CSV if args.arquivo.suffix.lower() == ".csv" else FormatoImportacao.NDJSON
+    )
+    asyncio.run(main(args.arquivo, formato, args.chunk_size, args.relatorio))
@@ -0,0 +1,19 @@
+"""Script to recompute the daily consumption aggregates from abastecimentos"""
+
+import asyncio
+
+from app.core.database import async_session_maker, dispose_db
+from app.repositories.consumo_repository import ConsumoRepository
+
+
+async def main() -> None:
+    """Rebuild consumo_diario in a single transaction"""
+    async with async_session_maker() as session:
+        rows = await ConsumoRepository(session).rebuild()
+
+    await dispose_db()
+    print(f"✅ consumo_diario reconstruída: {rows} linhas")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,217 @@
+"""Script to seed a large synthetic dataset for benchmarks"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.core.database import Base, async_session_maker, dispose_db, engine
+from app.domain.models.abastecimento import Abastecimento
+from app.domain.models.enums import StatusAbastecimento, TipoCombustivel
+from app.domain.models.motorista import Motorista
+from app.repositories.consumo_repository import ConsumoRepository
+from app.services.partitions import partition_manager
+
+# Share of non-anomalous refills per status; the remaining ones stay pending
+# so approve/reject workloads have rows to work on
+APPROVED_SHARE = 0.60
+REJECTED_SHARE = 0.05
+
+ABASTECIMENTO_COLUMNS = [
+    "motorista_id",
+    "tipo_combustivel",
+    "valor",
+    "litros",
+    "status",
+    "eh_anomalia",
+    "data_abastecimento",
+    "criado_em",
+    "atualizado_em",
+]
+
+
+def make_cpf(number: int) -> str:
+    """Valid CPF whose first nine digits are number"""
+    digits = [int(d) for d in f"{number:09d}"]
+    for weight in (10, 11):
+        check = 11 - sum(d * (weight - i) for i, d in enumerate(digits)) % 11
+        digits.append(0 if check > 9 else check)
+    return "".join(map(str, digits))
+
+
+def generate_abastecimentos(
+    rng: np.random.Generator,
+    count: int,
+    motorista_ids: np.ndarray,
+    days: int,
+    anomaly_rate: float,
+    now: datetime,
+) -> list[tuple]:
+    """
+    Generate abastecimento rows as tuples in ABASTECIMENTO_COLUMNS order.
+
+    Prices per liter are drawn around the configured reference price of each
+    fuel type; a fraction anomaly_rate of them is inflated by 40-120% and
+    flagged as anomalous, like AbastecimentoService would.
+    """
+    tipos = np.array([tipo.value for tipo in TipoCombustivel])
+    references = np.array([settings.anomaly_reference_prices[tipo] for tipo in tipos])
+
+    tipo_index = rng.integers(0, len(tipos), count)
+    litros = np.round(rng.uniform(15.0, 80.0, count), 2)
+    price = references[tipo_index] * rng.normal(1.0, 0.04, count)
+    anomalous = rng.random(count) < anomaly_rate
+    price[anomalous] *= rng.uniform(1.4, 2.2, int(anomalous.sum()))
+    valores = np.round(price * litros, 2)
+
+    draw = rng.random(count)
+    status = np.where(
+        draw < APPROVED_SHARE,
+        StatusAbastecimento.APROVADO.value,
+        np.where(
+            draw < APPROVED_SHARE + REJECTED_SHARE,
+            StatusAbastecimento.RECUSADO.value,
+            StatusAbastecimento.PENDENTE.value,
+        ),
+    )
+    status[anomalous] = StatusAbastecimento.ANOMALIA.value
+
+    offsets = np.sort(rng.integers(0, days * 86_400_000_000, count))[::-1]
+    datas = (np.datetime64(now, "us") - offsets.astype("timedelta64[us]")).tolist()
+    motoristas = rng.choice(motorista_ids, count)
+
+    return list(
+        zip(
+            motoristas.tolist(),
+            tipos[tipo_index].tolist(),
+            valores.tolist(),
+            litros.tolist(),
+            status.tolist(),
+            anomalous.tolist(),
+            datas,
+            datas,
+            datas,
+        )
+    )
+
+
+async def insert_rows(conn: AsyncConnection, rows: list[tuple]) -> None:
+    """Insert abastecimento rows, with COPY on PostgreSQL"""
+    if conn.dialect.name == "postgresql":
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            Abastecimento.__tablename__, records=rows, columns=ABASTECIMENTO_COLUMNS
+        )
+    else:
+        await conn.execute(
+            insert(Abastecimento), [dict(zip(ABASTECIMENTO_COLUMNS, row)) for row in rows]
+        )
+
+
+async def main(
+    motoristas: int,
+    abastecimentos: int,
+    days: int,
+    anomaly_rate: float,
+    chunk_size: int,
+    reset: bool,
+    seed_value: int,
+) -> None:
+    """Create motoristas and abastecimentos, then rebuild the aggregates"""
+    rng = np.random.default_rng(seed_value)
+    started = time.perf_counter()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        if reset:
+            tables = ", ".join(table.name for table in reversed(Base.metadata.sorted_tables))
+            if conn.dialect.name == "postgresql":
+                await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+            else:
+                for table in reversed(Base.metadata.sorted_tables):
+                    await conn.execute(table.delete())
+
+    async with engine.begin() as conn:
+        first = (await conn.scalar(select(Motorista.id).order_by(Motorista.id.desc()))) or 0
+        now = datetime.utcnow()
+        await conn.execute(
+            insert(Motorista),
+            [
+                {
+                    "nome": f"Motorista {n}",
+                    "cpf": make_cpf(900_000_000 + n),
+                    "email": f"motorista{n}@benchmark.example.com",
+                    "telefone": f"11{n:09d}",
+                    "ativo": True,
+                    "criado_em": now,
+                    "atualizado_em": now,
+                }
+                for n in range(first + 1, first + motoristas + 1)
+            ],
+        )
+        motorista_ids = np.array(
+            (await conn.scalars(select(Motorista.id).where(Motorista.id > first))).all()
+        )
+    print(f"✅ {len(motorista_ids)} motoristas criados")
+
+    now = datetime.utcnow()
+    async with async_session_maker() as session:
+        await partition_manager.ensure(session, now - timedelta(days=days), now)
+    written = 0
+    while written < abastecimentos:
+        count = min(chunk_size, abastecimentos - written)
+        rows = generate_abastecimentos(rng, count, motorista_ids, days, anomaly_rate, now)
+        async with engine.begin() as conn:
+            await insert_rows(conn, rows)
+        written += count
+        rate = written / (time.perf_counter() - started)
+        print(f"   {written}/{abastecimentos} abastecimentos ({rate:,.0f} linhas/s)")
+
+    async with async_session_maker() as session:
+        aggregates = await ConsumoRepository(session).rebuild()
+    if engine.dialect.name == "postgresql":
+        async with engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("ANALYZE"))
+
+    await dispose_db()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"✅ {written} abastecimentos e {aggregates} linhas de consumo_diario "
+        f"criados em {elapsed:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--motoristas", type=int, default=1_000, help="Motoristas a criar")
+    parser.add_argument(
+        "--abastecimentos", type=int, default=1_000_000, help="Abastecimentos a criar"
+    )
+    parser.add_argument("--dias", type=int, default=365, help="Período coberto, em dias")
+    parser.add_argument(
+        "--taxa-anomalia", type=float, default=0.02, help="Fração de abastecimentos anômalos"
+    )
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Linhas por lote")
+    parser.add_argument(
+        "--reset", action="store_true", help="Apagar todos os dados antes de popular"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador aleatório")
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.motoristas,
+            args.abastecimentos,
+            args.dias,
+            args.taxa_anomalia,
+            args.chunk_size,
+            args.reset,
+            args.seed,
+        )
+    )